@@ -0,0 +1,461 @@
+"""
+FilledCard Pipeline Benchmark
+Runs the whole scrape -> import pipeline offline and compares it to a saved baseline.
+
+A local HTTP server stands in for ndca.org and o2cm.com, serving a synthetic
+member directory and O2CM event listings/results pages scaled to each tier
+(1k, 10k, 100k result rows). With --recorded, O2CM results pages recorded in
+the page cache are replayed under synthetic event IDs instead of generated
+ones. The scrapers run unmodified as subprocesses, from a copy of this
+directory so nothing in output/ is touched, against a throwaway Postgres with
+the Prisma schema applied fresh for every tier.
+
+Each stage's run report (see metrics.py) gives its wall time, rows/sec, DB
+round trips and peak memory. Results are written to
+output/benchmark_report.json and compared with output/benchmark_baseline.json
+(record one with --save-baseline on the base branch first); any stage that
+got slower or hungrier than --tolerance, or that makes more DB round trips,
+is reported as a regression and the script exits non-zero.
+
+Requirements:
+  pip install -r requirements.txt
+  Postgres binaries (initdb, pg_ctl) on PATH, or --database-url of a scratch database
+  npm install (for `prisma db push`), or --schema-sql with the schema as SQL:
+    npx prisma migrate diff --from-empty --to-schema-datamodel prisma/schema.prisma --script > schema.sql
+
+Usage:
+  python benchmark.py                        # every tier, temporary Postgres cluster
+  python benchmark.py --tiers 1k,10k
+  python benchmark.py --recorded             # replay O2CM pages from the page cache
+  python benchmark.py --database-url postgresql://localhost/filledcard_bench --schema-sql schema.sql
+  python benchmark.py --import-args ""      # row-by-row import instead of --bulk
+  python benchmark.py --o2cm-args="--crawl --restart --parse-workers 4 --rate 0 --no-cache"
+  python benchmark.py --save-baseline        # on main: record this machine's numbers
+  python benchmark.py                        # on a branch: fails if a stage regressed
+"""
+
+import json
+import os
+import sys
+import time
+import shlex
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+import subprocess
+import threading
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+logger = logging.getLogger(__name__)
+
+SCRAPER_DIR = Path(__file__).parent
+REPO_ROOT = SCRAPER_DIR.parent
+OUTPUT_DIR = SCRAPER_DIR / 'output'
+REPORT_FILE = OUTPUT_DIR / 'benchmark_report.json'
+# Numbers are machine-specific, so the baseline lives with the rest of the local output
+BASELINE_FILE = OUTPUT_DIR / 'benchmark_baseline.json'
+
+# O2CM result rows per tier; the NDCA directory gets a tenth as many members
+TIERS = {'1k': 1_000, '10k': 10_000, '100k': 100_000}
+ROWS_PER_EVENT = 50
+EVENTS_PER_LISTING_PAGE = 100
+# Distinct competitors per result row, so couples meet again across events
+DANCERS_PER_ROW = 0.3
+# Relative slowdown / memory growth allowed before a stage counts as regressed
+TOLERANCE = 0.25
+
+# Default pipeline: the flags a large backfill would use
+DEFAULT_NDCA_ARGS = '--no-cache'
+DEFAULT_O2CM_ARGS = '--crawl --restart --async --concurrency 8 --rate 0 --no-cache'
+DEFAULT_IMPORT_ARGS = '--bulk'
+
+FIRST_NAMES = ['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David',
+               'Elizabeth', 'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah',
+               'Charles', 'Karen', 'Daniel', 'Nancy', 'Matthew', 'Lisa', 'Anthony', 'Betty', 'Mark', 'Sandra',
+               'Mary Ann', 'Anna', 'Sofia', 'Ivan', 'Olga', 'Dmitri', 'Chen', 'Yuki', 'Marco', 'Elena']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+              'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore',
+              'Jackson', 'Martin', 'Lee', 'Perez', 'Thompson', 'White', 'Harris', 'Sanchez', 'Clark', 'Lewis',
+              'de la Cruz', 'Van Dyke', 'Ivanova', 'Petrov', 'Nakamura', 'Rossi', 'Kowalski', 'Nguyen']
+STATES = ['CA', 'NY', 'TX', 'FL', 'OH', 'IL', 'PA', 'MA', 'WA', 'GA', 'NC', 'MI', 'NJ', 'VA', 'CO']
+STUDIOS = ['Arthur Murray', 'Fred Astaire', 'Dance Fusion', 'Starlight Ballroom', 'Ballroom Elite',
+           'Rhythm Studio', 'Metro Dance', 'Grand Ballroom']
+
+# Runs a scraper's main() with module constants pointed at the local server
+BOOTSTRAP = '''
+import importlib, json, sys
+module, overrides = sys.argv[1], json.loads(sys.argv[2])
+sys.argv = [module + '.py'] + sys.argv[3:]
+mod = importlib.import_module(module)
+for name, value in overrides.items():
+    setattr(mod, name, value)
+mod.main()
+'''
+
+
+# --- Pages --------------------------------------------------------------------
+
+class Site:
+    """Every page the fake ndca.org / o2cm.com serves, keyed by path + query."""
+
+    def __init__(self):
+        self.pages = {}
+
+    def add(self, path: str, html: str):
+        self.pages[path] = html.encode('utf-8')
+
+
+def dancer_pool(rng: random.Random, n: int) -> list:
+    """`n` distinct (name, state, studio) competitors."""
+    names = set()
+    while len(names) < n:
+        last = rng.choice(LAST_NAMES)
+        if len(names) >= len(FIRST_NAMES) * len(LAST_NAMES) // 2:
+            # Past half the plain combinations, double-barrel last names to keep finding new ones
+            last = f'{last}-{rng.choice(LAST_NAMES)}'
+        names.add(f'{rng.choice(FIRST_NAMES)} {last}')
+    return [(name, rng.choice(STATES), rng.choice(STUDIOS)) for name in sorted(names)]
+
+
+def ndca_directory(rng: random.Random, dancers: list) -> str:
+    """Static member directory: name, NDCA id, status, studio, state (the requests-path column order)."""
+    rows = ''.join(
+        f'<tr><td>{name}</td><td>NDCA-{i:06d}</td><td>Active</td><td>{studio}</td><td>{state}</td></tr>'
+        for i, (name, state, studio) in enumerate(dancers)
+    )
+    return (f'<html><body><h1>Member Directory</h1><table><thead><tr><th>Name</th><th>ID</th>'
+            f'<th>Status</th><th>Studio</th><th>State</th></tr></thead><tbody>{rows}</tbody></table></body></html>')
+
+
+def o2cm_listing_pages(event_names: list) -> dict:
+    """Event listing pages, EVENTS_PER_LISTING_PAGE events each, chained with 'older events' links."""
+    pages = {}
+    chunks = [event_names[i:i + EVENTS_PER_LISTING_PAGE]
+              for i in range(0, len(event_names), EVENTS_PER_LISTING_PAGE)] or [[]]
+    offset = 0
+    for page, names in enumerate(chunks):
+        links = ''.join(f'<tr><td><a href="/ordermanager/results3.asp?event=bench{offset + i:05d}">{name}</a></td></tr>'
+                        for i, name in enumerate(names))
+        offset += len(names)
+        older = (f'<a href="/ordermanager/eventlist.asp?page={page + 1}">Older events</a>'
+                 if page + 1 < len(chunks) else '')
+        path = '/ordermanager/eventlist.asp' + (f'?page={page}' if page else '')
+        pages[path] = f'<html><body><table>{links}</table>{older}</body></html>'
+    return pages
+
+
+def o2cm_results_page(rng: random.Random, name: str, date: str, titles: list, dancers: list) -> str:
+    """A results page: date header, then rows of heat title (two cells), place, entries, couple."""
+    rows = []
+    heat_size = 6
+    for start in range(0, len(titles), heat_size):
+        title = titles[start]
+        first_word, _, rest = title.partition(' ')
+        entries = len(titles[start:start + heat_size])
+        for place in range(1, entries + 1):
+            lead, follow = rng.sample(dancers, 2)
+            rows.append(f'<tr><td>{first_word}</td><td>{rest}</td><td>{place}</td><td>{entries}</td>'
+                        f'<td>{lead[0]}</td><td>{follow[0]}</td></tr>')
+    return (f'<html><body><h2>{name}</h2><p>{date}</p><table><tr><th>Event</th><th></th><th>Place</th>'
+            f'<th>Entries</th><th>Lead</th><th>Follow</th></tr>{"".join(rows)}</table></body></html>')
+
+
+def recorded_results_pages(limit: int = 500) -> list:
+    """Bodies of O2CM results pages in the scraper's page cache, with their result row counts."""
+    import sqlite3
+    import zlib
+    from http_cache import DEFAULT_CACHE_FILE
+    from o2cm_scraper import extract_rows_lxml
+
+    if not DEFAULT_CACHE_FILE.exists():
+        return []
+    db = sqlite3.connect(str(DEFAULT_CACHE_FILE))
+    pages = []
+    for (body,) in db.execute("SELECT body FROM pages WHERE url LIKE '%results%' LIMIT ?", (limit,)):
+        html = zlib.decompress(body).decode('utf-8')
+        rows = sum(1 for cells in extract_rows_lxml(html) if len(cells) >= 4)
+        if rows:
+            pages.append((html, rows))
+    db.close()
+    return pages
+
+
+def build_site(rows: int, recorded: bool = False, seed: int = 0) -> Site:
+    """Pages for one tier: about `rows` O2CM result rows and rows/10 NDCA members."""
+    from heat_titles import synthetic_titles
+
+    rng = random.Random(seed)
+    dancers = dancer_pool(rng, max(20, int(rows * DANCERS_PER_ROW)))
+    site = Site()
+    # Most NDCA members also compete on O2CM, so the import links rather than duplicates
+    site.add('/members/', ndca_directory(rng, rng.sample(dancers, max(10, rows // 10))))
+
+    templates = recorded_results_pages() if recorded else []
+    if recorded and not templates:
+        logger.warning('No O2CM results pages in the page cache; generating synthetic pages instead')
+
+    names = []
+    total = 0
+    while total < rows:
+        i = len(names)
+        year = 2015 + i % 10
+        names.append(f'Benchmark Classic {i} {year}')
+        path = f'/ordermanager/results3.asp?event=bench{i:05d}'
+        if templates:
+            html, count = templates[i % len(templates)]
+        else:
+            count = min(ROWS_PER_EVENT, rows - total)
+            date = f'{rng.choice(["March", "June", "October"])} {rng.randint(1, 28)}, {year}'
+            html = o2cm_results_page(rng, names[-1], date, synthetic_titles(count), dancers)
+        site.add(path, html)
+        total += count
+    for path, html in o2cm_listing_pages(names).items():
+        site.add(path, html)
+    return site
+
+
+@contextmanager
+def serve(site: Site):
+    """Serve a Site on a free localhost port; yields the base URL."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = site.pages.get(self.path)
+            self.send_response(200 if body is not None else 404)
+            body = body if body is not None else b'not found'
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# --- Database -----------------------------------------------------------------
+
+@contextmanager
+def temporary_postgres():
+    """Start a throwaway Postgres cluster (initdb + pg_ctl) on a Unix socket; yields its URL."""
+    initdb, pg_ctl = shutil.which('initdb'), shutil.which('pg_ctl')
+    if not initdb or not pg_ctl:
+        logger.error('initdb/pg_ctl not found on PATH; install Postgres or pass --database-url')
+        sys.exit(1)
+    workdir = tempfile.mkdtemp(prefix='filledcard-pg-')
+    data_dir = os.path.join(workdir, 'data')
+    try:
+        subprocess.run([initdb, '-D', data_dir, '-U', 'postgres', '-A', 'trust', '--no-sync'],
+                       check=True, capture_output=True)
+        # Durability is irrelevant for a scratch cluster; don't let fsync dominate the numbers
+        subprocess.run([pg_ctl, '-D', data_dir, '-w', '-l', os.path.join(workdir, 'postgres.log'), '-o',
+                        f"-k {workdir} -c listen_addresses='' -c fsync=off -c synchronous_commit=off", 'start'],
+                       check=True, capture_output=True)
+    except subprocess.CalledProcessError as e:
+        logger.error(f'Could not start a temporary Postgres cluster: {(e.stderr or b"").decode().strip()}')
+        shutil.rmtree(workdir, ignore_errors=True)
+        sys.exit(1)
+    try:
+        yield f'postgresql://postgres@/postgres?host={workdir}'
+    finally:
+        subprocess.run([pg_ctl, '-D', data_dir, '-m', 'immediate', 'stop'], capture_output=True)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def reset_database(db_url: str, schema_sql: Optional[Path] = None):
+    """Drop everything in the database and apply the Prisma schema."""
+    if schema_sql:
+        import psycopg2
+        conn = psycopg2.connect(db_url)
+        try:
+            with conn, conn.cursor() as cur:
+                cur.execute('DROP SCHEMA public CASCADE; CREATE SCHEMA public;')
+                cur.execute(schema_sql.read_text())
+        finally:
+            conn.close()
+        return
+    result = subprocess.run(['npx', 'prisma', 'db', 'push', '--force-reset', '--skip-generate',
+                             '--accept-data-loss'],
+                            cwd=REPO_ROOT, env={**os.environ, 'DATABASE_URL': db_url},
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        logger.error(f'prisma db push failed (run npm install, or pass --schema-sql):\n{result.stderr.strip()}')
+        sys.exit(1)
+
+
+# --- Pipeline -----------------------------------------------------------------
+
+def run_stage(workdir: Path, name: str, module: str, args: list, overrides: dict, env: dict) -> dict:
+    """Run one pipeline script from the scratch copy; returns its run report."""
+    report_file = workdir / 'output' / f'{name}_report.json'
+    command = [sys.executable, '-c', BOOTSTRAP, module, json.dumps(overrides), *args, '--report', str(report_file)]
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        logger.error(f'{name} failed (exit {result.returncode}):\n{result.stderr.strip()[-4000:]}')
+        sys.exit(1)
+    with open(report_file) as f:
+        report = json.load(f)
+    counters = report['counters']
+    return {
+        'wallSeconds': report['wallSeconds'],
+        'processSeconds': round(elapsed, 3),
+        'rows': counters.get('rows', 0),
+        'rowsPerSecond': report['rowsPerSecond'],
+        'dbRoundTrips': counters.get('db_round_trips', 0),
+        'peakRssBytes': max(report['peakRssBytes'] or 0, report['childPeakRssBytes'] or 0) or None,
+        'stages': {stage: s['seconds'] for stage, s in report['stages'].items()},
+    }
+
+
+def run_tier(tier: str, db_url: str, args) -> dict:
+    rows = TIERS[tier]
+    logger.info(f'--- Tier {tier}: building pages for {rows} result rows')
+    site = build_site(rows, recorded=args.recorded)
+    reset_database(db_url, args.schema_sql)
+
+    with tempfile.TemporaryDirectory(prefix='filledcard-bench-') as tmp, serve(site) as base_url:
+        # A copy of the scripts writes to its own output/, leaving the real one alone
+        workdir = Path(tmp)
+        for script in SCRAPER_DIR.glob('*.py'):
+            shutil.copy(script, workdir / script.name)
+        (workdir / 'output').mkdir()
+        env = {**os.environ, 'DATABASE_URL': db_url}
+
+        results = {}
+        logger.info(f'Tier {tier}: ndca')
+        results['ndca'] = run_stage(workdir, 'ndca', 'ndca_scraper', shlex.split(args.ndca_args),
+                                    {'NDCA_BASE_URL': base_url}, env)
+        logger.info(f'Tier {tier}: o2cm')
+        results['o2cm'] = run_stage(workdir, 'o2cm', 'o2cm_scraper', shlex.split(args.o2cm_args),
+                                    {'O2CM_BASE': base_url,
+                                     'O2CM_EVENTS_URL': f'{base_url}/ordermanager/eventlist.asp'}, env)
+        import_args = shlex.split(args.import_args)
+        if '--jsonl' in import_args:
+            # The importer reads .jsonl only if the scrapers wrote it
+            logger.warning('--import-args --jsonl needs --jsonl in --ndca-args and --o2cm-args too')
+        logger.info(f'Tier {tier}: import')
+        results['import'] = run_stage(workdir, 'import', 'import_to_db', import_args, {}, env)
+    return results
+
+
+# --- Baseline -----------------------------------------------------------------
+
+def compare(results: dict, baseline: dict, tolerance: float = TOLERANCE) -> list:
+    """Regressions of `results` against `baseline`, as human-readable lines."""
+    regressions = []
+    for tier, stages in results.items():
+        for stage, now in stages.items():
+            before = baseline.get(tier, {}).get(stage)
+            if not before:
+                continue
+            for metric in ('wallSeconds', 'peakRssBytes'):
+                if before.get(metric) and now.get(metric) and now[metric] > before[metric] * (1 + tolerance):
+                    regressions.append(f'{tier} {stage}: {metric} {before[metric]} -> {now[metric]} '
+                                       f'(+{now[metric] / before[metric] - 1:.0%})')
+            # Round trips don't depend on the machine; any increase is real
+            if now['dbRoundTrips'] > before.get('dbRoundTrips', 0):
+                regressions.append(f"{tier} {stage}: dbRoundTrips {before.get('dbRoundTrips', 0)} -> "
+                                   f"{now['dbRoundTrips']}")
+    return regressions
+
+
+def print_summary(results: dict):
+    print(f"\n{'tier':<6}{'stage':<8}{'wall s':>9}{'rows':>9}{'rows/s':>11}{'db trips':>10}{'peak MB':>9}  stages")
+    for tier, stages in results.items():
+        for stage, r in stages.items():
+            detail = ', '.join(f'{name} {seconds:.2f}s' for name, seconds in r['stages'].items())
+            peak = f"{r['peakRssBytes'] / 2 ** 20:.0f}" if r['peakRssBytes'] else '-'
+            print(f"{tier:<6}{stage:<8}{r['wallSeconds']:>9.2f}{r['rows']:>9}{r['rowsPerSecond'] or 0:>11.0f}"
+                  f"{r['dbRoundTrips']:>10}{peak:>9}  {detail}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the scrape -> import pipeline offline')
+    parser.add_argument('--tiers', default=','.join(TIERS),
+                        help=f'Comma-separated tiers to run, from {", ".join(TIERS)} (default: all)')
+    parser.add_argument('--recorded', action='store_true',
+                        help='Replay O2CM results pages from the page cache instead of generating them')
+    parser.add_argument('--database-url',
+                        help='Scratch database to use instead of a temporary cluster; ALL ITS DATA IS DROPPED')
+    parser.add_argument('--schema-sql', type=Path,
+                        help='Apply this SQL (prisma migrate diff --script) instead of running prisma db push')
+    parser.add_argument('--ndca-args', default=DEFAULT_NDCA_ARGS,
+                        help=f'ndca_scraper.py flags (default: "{DEFAULT_NDCA_ARGS}")')
+    parser.add_argument('--o2cm-args', default=DEFAULT_O2CM_ARGS,
+                        help=f'o2cm_scraper.py flags (default: "{DEFAULT_O2CM_ARGS}")')
+    parser.add_argument('--import-args', default=DEFAULT_IMPORT_ARGS,
+                        help=f'import_to_db.py flags (default: "{DEFAULT_IMPORT_ARGS}")')
+    parser.add_argument('--report', type=Path, default=REPORT_FILE,
+                        help=f'Where to write the results (default: {REPORT_FILE})')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE,
+                        help=f'Baseline to compare against (default: {BASELINE_FILE.name})')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Write this run as the new baseline instead of comparing against it')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help=f'Allowed relative increase in wall time and memory (default: {TOLERANCE})')
+    args = parser.parse_args()
+
+    tiers = [t.strip() for t in args.tiers.split(',') if t.strip()]
+    unknown = [t for t in tiers if t not in TIERS]
+    if unknown:
+        parser.error(f'unknown tier(s): {", ".join(unknown)}')
+    if args.database_url and args.database_url == os.environ.get('DATABASE_URL'):
+        parser.error('--database-url is the app database (DATABASE_URL); the benchmark drops everything in it')
+
+    logger.info('=== FilledCard Pipeline Benchmark ===')
+    results = {}
+    with (nullcontext(args.database_url) if args.database_url else temporary_postgres()) as db_url:
+        for tier in tiers:
+            results[tier] = run_tier(tier, db_url, args)
+
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    with open(args.report, 'w') as f:
+        json.dump(results, f, indent=2)
+    print_summary(results)
+    print(f'\nBenchmark report: {args.report}')
+
+    if args.save_baseline:
+        baseline = {}
+        if args.baseline.exists():
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        # Tiers not run this time keep their old numbers
+        baseline.update(results)
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+            f.write('\n')
+        print(f'Baseline saved: {args.baseline}')
+        return
+
+    if not args.baseline.exists():
+        print(f'No baseline at {args.baseline}; run with --save-baseline to record one')
+        return
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    if regressions:
+        print(f'\n❌ {len(regressions)} regression(s) against {args.baseline.name}:')
+        for line in regressions:
+            print(f'  {line}')
+        sys.exit(1)
+    print(f'\n✅ No regressions against {args.baseline.name} (tolerance {args.tolerance:.0%})')
+
+
+if __name__ == '__main__':
+    main()
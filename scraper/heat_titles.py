@@ -0,0 +1,261 @@
+"""
+FilledCard Heat Title Parser
+Turns O2CM heat titles ("Am. Gold American Smooth W/T/F", "Pro/Am Sr II
+Silver Cha Cha") into style, level, category, age group and division.
+
+Every alias in the tables below is compiled into one regex, so a title is
+tokenized in a single pass; abbreviated dance lists ("W/T/F", "C/R/S/B/M") are
+resolved against the title's category. Parses are cached per title: a
+competition reuses the same few hundred titles across thousands of rows.
+
+Requirements:
+  none beyond the standard library
+
+Usage:
+  python heat_titles.py --benchmark                    # titles from the page cache
+  python heat_titles.py --benchmark --titles titles.txt  # one title per line
+"""
+
+import re
+import time
+import random
+import argparse
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+CACHE_SIZE = 65536
+
+# Dances without a DanceStyleEnum value map to None: they still count towards multi-dance events
+DANCES = {
+    'waltz': 'WALTZ', 'slow waltz': 'WALTZ',
+    'tango': 'TANGO', 'argentine tango': None,
+    'foxtrot': 'FOXTROT', 'fox trot': 'FOXTROT', 'slow foxtrot': 'FOXTROT',
+    'viennese waltz': 'VIENNESE_WALTZ', 'viennese': 'VIENNESE_WALTZ', 'v waltz': 'VIENNESE_WALTZ',
+    'quickstep': 'QUICKSTEP', 'quick step': 'QUICKSTEP',
+    'cha cha': 'CHA_CHA', 'chacha': 'CHA_CHA', 'cha': 'CHA_CHA',
+    'samba': 'SAMBA', 'rumba': 'RUMBA',
+    'paso doble': 'PASO_DOBLE', 'paso': 'PASO_DOBLE',
+    'jive': 'JIVE', 'bolero': 'BOLERO', 'mambo': 'MAMBO',
+    'west coast swing': 'WEST_COAST_SWING', 'wcs': 'WEST_COAST_SWING',
+    'east coast swing': None, 'ecs': None, 'swing': None,
+    'hustle': None, 'salsa': None, 'merengue': None, 'peabody': None, 'polka': None,
+    'nightclub two step': None, 'night club two step': None,
+}
+CATEGORIES = {
+    'smooth': 'SMOOTH', 'standard': 'STANDARD', 'ballroom': 'STANDARD',
+    'rhythm': 'RHYTHM', 'latin': 'LATIN',
+}
+LEVELS = {
+    'newcomer': 'NEWCOMER', 'pre bronze': 'NEWCOMER',
+    'bronze': 'BRONZE', 'silver': 'SILVER', 'gold': 'GOLD', 'novice': 'NOVICE',
+    'pre champ': 'PRE_CHAMP', 'prechamp': 'PRE_CHAMP', 'pre championship': 'PRE_CHAMP',
+    'pre champion': 'PRE_CHAMP',
+    'championship': 'CHAMPIONSHIP', 'champ': 'CHAMPIONSHIP', 'champion': 'CHAMPIONSHIP',
+    # Syllabus codes: B1 = Bronze I, ...
+    **{f'{code}{n}': level for code, level in (('b', 'BRONZE'), ('s', 'SILVER'), ('g', 'GOLD'))
+       for n in range(1, 5)},
+}
+SENIOR_NUMERALS = {'i': 'I', 'ii': 'II', 'iii': 'III', 'iv': 'IV', 'v': 'V',
+                   '1': 'I', '2': 'II', '3': 'III', '4': 'IV', '5': 'V'}
+AGE_GROUPS = {
+    'pre teen': 'PRE_TEEN', 'preteen': 'PRE_TEEN', 'juvenile': 'JUVENILE',
+    'junior': 'JUNIOR', 'jr': 'JUNIOR', 'youth': 'YOUTH',
+    'under 21': 'UNDER_21', 'u21': 'UNDER_21', 'collegiate': 'COLLEGIATE',
+    'adult': 'ADULT', 'senior': 'SENIOR', 'sr': 'SENIOR',
+    **{f'{word} {numeral}': f'SENIOR_{roman}' for word in ('senior', 'sr')
+       for numeral, roman in SENIOR_NUMERALS.items()},
+}
+DIVISIONS = {
+    'pro am': 'PRO_AM', 'pro/am': 'PRO_AM', 'proam': 'PRO_AM',
+    'amateur': 'AMATEUR', 'am': 'AMATEUR', 'am am': 'AMATEUR', 'amat': 'AMATEUR',
+    'professional': 'PROFESSIONAL', 'pro': 'PROFESSIONAL',
+}
+# Letters in "W/T/F"-style dance lists, per category
+ABBREVIATIONS = {
+    'STANDARD': {'w': 'WALTZ', 't': 'TANGO', 'f': 'FOXTROT', 'v': 'VIENNESE_WALTZ', 'vw': 'VIENNESE_WALTZ',
+                 'q': 'QUICKSTEP'},
+    'SMOOTH': {'w': 'WALTZ', 't': 'TANGO', 'f': 'FOXTROT', 'v': 'VIENNESE_WALTZ', 'vw': 'VIENNESE_WALTZ'},
+    'LATIN': {'c': 'CHA_CHA', 'cc': 'CHA_CHA', 's': 'SAMBA', 'r': 'RUMBA', 'p': 'PASO_DOBLE',
+              'pd': 'PASO_DOBLE', 'j': 'JIVE'},
+    'RHYTHM': {'c': 'CHA_CHA', 'cc': 'CHA_CHA', 'r': 'RUMBA', 's': None, 'ecs': None,
+               'b': 'BOLERO', 'm': 'MAMBO', 'wcs': 'WEST_COAST_SWING'},
+}
+# Category a dance list implies when the title doesn't name one (first table that covers every letter)
+ABBREVIATION_ORDER = ['STANDARD', 'LATIN', 'RHYTHM']
+# Dances that only exist in one category
+DANCE_CATEGORY = {
+    'QUICKSTEP': 'STANDARD', 'SAMBA': 'LATIN', 'PASO_DOBLE': 'LATIN', 'JIVE': 'LATIN',
+    'BOLERO': 'RHYTHM', 'MAMBO': 'RHYTHM', 'WEST_COAST_SWING': 'RHYTHM',
+}
+
+ALIASES = {
+    **{alias: ('dance', value) for alias, value in DANCES.items()},
+    **{alias: ('category', value) for alias, value in CATEGORIES.items()},
+    **{alias: ('level', value) for alias, value in LEVELS.items()},
+    **{alias: ('ageGroup', value) for alias, value in AGE_GROUPS.items()},
+    **{alias: ('division', value) for alias, value in DIVISIONS.items()},
+}
+# Titles are lowercased and everything but letters, digits and '/' becomes a space before matching
+CLEAN = re.compile(r'[^a-z0-9/]+')
+TOKEN = re.compile(
+    r'(?<![a-z0-9])(?:'
+    r'(?P<count>[2-9]) dances?'
+    # Longest alias first, so "pro am" wins over "pro" and "viennese waltz" over "waltz"
+    rf"|(?P<alias>{'|'.join(re.escape(a) for a in sorted(ALIASES, key=len, reverse=True))})"
+    r'|(?P<list>[a-z]{1,3}(?:/[a-z]{1,3})+)'
+    r'|(?P<multi>multi dance|multidance)'
+    r')(?![a-z0-9])'
+)
+
+
+class HeatTitle(NamedTuple):
+    style: Optional[str]        # DanceStyleEnum for a single dance; None for a multi-dance event
+    level: Optional[str]        # DanceLevel
+    category: Optional[str]     # DanceCategory
+    dances: tuple               # DanceStyleEnum per recognized dance (None for dances without one)
+    multi_dance: bool
+    age_group: Optional[str]
+    division: Optional[str]     # AMATEUR, PRO_AM or PROFESSIONAL
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_heat_title(title: str) -> HeatTitle:
+    """Parse a heat title; fields the title doesn't mention are None."""
+    found = {}
+    dances = []
+    lists = []
+    count = 0
+    multi = False
+    for match in TOKEN.finditer(CLEAN.sub(' ', title.lower())):
+        kind = match.lastgroup
+        if kind == 'alias':
+            field, value = ALIASES[match.group()]
+            if field == 'dance':
+                dances.append(value)
+            else:
+                found.setdefault(field, value)
+        elif kind == 'list':
+            lists.append(match.group().split('/'))
+        elif kind == 'count':
+            count = int(match.group('count'))
+        else:
+            multi = True
+
+    category = found.get('category')
+    for letters in lists:
+        table = ABBREVIATIONS.get(category)
+        if table is None or not all(letter in table for letter in letters):
+            implied = next((c for c in ABBREVIATION_ORDER
+                            if all(letter in ABBREVIATIONS[c] for letter in letters)), None)
+            table = ABBREVIATIONS.get(implied)
+            if category is None:
+                category = implied
+        if table is not None:
+            dances.extend(table[letter] for letter in letters)
+    if category is None:
+        category = next((DANCE_CATEGORY[d] for d in dances if d in DANCE_CATEGORY), None)
+
+    multi_dance = multi or count > 1 or len(dances) > 1
+    # A multi-dance event (or one that only names its category) has no single style, only the category
+    style = None if multi_dance or not dances else dances[0]
+    return HeatTitle(style, found.get('level'), category, tuple(dances), multi_dance,
+                     found.get('ageGroup'), found.get('division'))
+
+
+def cached_titles(limit: Optional[int] = None) -> list:
+    """Heat titles from every O2CM results page in the scraper's page cache."""
+    import sqlite3
+    import zlib
+    from http_cache import DEFAULT_CACHE_FILE
+    from o2cm_scraper import extract_rows_lxml, heat_title
+
+    if not DEFAULT_CACHE_FILE.exists():
+        return []
+    db = sqlite3.connect(str(DEFAULT_CACHE_FILE))
+    titles = []
+    for (body,) in db.execute("SELECT body FROM pages WHERE url LIKE '%results%'"):
+        for cells in extract_rows_lxml(zlib.decompress(body).decode('utf-8')):
+            if len(cells) >= 4:
+                titles.append(heat_title(cells))
+        if limit and len(titles) >= limit:
+            break
+    db.close()
+    return titles[:limit]
+
+
+def synthetic_titles(n: int, distinct: int = 2000) -> list:
+    """`n` titles drawn from `distinct` random combinations of the alias tables."""
+    rng = random.Random(0)
+    pool = []
+    for _ in range(distinct):
+        parts = [rng.choice(['Amateur', 'Am.', 'Pro/Am', 'Pro-Am', 'Professional', '']),
+                 rng.choice(['Adult', 'Sr II', 'Senior I', 'Youth', 'Pre-Teen', '']),
+                 rng.choice(['Newcomer', 'Bronze', 'Silver', 'Gold', 'Novice', 'Pre-Champ', 'Championship', 'B2']),
+                 rng.choice(['American Smooth', 'International Standard', 'American Rhythm', 'Latin', ''])]
+        if rng.random() < 0.3:
+            parts.append(rng.choice(['W/T/F', 'C/R/S', 'C/S/R/P/J', 'W/T/F/V/Q', '3 Dance']))
+        else:
+            parts.append(rng.choice([d.title() for d in DANCES]))
+        pool.append(' '.join(p for p in parts if p))
+    return [rng.choice(pool) for _ in range(n)]
+
+
+def benchmark(titles: list) -> dict:
+    """Parse every title cold (empty cache) and again warm; per-title timings in microseconds."""
+    parse_heat_title.cache_clear()
+    start = time.perf_counter()
+    parsed = [parse_heat_title(t) for t in titles]
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    for t in titles:
+        parse_heat_title(t)
+    warm = time.perf_counter() - start
+    uncached = parse_heat_title.__wrapped__
+    distinct = list(set(titles))
+    start = time.perf_counter()
+    for t in distinct:
+        uncached(t)
+    per_parse = time.perf_counter() - start
+    return {
+        'titles': len(titles),
+        'distinct': len(distinct),
+        'coldUs': cold / len(titles) * 1e6,
+        'warmUs': warm / len(titles) * 1e6,
+        'parseUs': per_parse / max(1, len(distinct)) * 1e6,
+        'withStyle': sum(p.style is not None for p in parsed) / len(titles),
+        'withLevel': sum(p.level is not None for p in parsed) / len(titles),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the O2CM heat title parser')
+    parser.add_argument('--benchmark', action='store_true', help='Time the parser over a corpus of titles')
+    parser.add_argument('--titles', type=Path, help='File with one heat title per line (default: the page cache)')
+    parser.add_argument('--limit', type=int, default=1_000_000, help='Titles to use at most (default: 1000000)')
+    args = parser.parse_args()
+    if not args.benchmark:
+        parser.print_help()
+        return
+
+    if args.titles:
+        with open(args.titles) as f:
+            titles = [line.strip() for line in f if line.strip()][:args.limit]
+        source = str(args.titles)
+    else:
+        titles = cached_titles(args.limit)
+        source = 'page cache'
+        if not titles:
+            titles = synthetic_titles(min(args.limit, 200_000))
+            source = 'synthetic (page cache is empty)'
+
+    stats = benchmark(titles)
+    print(f"\n=== Heat title benchmark: {stats['titles']} titles ({stats['distinct']} distinct) from {source} ===")
+    print(f"Uncached parse: {stats['parseUs']:.1f} µs/title")
+    print(f"Cold cache:     {stats['coldUs']:.2f} µs/title ({1e6 / stats['coldUs']:,.0f} titles/s)")
+    print(f"Warm cache:     {stats['warmUs']:.2f} µs/title")
+    print(f"Style found: {stats['withStyle']:.1%} | Level found: {stats['withLevel']:.1%}")
+
+
+if __name__ == '__main__':
+    main()
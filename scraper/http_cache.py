@@ -0,0 +1,216 @@
+"""
+FilledCard HTTP Response Cache
+On-disk cache of scraped pages shared by the scrapers.
+
+Pages are stored zlib-compressed in a SQLite file keyed by URL. Stale entries
+are revalidated with If-None-Match / If-Modified-Since, freshness is decided
+by a per-URL-class TTL (raised to FINAL_TTL for pages the caller marks
+final), and the least recently used entries are evicted once
+the cache grows past its size budget. In offline mode nothing touches the
+network: every page comes from the cache, so parser changes can be replayed
+over the whole corpus.
+
+Requirements:
+  pip install requests
+"""
+
+import re
+import time
+import sqlite3
+import logging
+import threading
+import zlib
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_FILE = Path(__file__).parent / 'output' / 'http_cache.sqlite3'
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB of compressed bodies
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# (URL pattern, seconds an entry stays fresh); first match wins, None = never stale
+DEFAULT_TTL_RULES = [
+    (re.compile(r'eventlist\.asp'), 1 * HOUR),       # O2CM event listings change as events are added
+    (re.compile(r'results\d?\.asp'), 1 * DAY),       # O2CM results may be corrected until the event is final
+    (re.compile(r'ndca\.org/members'), 1 * DAY),     # NDCA member directory
+]
+DEFAULT_TTL = 1 * DAY
+# TTL for pages marked final with `mark_final` (e.g. events ScrapeManifest considers final)
+FINAL_TTL = 30 * DAY
+
+
+class CacheMiss(Exception):
+    """Raised in offline mode when a URL is not in the cache."""
+
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response for pages served from the cache."""
+
+    def __init__(self, url: str, text: str, status_code: int = 200):
+        self.url = url
+        self.text = text
+        self.status_code = status_code
+        self.from_cache = True
+
+    def raise_for_status(self):
+        pass
+
+
+class ResponseCache:
+    """SQLite blob store of page bodies with TTL, revalidation metadata and LRU eviction."""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_FILE, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl_rules: Optional[list] = None, default_ttl: Optional[int] = DEFAULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_rules = DEFAULT_TTL_RULES if ttl_rules is None else ttl_rules
+        self.default_ttl = default_ttl
+        self.final_urls = set()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at)')
+        self._db.commit()
+        self._total_bytes = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+
+    def mark_final(self, urls):
+        """Keep these pages fresh for FINAL_TTL; their content is not expected to change again."""
+        self.final_urls.update(urls)
+
+    def ttl_for(self, url: str) -> Optional[int]:
+        if url in self.final_urls:
+            return FINAL_TTL
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, url: str) -> Optional[dict]:
+        """Return the cached entry for a URL (and mark it recently used), or None."""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT body, etag, last_modified, fetched_at FROM pages WHERE url = ?', (url,)
+            ).fetchone()
+            if not row:
+                return None
+            self._db.execute('UPDATE pages SET accessed_at = ? WHERE url = ?', (time.time(), url))
+            self._db.commit()
+        body, etag, last_modified, fetched_at = row
+        return {
+            'text': zlib.decompress(body).decode('utf-8'),
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': fetched_at,
+        }
+
+    def is_fresh(self, url: str, entry: dict) -> bool:
+        ttl = self.ttl_for(url)
+        return ttl is None or time.time() - entry['fetched_at'] < ttl
+
+    def store(self, url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        body = zlib.compress(text.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            old = self._db.execute('SELECT size FROM pages WHERE url = ?', (url,)).fetchone()
+            self._db.execute('''
+                INSERT OR REPLACE INTO pages (url, body, size, etag, last_modified, fetched_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (url, body, len(body), etag, last_modified, now, now))
+            self._total_bytes += len(body) - (old[0] if old else 0)
+            self._evict()
+            self._db.commit()
+
+    def touch(self, url: str):
+        """Mark an entry as just revalidated (the server answered 304)."""
+        with self._lock:
+            self._db.execute('UPDATE pages SET fetched_at = ? WHERE url = ?', (time.time(), url))
+            self._db.commit()
+
+    def expire(self, url: str):
+        """Force the next lookup of a URL to revalidate with the server."""
+        with self._lock:
+            self._db.execute('UPDATE pages SET fetched_at = 0 WHERE url = ?', (url,))
+            self._db.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its budget. Caller holds the lock."""
+        while self._total_bytes > self.max_bytes:
+            rows = self._db.execute(
+                'SELECT url, size FROM pages ORDER BY accessed_at LIMIT 100'
+            ).fetchall()
+            if not rows:
+                break
+            for url, size in rows:
+                self._db.execute('DELETE FROM pages WHERE url = ?', (url,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class CachedSession:
+    """`get()` front end that serves pages through a ResponseCache.
+
+    Network requests go through `client`, which must be thread-safe (an
+    HttpClient). With `cache=None` every request goes straight to the
+    network; with `offline=True` every request is served from the cache or
+    fails with CacheMiss.
+    """
+
+    def __init__(self, client, cache: Optional[ResponseCache] = None, offline: bool = False):
+        if offline and cache is None:
+            raise ValueError('offline mode needs a cache')
+        self.client = client
+        self.cache = cache
+        self.offline = offline
+
+    def get(self, url: str, timeout: float = 15, **kwargs):
+        if self.cache is None:
+            return self.client.get(url, timeout=timeout, **kwargs)
+
+        entry = self.cache.lookup(url)
+        if entry and (self.offline or self.cache.is_fresh(url, entry)):
+            self.cache.hits += 1
+            return CachedResponse(url, entry['text'])
+        if self.offline:
+            self.cache.misses += 1
+            raise CacheMiss(f'{url} is not cached (offline mode)')
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        resp = self.client.get(url, timeout=timeout, headers=headers, **kwargs)
+        if entry and resp.status_code == 304:
+            self.cache.revalidated += 1
+            self.cache.touch(url)
+            return CachedResponse(url, entry['text'])
+
+        self.cache.misses += 1
+        if resp.status_code == 200:
+            self.cache.store(url, resp.text, resp.headers.get('ETag'), resp.headers.get('Last-Modified'))
+        return resp
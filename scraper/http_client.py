@@ -0,0 +1,196 @@
+"""
+FilledCard HTTP Client
+Polite, fault-tolerant HTTP fetching shared by the scrapers.
+
+Every request goes through a per-host token bucket, is retried with jittered
+exponential backoff on connection errors, 429 and 5xx (honoring Retry-After),
+and is refused outright while the host's circuit breaker is open after a run
+of failures. One pooled requests session is shared by all threads, sized for
+the scraper's concurrency.
+
+Requirements:
+  pip install requests
+"""
+
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0      # seconds before the first retry, doubled each attempt
+BACKOFF_MAX = 60.0      # cap on a single backoff (and on Retry-After)
+BREAKER_THRESHOLD = 5   # consecutive failures that open a host's circuit
+BREAKER_COOLDOWN = 60.0  # seconds a circuit stays open before a trial request
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests/sec on average, bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def block(self, seconds: float):
+        """Hold every caller back for `seconds` (the server asked us to slow down)."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class CircuitBreaker:
+    """Per-host breaker: opens after BREAKER_THRESHOLD straight failures, lets one trial through after the cooldown."""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = {}
+        self._opened_at = {}
+        self._lock = threading.Lock()
+
+    def check(self, host: str):
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return
+            if time.monotonic() - opened_at < self.cooldown:
+                raise CircuitOpenError(f'circuit open for {host}')
+            # Half-open: this request is the trial; push the window out for everyone else
+            self._opened_at[host] = time.monotonic()
+
+    def success(self, host: str):
+        with self._lock:
+            self._failures.pop(host, None)
+            if self._opened_at.pop(host, None) is not None:
+                logger.info(f'Circuit closed for {host}')
+
+    def failure(self, host: str):
+        with self._lock:
+            self._failures[host] = self._failures.get(host, 0) + 1
+            if self._failures[host] >= self.threshold and host not in self._opened_at:
+                logger.warning(f'Circuit open for {host} after {self._failures[host]} failures; '
+                               f'pausing {self.cooldown:.0f}s')
+                self._opened_at[host] = time.monotonic()
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    """Thread-safe `get()` with per-host rate limiting, retries and a circuit breaker.
+
+    Drop-in for a requests session wherever the scrapers call
+    `session.get(url, timeout=...)`. A response that still has a retryable
+    status after MAX_RETRIES is returned as-is, so `raise_for_status()` fails
+    the caller; connection errors are re-raised. `requests`,
+    `bytes_downloaded` and `retries` count what went over the wire.
+    """
+
+    def __init__(self, headers: Optional[dict] = None, rate: float = 1.0, burst: int = 1,
+                 pool_size: int = 10, max_retries: int = MAX_RETRIES,
+                 breaker: Optional[CircuitBreaker] = None):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self.retries = 0
+        self.requests = 0
+        self.bytes_downloaded = 0
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        # One connection per concurrent fetch; block rather than open throwaway connections
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, pool_size), pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with jitter: uniformly between half and all of base * 2^attempt."""
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+    def get(self, url: str, timeout: float = 15, **kwargs):
+        import requests
+
+        host = urlparse(url).netloc
+        bucket = self.bucket(host)
+        for attempt in range(self.max_retries + 1):
+            self.breaker.check(host)
+            bucket.acquire()
+            try:
+                resp = self.session.get(url, timeout=timeout, **kwargs)
+                with self._lock:
+                    self.requests += 1
+                    self.bytes_downloaded += len(resp.content)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.breaker.failure(host)
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff(attempt)
+                logger.info(f'  {url}: {e.__class__.__name__}, retrying in {delay:.1f}s')
+            else:
+                if resp.status_code not in RETRY_STATUSES:
+                    self.breaker.success(host)
+                    return resp
+                self.breaker.failure(host)
+                if attempt == self.max_retries:
+                    return resp
+                retry_after = retry_after_seconds(resp.headers.get('Retry-After'))
+                delay = min(BACKOFF_MAX, retry_after) if retry_after is not None else self.backoff(attempt)
+                if resp.status_code == 429 or retry_after is not None:
+                    bucket.block(delay)  # Slow every thread down, not just this one
+                logger.info(f'  {url}: HTTP {resp.status_code}, retrying in {delay:.1f}s')
+            self.retries += 1
+            time.sleep(delay)
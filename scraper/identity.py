@@ -0,0 +1,304 @@
+"""
+FilledCard Identity Resolution
+Links scraped competitor names to Dancer profiles.
+
+Names are split robustly ("Smith, John", "Mary Ann Smith", "Anna de la Cruz"),
+every known dancer is put in a blocking index keyed by a phonetic code of the
+last name plus first initial, and a scraped name is only scored against the
+dancers in its block (Jaro-Winkler on first and last name). A candidate only
+counts if its first name passes a strict gate of its own, so "Mary" never
+links to "Mark". Each lookup returns a match decision with a confidence, so
+linking stays near-linear however many dancers exist. Scraped results carry
+no state or studio, so names are all there is to go on. A name that matches
+several dancers equally well is pinned (AmbiguousName table) to the one
+profile an import created for it, so later imports reuse that profile.
+
+Requirements:
+  none beyond the standard library
+
+Usage:
+  python identity.py --check   # verify the pinned match decisions
+"""
+
+import re
+import sys
+import json
+import argparse
+import threading
+import unicodedata
+from typing import Optional
+
+# Decisions at or above this confidence link to the existing profile
+MATCH_THRESHOLD = 0.92
+# Two candidates this close together are indistinguishable
+AMBIGUITY_MARGIN = 0.02
+# First names must agree on their own (same first token, or at least this
+# similar); otherwise a close last name carries "Mary" onto "Mark"
+FIRST_NAME_GATE = 0.97
+
+NAME_SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv'}
+# Lowercase words that start a multi-word last name
+SURNAME_PARTICLES = {'da', 'de', 'del', 'della', 'der', 'di', 'du', 'la', 'le', 'van', 'von', 'st', 'mac'}
+
+SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'), **dict.fromkeys('cgjkqsxz', '2'),
+    **dict.fromkeys('dt', '3'), 'l': '4', **dict.fromkeys('mn', '5'), 'r': '6',
+}
+
+
+def split_name(full_name: str) -> tuple:
+    """Split a scraped full name into (first name, last name).
+
+    "Smith, John" -> ("John", "Smith"); "Mary Ann Smith" -> ("Mary Ann", "Smith");
+    "Anna de la Cruz" -> ("Anna", "de la Cruz"). Suffixes such as Jr. are dropped.
+    """
+    name = ' '.join((full_name or '').split())
+    if ',' in name:
+        last, _, first = name.partition(',')
+        first_parts = [p for p in first.split() if p.lower().strip('.') not in NAME_SUFFIXES]
+        return ' '.join(first_parts), last.strip()
+
+    parts = name.split()
+    while len(parts) > 2 and parts[-1].lower().strip('.') in NAME_SUFFIXES:
+        parts.pop()
+    if len(parts) < 2:
+        return (parts[0] if parts else ''), ''
+
+    start = len(parts) - 1
+    while start > 1 and parts[start - 1].lower() in SURNAME_PARTICLES:
+        start -= 1
+    return ' '.join(parts[:start]), ' '.join(parts[start:])
+
+
+def fold(text: Optional[str]) -> str:
+    """Casefold, strip accents and drop everything but letters and spaces."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).casefold()
+    return ' '.join(re.sub(r'[^a-z ]+', ' ', text).split())
+
+
+def soundex(word: str) -> str:
+    letters = fold(word).replace(' ', '')
+    if not letters:
+        return ''
+    code = letters[0].upper()
+    last = SOUNDEX_CODES.get(letters[0], '')
+    for c in letters[1:]:
+        digit = SOUNDEX_CODES.get(c, '')
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        if c not in 'hw':
+            last = digit
+    return code.ljust(4, '0')
+
+
+def block_key(first_name: str, last_name: str) -> str:
+    """Blocking key: Soundex of the last name plus first initial."""
+    first = fold(first_name)
+    return f'{soundex(last_name)}{first[:1]}'
+
+
+def jaro_winkler(a: str, b: str) -> float:
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+
+    window = max(len(a), len(b)) // 2 - 1
+    a_matched = [False] * len(a)
+    b_matched = [False] * len(b)
+    matches = 0
+    for i, c in enumerate(a):
+        for j in range(max(0, i - window), min(len(b), i + window + 1)):
+            if not b_matched[j] and b[j] == c:
+                a_matched[i] = b_matched[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+
+    b_chars = [c for c, m in zip(b, b_matched) if m]
+    a_chars = [c for c, m in zip(a, a_matched) if m]
+    transpositions = sum(x != y for x, y in zip(a_chars, b_chars)) / 2
+    jaro = (matches / len(a) + matches / len(b) + (matches - transpositions) / matches) / 3
+
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * 0.1 * (1 - jaro)
+
+
+class IdentityIndex:
+    """In-memory blocking index of dancers, built once per import.
+
+    `resolve` returns a decision dict: {'dancerId', 'confidence', 'decision'}
+    where decision is 'match', 'ambiguous' (several equally good candidates,
+    so none of them is linked) or 'new' (no candidate good enough). dancerId
+    is None unless the decision is 'match', or 'ambiguous' for a name pinned
+    to its own profile with `pin`.
+    """
+
+    def __init__(self):
+        self.blocks = {}
+        self.pinned = {}
+        self.size = 0
+        # Parallel import workers add dancers to one shared index; each block
+        # belongs to a single worker, so lookups need no lock
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, conn, source: str = 'O2CM') -> 'IdentityIndex':
+        """Index every Dancer, oldest first, and the ambiguous names `source` imports pinned."""
+        index = cls()
+        with conn.cursor(name='identity_index') as cur:
+            cur.itersize = 10000
+            cur.execute('''
+                SELECT id, "firstName", "lastName"
+                FROM "Dancer"
+                ORDER BY "createdAt", id
+            ''')
+            for dancer_id, first_name, last_name in cur:
+                index.add(dancer_id, first_name, last_name)
+        with conn.cursor() as cur:
+            cur.execute('''
+                SELECT "dancerId", "firstName", "lastName" FROM "AmbiguousName" WHERE source = %s
+            ''', (source,))
+            for dancer_id, first_name, last_name in cur.fetchall():
+                index.pin(dancer_id, first_name, last_name)
+        return index
+
+    def add(self, dancer_id: str, first_name: str, last_name: str):
+        first = fold(first_name)
+        entry = (dancer_id, first, first.split(' ', 1)[0], fold(last_name))
+        with self._lock:
+            self.blocks.setdefault(block_key(first_name, last_name), []).append(entry)
+            self.size += 1
+
+    def pin(self, dancer_id: str, first_name: str, last_name: str):
+        """Resolve this name to `dancer_id` whenever it is ambiguous."""
+        with self._lock:
+            self.pinned[(fold(first_name), fold(last_name))] = dancer_id
+
+    def resolve(self, first_name: str, last_name: str) -> dict:
+        first = fold(first_name)
+        first_token = first.split(' ', 1)[0]
+        last = fold(last_name)
+
+        scored = []
+        for dancer_id, c_first, c_first_token, c_last in self.blocks.get(block_key(first_name, last_name), ()):
+            # "Mary Ann" vs "Mary" is the same first name; "Danielle" vs "Daniel" is not
+            first_score = jaro_winkler(first, c_first)
+            if first_token != c_first_token and first_score < FIRST_NAME_GATE:
+                continue
+            score = 0.6 * jaro_winkler(last, c_last) + 0.4 * max(first_score, jaro_winkler(first_token, c_first_token) - 0.02)
+            scored.append((min(score, 1.0), dancer_id))
+
+        if not scored:
+            return {'dancerId': None, 'confidence': 0.0, 'decision': 'new'}
+
+        scored.sort(key=lambda s: -s[0])
+        best, dancer_id = scored[0]
+        if best < MATCH_THRESHOLD:
+            return {'dancerId': None, 'confidence': round(best, 3), 'decision': 'new'}
+        if len(scored) > 1 and best - scored[1][0] < AMBIGUITY_MARGIN:
+            # Linking either one could pin results on the wrong person; the decision log flags it for review.
+            # The profile created for this name the first time it was ambiguous (if any) takes them instead
+            return {'dancerId': self.pinned.get((first, last)), 'confidence': round(best - AMBIGUITY_MARGIN, 3),
+                    'decision': 'ambiguous'}
+        return {'dancerId': dancer_id, 'confidence': round(best, 3), 'decision': 'match'}
+
+
+class DecisionLog:
+    """JSONL audit trail of every non-exact decision (fuzzy or ambiguous links), plus per-decision counts."""
+
+    def __init__(self, path):
+        self.path = path
+        self.counts = {'match': 0, 'ambiguous': 0, 'new': 0}
+        self._file = None
+        # Parallel import workers share one log
+        self._lock = threading.Lock()
+
+    def write(self, name: str, decision: dict):
+        with self._lock:
+            self.counts[decision['decision']] += 1
+            if decision['decision'] == 'new' or decision['confidence'] >= 1.0:
+                return
+            if self._file is None:
+                self.path.parent.mkdir(exist_ok=True)
+                self._file = open(self.path, 'w')
+            self._file.write(json.dumps({'name': name, **decision}) + '\n')
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# (known dancers, oldest first; scraped name; expected decision; index of the expected dancer or None)
+CHECK_CASES = [
+    (['John Smith'], 'John Smith', 'match', 0),
+    (['John Smith'], 'Smith, John', 'match', 0),
+    (['John Smith'], 'John Smyth', 'match', 0),
+    (['Mary Smith'], 'Mary Ann Smith', 'match', 0),
+    (['Anna de la Cruz'], 'Anna De La Cruz', 'match', 0),
+    (['Mark Smith'], 'Mary Smith', 'new', None),
+    (['Daniel Lee'], 'Danielle Lee', 'new', None),
+    (['Mark Smith', 'Mary Smith'], 'Mary Smith', 'match', 1),
+    (['John Smith', 'John Smith'], 'John Smith', 'ambiguous', None),
+    (['John Smith'], 'Jane Smith', 'new', None),
+    (['John Smith'], 'John Jones', 'new', None),
+    ([], 'John Smith', 'new', None),
+]
+# (known dancers, index of the dancer pinned to the scraped name, scraped name)
+AMBIGUOUS_CHECK_CASES = [
+    (['John Smith', 'John Smith', 'John Smith'], 2, 'John Smith'),
+    (['John Smith', 'John Smith', 'John Smith'], 2, 'Smith, John'),
+]
+
+
+def check() -> list:
+    """Failures of CHECK_CASES as readable lines (empty when all pass)."""
+    failures = []
+    for known, name, expected, expected_index in CHECK_CASES:
+        index = IdentityIndex()
+        for i, known_name in enumerate(known):
+            index.add(str(i), *split_name(known_name))
+        decision = index.resolve(*split_name(name))
+        expected_id = None if expected_index is None else str(expected_index)
+        if decision['decision'] != expected or decision['dancerId'] != expected_id:
+            failures.append(f'{name!r} against {known!r} = {decision!r}, expected {expected} of {expected_id!r}')
+    for known, pinned_index, name in AMBIGUOUS_CHECK_CASES:
+        index = IdentityIndex()
+        for i, known_name in enumerate(known):
+            index.add(str(i), *split_name(known_name))
+        index.pin(str(pinned_index), *split_name(known[pinned_index]))
+        decision = index.resolve(*split_name(name))
+        if decision['decision'] != 'ambiguous' or decision['dancerId'] != str(pinned_index):
+            failures.append(f'{name!r} pinned to {pinned_index} = {decision!r}, expected ambiguous of {pinned_index!r}')
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resolve scraped competitor names to Dancer profiles')
+    parser.add_argument('--check', action='store_true',
+                        help='Verify the pinned match decisions; exits non-zero on a mismatch')
+    args = parser.parse_args()
+    if not args.check:
+        parser.print_help()
+        return
+
+    failures = check()
+    for line in failures:
+        print(f'  {line}')
+    if failures:
+        print(f'\n❌ {len(failures)} identity check(s) failed')
+        sys.exit(1)
+    print(f'✅ {len(CHECK_CASES) + len(AMBIGUOUS_CHECK_CASES)} pinned match decisions OK')
+
+
+if __name__ == '__main__':
+    main()
@@ -7,8 +7,15 @@ Requirements:
 
 Usage:
   python import_to_db.py
-  python import_to_db.py --ndca-only
-  python import_to_db.py --o2cm-only
+  python import_to_db.py --only ndca
+  python import_to_db.py --only o2cm
+  python import_to_db.py --bulk          # set-based bulk import for large files
+  python import_to_db.py --jsonl         # stream the .jsonl scraper output in chunks
+  python import_to_db.py --only ndca --upsert   # refresh changed NDCA dancers instead of skipping them
+  python import_to_db.py --workers 4     # bulk import on 4 pooled connections, partitioned by dancer name
+  python import_to_db.py --dedupe-o2cm   # collapse duplicate O2CM results, re-key to stable IDs
+  python import_to_db.py --fix-o2cm-styles  # move heat categories out of the O2CM style column
+  python import_to_db.py --refresh-stats # recompute DancerStats for every dancer with results
 """
 
 import json
@@ -17,8 +24,20 @@ import argparse
 import os
 import sys
 import re
+import uuid
+import zlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import groupby
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
+
+from identity import IdentityIndex, DecisionLog, block_key, split_name
+from metrics import METRICS, counting_connection
+from normalize import style_level, result_style_level, result_style_levels
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
 logger = logging.getLogger(__name__)
@@ -26,42 +45,57 @@ logger = logging.getLogger(__name__)
 OUTPUT_DIR = Path(__file__).parent / 'output'
 NDCA_FILE = OUTPUT_DIR / 'ndca_dancers.json'
 O2CM_FILE = OUTPUT_DIR / 'o2cm_results.json'
+NDCA_JSONL_FILE = OUTPUT_DIR / 'ndca_dancers.jsonl'
+O2CM_JSONL_FILE = OUTPUT_DIR / 'o2cm_results.jsonl'
+
+# Rows per round trip when staging data with execute_values
+BULK_PAGE_SIZE = 1000
+# Rows committed together; a failure only ever loses the row (or bulk chunk) that caused it
+CHUNK_SIZE = 1000
+REJECTS_FILE = OUTPUT_DIR / 'import_rejects.jsonl'
+DECISIONS_FILE = OUTPUT_DIR / 'identity_decisions.jsonl'
+REPORT_FILE = OUTPUT_DIR / 'import_report.json'
+# Dancers whose DancerStats row is recomputed per statement
+STATS_BATCH_SIZE = 5000
+# Timestamps are written as NOW() AT TIME ZONE 'UTC': Prisma's DateTime columns hold UTC
+# without a zone, and match_scores.py compares "updatedAt" against a UTC clock
+
+
+def new_id() -> str:
+    """Generate a 25-char id in the same shape as the rest of the importer."""
+    return str(uuid.uuid4()).replace('-', '')[:25]
+
+def placeholder_email(first_name: str, last_name: str, dancer_id: str) -> str:
+    """Unique no-reply address for an unclaimed profile."""
+    parts = [re.sub(r'[^a-z0-9]+', '', part.lower()) for part in (first_name, last_name)]
+    return '.'.join([part for part in parts if part] + [dancer_id[:6]]) + '@noreply.filledcard.com'
+
+
+def database_url() -> str:
+    """DATABASE_URL from the environment or the project's .env.local."""
+    from dotenv import load_dotenv
+
+    # Load .env.local from project root (one level up from scraper/)
+    env_file = Path(__file__).parent.parent / '.env.local'
+    if env_file.exists():
+        load_dotenv(env_file)
+    else:
+        load_dotenv()
+
+    db_url = os.environ.get('DATABASE_URL')
+    if not db_url:
+        logger.error('DATABASE_URL not found in environment variables')
+        sys.exit(1)
+    return db_url
 
-STYLE_TO_CATEGORY = {
-    'WALTZ': 'STANDARD',
-    'TANGO': 'STANDARD',
-    'FOXTROT': 'SMOOTH',
-    'VIENNESE_WALTZ': 'STANDARD',
-    'QUICKSTEP': 'STANDARD',
-    'CHA_CHA': 'RHYTHM',
-    'SAMBA': 'LATIN',
-    'RUMBA': 'RHYTHM',
-    'PASO_DOBLE': 'LATIN',
-    'JIVE': 'LATIN',
-    'BOLERO': 'RHYTHM',
-    'MAMBO': 'RHYTHM',
-    'WEST_COAST_SWING': 'RHYTHM',
-}
 
 def get_db_connection():
     """Get PostgreSQL connection from DATABASE_URL env var."""
     try:
         import psycopg2
-        from dotenv import load_dotenv
 
-        # Load .env.local from project root (one level up from scraper/)
-        env_file = Path(__file__).parent.parent / '.env.local'
-        if env_file.exists():
-            load_dotenv(env_file)
-        else:
-            load_dotenv()
-
-        db_url = os.environ.get('DATABASE_URL')
-        if not db_url:
-            logger.error('DATABASE_URL not found in environment variables')
-            sys.exit(1)
-
-        conn = psycopg2.connect(db_url)
+        # Every statement and commit is counted and timed for the run report
+        conn = psycopg2.connect(database_url(), connection_factory=counting_connection())
         logger.info('Connected to PostgreSQL')
         return conn
     except ImportError:
@@ -69,49 +103,110 @@ def get_db_connection():
         sys.exit(1)
 
 
-def normalize_style_name(raw_style: str) -> str:
-    """Convert human-readable style name to enum value."""
-    mapping = {
-        'waltz': 'WALTZ',
-        'tango': 'TANGO',
-        'foxtrot': 'FOXTROT',
-        'viennese waltz': 'VIENNESE_WALTZ',
-        'viennese': 'VIENNESE_WALTZ',
-        'quickstep': 'QUICKSTEP',
-        'cha cha': 'CHA_CHA',
-        'cha-cha': 'CHA_CHA',
-        'samba': 'SAMBA',
-        'rumba': 'RUMBA',
-        'paso doble': 'PASO_DOBLE',
-        'paso': 'PASO_DOBLE',
-        'jive': 'JIVE',
-        'bolero': 'BOLERO',
-        'mambo': 'MAMBO',
-        'west coast swing': 'WEST_COAST_SWING',
-        'wcs': 'WEST_COAST_SWING',
-    }
-    return mapping.get(raw_style.lower().strip(), raw_style.upper().replace(' ', '_'))
-
-
-def normalize_level(raw_level: str) -> str:
-    """Convert human-readable level to enum value."""
-    mapping = {
-        'newcomer': 'NEWCOMER',
-        'bronze': 'BRONZE',
-        'silver': 'SILVER',
-        'gold': 'GOLD',
-        'novice': 'NOVICE',
-        'pre-championship': 'PRE_CHAMP',
-        'pre championship': 'PRE_CHAMP',
-        'pre-champ': 'PRE_CHAMP',
-        'championship': 'CHAMPIONSHIP',
-        'champ': 'CHAMPIONSHIP',
-    }
-    return mapping.get(raw_level.lower().strip(), 'BRONZE')
+def get_connection_pool(size: int):
+    """Thread-safe pool of up to `size` counted connections to DATABASE_URL."""
+    try:
+        from psycopg2.pool import ThreadedConnectionPool
+
+        pool = ThreadedConnectionPool(1, size, database_url(), connection_factory=counting_connection())
+        logger.info(f'Connected to PostgreSQL (pool of {size})')
+        return pool
+    except ImportError:
+        logger.error('psycopg2 not installed. Run: pip install psycopg2-binary python-dotenv')
+        sys.exit(1)
 
 
-def import_ndca_dancers(conn, dancers: list) -> dict:
-    """Import NDCA dancer profiles."""
+@contextmanager
+def pooled(pool):
+    """Borrow a connection from the pool for the duration of the block."""
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+
+def iter_jsonl_chunks(path: Path, chunk_size: int):
+    """Stream a JSONL file as lists of at most `chunk_size` records."""
+    chunk = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            chunk.append(json.loads(line))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_file(conn, path: Path, import_fn, jsonl: bool = False, chunk_size: int = CHUNK_SIZE,
+                rejects: Optional['DeadLetterFile'] = None) -> dict:
+    """Run an import function over a scraper output file.
+
+    A JSON array is loaded whole; a JSONL file is streamed in chunks of
+    `chunk_size` records so memory stays flat however large the file is.
+    """
+    if not jsonl:
+        with METRICS.stage('read'), open(path) as f:
+            records = json.load(f)
+        with METRICS.stage('import'):
+            return import_fn(conn, records, chunk_size, rejects)
+
+    total = {}
+    chunks = iter_jsonl_chunks(path, chunk_size)
+    while True:
+        with METRICS.stage('read'):
+            chunk = next(chunks, None)
+        if chunk is None:
+            break
+        with METRICS.stage('import'):
+            stats = import_fn(conn, chunk, chunk_size, rejects)
+        for key, value in stats.items():
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+class DeadLetterFile:
+    """Append-only JSONL file of rows the importer rejected, with the error for each."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.count = 0
+        self._file = None
+        # Parallel import workers share one file
+        self._lock = threading.Lock()
+
+    def write(self, source: str, record: dict, error: Exception):
+        line = json.dumps({
+            'source': source,
+            'error': str(error).strip(),
+            'rejectedAt': datetime.now().isoformat(timespec='seconds'),
+            'record': record,
+        }, default=str) + '\n'
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(exist_ok=True)
+                self._file = open(self.path, 'a')
+            self._file.write(line)
+            self._file.flush()
+            self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def import_ndca_dancers(conn, dancers: list, chunk_size: int = CHUNK_SIZE,
+                        rejects: Optional[DeadLetterFile] = None) -> dict:
+    """Import NDCA dancer profiles.
+
+    Each dancer runs inside its own SAVEPOINT, so a bad row is rolled back on
+    its own and written to `rejects`; everything else is committed every
+    `chunk_size` dancers.
+    """
     cur = conn.cursor()
     inserted = 0
     skipped = 0
@@ -119,7 +214,11 @@ def import_ndca_dancers(conn, dancers: list) -> dict:
 
     logger.info(f'Importing {len(dancers)} NDCA dancers...')
 
-    for dancer in dancers:
+    for i, dancer in enumerate(dancers):
+        if i and i % chunk_size == 0:
+            conn.commit()
+            logger.info(f'  {i}/{len(dancers)} dancers processed')
+
         first_name = dancer.get('firstName', '').strip()
         last_name = dancer.get('lastName', '').strip()
 
@@ -127,6 +226,7 @@ def import_ndca_dancers(conn, dancers: list) -> dict:
             skipped += 1
             continue
 
+        cur.execute('SAVEPOINT ndca_row')
         try:
             # Check for duplicate by name + state
             cur.execute(
@@ -140,10 +240,9 @@ def import_ndca_dancers(conn, dancers: list) -> dict:
                 continue
 
             # Insert dancer
-            import uuid
-            dancer_id = str(uuid.uuid4()).replace('-', '')[:25]
+            dancer_id = new_id()
 
-            email = f"{first_name.lower()}.{last_name.lower()}.{dancer_id[:6]}@noreply.filledcard.com"
+            email = placeholder_email(first_name, last_name, dancer_id)
 
             cur.execute('''
                 INSERT INTO "Dancer" (
@@ -155,7 +254,7 @@ def import_ndca_dancers(conn, dancers: list) -> dict:
                     %s, %s, %s, %s, false, false,
                     false, false, 'OPEN_TO_INQUIRIES',
                     %s, %s, %s,
-                    '{}', NOW(), NOW()
+                    '{}', NOW() AT TIME ZONE 'UTC', NOW() AT TIME ZONE 'UTC'
                 )
             ''', (
                 dancer_id,
@@ -169,186 +268,1541 @@ def import_ndca_dancers(conn, dancers: list) -> dict:
 
             # Insert dance styles
             for style_info in dancer.get('styles', []):
-                style = normalize_style_name(style_info.get('style', style_info) if isinstance(style_info, dict) else style_info)
-                level = normalize_level(style_info.get('level', 'BRONZE') if isinstance(style_info, dict) else 'BRONZE')
-                category = STYLE_TO_CATEGORY.get(style, 'STANDARD')
+                style, category, level = style_level(style_info)
 
-                style_id = str(uuid.uuid4()).replace('-', '')[:25]
+                style_id = new_id()
+                cur.execute('SAVEPOINT ndca_style')
                 try:
                     cur.execute('''
                         INSERT INTO "DanceStyle" (id, "dancerId", style, category, level, "isCompeting", "wantsToCompete")
                         VALUES (%s, %s, %s, %s, %s, false, false)
                         ON CONFLICT ("dancerId", style) DO NOTHING
                     ''', (style_id, dancer_id, style, category, level))
-                except Exception:
-                    pass  # Skip invalid style
+                except Exception as e:
+                    # Skip invalid style without aborting the dancer
+                    logger.debug(f'Skipping style {style} for {first_name} {last_name}: {e}')
+                    cur.execute('ROLLBACK TO SAVEPOINT ndca_style')
+                cur.execute('RELEASE SAVEPOINT ndca_style')
 
             inserted += 1
 
         except Exception as e:
             logger.error(f'Error inserting {first_name} {last_name}: {e}')
             errors += 1
+            cur.execute('ROLLBACK TO SAVEPOINT ndca_row')
+            if rejects:
+                rejects.write('ndca', dancer, e)
+        finally:
+            cur.execute('RELEASE SAVEPOINT ndca_row')
+
+    conn.commit()
+    cur.close()
+
+    return {'inserted': inserted, 'skipped': skipped, 'errors': errors}
+
+
+def import_ndca_dancers_bulk(conn, dancers: list, chunk_size: int = CHUNK_SIZE,
+                             rejects: Optional[DeadLetterFile] = None) -> dict:
+    """Import NDCA dancer profiles with set-based SQL instead of per-row round trips.
+
+    Each chunk of dancers and styles is staged into temp tables with
+    execute_values, then the new dancers are inserted with a single
+    INSERT ... SELECT that skips anyone already present by first name, last
+    name and state, and their styles are loaded the same way. Chunks commit
+    independently; a chunk that fails is rolled back and written to `rejects`.
+    Reports the same stats as import_ndca_dancers.
+    """
+    from psycopg2.extras import execute_values
+
+    cur = conn.cursor()
+    inserted = 0
+    skipped = 0
+    errors = 0
+
+    logger.info(f'Bulk importing {len(dancers)} NDCA dancers...')
+
+    for start in range(0, len(dancers), chunk_size):
+        chunk = dancers[start:start + chunk_size]
+
+        with METRICS.stage('normalize'):
+            dancer_rows = []
+            style_rows = []
+            for seq, dancer in enumerate(chunk):
+                first_name = dancer.get('firstName', '').strip()
+                last_name = dancer.get('lastName', '').strip()
+
+                if not first_name or not last_name:
+                    skipped += 1
+                    continue
+
+                dancer_id = new_id()
+                email = placeholder_email(first_name, last_name, dancer_id)
+                dancer_rows.append((
+                    seq, dancer_id, email, first_name, last_name,
+                    dancer.get('state'), dancer.get('studio'), dancer.get('ndcaId'),
+                ))
+
+                for style_info in dancer.get('styles', []):
+                    style_rows.append((new_id(), dancer_id, *style_level(style_info)))
+
+        try:
+            cur.execute('''
+                CREATE TEMP TABLE ndca_stage (
+                    seq INT, id TEXT, email TEXT, first_name TEXT, last_name TEXT,
+                    state TEXT, studio TEXT, ndca_id TEXT
+                ) ON COMMIT DROP
+            ''')
+            cur.execute('''
+                CREATE TEMP TABLE ndca_style_stage (
+                    id TEXT, dancer_id TEXT, style TEXT, category TEXT, level TEXT
+                ) ON COMMIT DROP
+            ''')
+            execute_values(cur, 'INSERT INTO ndca_stage VALUES %s', dancer_rows, page_size=BULK_PAGE_SIZE)
+            execute_values(cur, 'INSERT INTO ndca_style_stage VALUES %s', style_rows, page_size=BULK_PAGE_SIZE)
+
+            # Same matching rule as the row-by-row path: a NULL state never matches,
+            # and only the first occurrence of a name + state is kept (earlier
+            # chunks are already in "Dancer").
+            cur.execute('''
+                WITH candidates AS (
+                    SELECT s.*, ROW_NUMBER() OVER (
+                        PARTITION BY s.first_name, s.last_name, s.state ORDER BY s.seq
+                    ) AS rn
+                    FROM ndca_stage s
+                ), inserted AS (
+                    INSERT INTO "Dancer" (
+                        id, email, "firstName", "lastName", "isClaimed", "isTeacher",
+                        "teacherVerified", "openToProAm", "partnerStatus",
+                        state, "studioName", "ndcaId",
+                        "partnershipType", "createdAt", "updatedAt"
+                    )
+                    SELECT
+                        c.id, c.email, c.first_name, c.last_name, false, false,
+                        false, false, 'OPEN_TO_INQUIRIES',
+                        c.state, c.studio, c.ndca_id,
+                        '{}', NOW() AT TIME ZONE 'UTC', NOW() AT TIME ZONE 'UTC'
+                    FROM candidates c
+                    WHERE (c.rn = 1 OR c.state IS NULL)
+                      AND NOT EXISTS (
+                          SELECT 1 FROM "Dancer" d
+                          WHERE d."firstName" = c.first_name
+                            AND d."lastName" = c.last_name
+                            AND d.state = c.state
+                      )
+                    ORDER BY c.seq
+                    ON CONFLICT DO NOTHING
+                    RETURNING 1
+                )
+                SELECT COUNT(*) FROM inserted
+            ''')
+            chunk_inserted = cur.fetchone()[0]
+
+            # Styles only for dancers created above; unknown styles are dropped
+            cur.execute('''
+                INSERT INTO "DanceStyle" (id, "dancerId", style, category, level, "isCompeting", "wantsToCompete")
+                SELECT st.id, st.dancer_id, st.style::"DanceStyleEnum", st.category::"DanceCategory",
+                       st.level::"DanceLevel", false, false
+                FROM ndca_style_stage st
+                JOIN "Dancer" d ON d.id = st.dancer_id
+                WHERE st.style IN (SELECT unnest(enum_range(NULL::"DanceStyleEnum"))::text)
+                ON CONFLICT ("dancerId", style) DO NOTHING
+            ''')
+
+            conn.commit()
+        except Exception as e:
+            logger.error(f'Bulk NDCA chunk at {start} failed: {e}')
             conn.rollback()
+            errors += len(dancer_rows)
+            if rejects:
+                for seq, *_ in dancer_rows:
+                    rejects.write('ndca', chunk[seq], e)
             continue
 
-    conn.commit()
+        inserted += chunk_inserted
+        skipped += len(dancer_rows) - chunk_inserted
+        logger.info(f'  {start + len(chunk)}/{len(dancers)} dancers processed')
+
     cur.close()
 
     return {'inserted': inserted, 'skipped': skipped, 'errors': errors}
 
 
-def import_o2cm_results(conn, results: list) -> dict:
-    """Import O2CM competition results, linking to existing dancers where possible."""
-    import uuid
+def import_ndca_dancers_upsert(conn, dancers: list, chunk_size: int = CHUNK_SIZE,
+                               rejects: Optional[DeadLetterFile] = None) -> dict:
+    """Import NDCA dancer profiles, refreshing dancers already in the database instead of skipping them.
+
+    Each record is matched to a stored dancer by ndcaId, else by first name,
+    last name and state (never to a dancer holding a different ndcaId). New
+    dancers are inserted as in import_ndca_dancers_bulk. Matched unclaimed
+    dancers get their name, state, studio and ndcaId updated, but only if
+    one of them actually changed and never to a missing value, and new
+    styles or changed style levels are written. Claimed profiles belong to
+    their owner: only a missing ndcaId is filled in. Within a chunk the last
+    record for a dancer wins. Stats add 'updated' (dancers with any change);
+    unchanged dancers count as skipped.
+    """
+    from psycopg2.extras import execute_values
+
+    cur = conn.cursor()
+    inserted = 0
+    updated = 0
+    skipped = 0
+    errors = 0
+
+    logger.info(f'Upserting {len(dancers)} NDCA dancers...')
+
+    for start in range(0, len(dancers), chunk_size):
+        chunk = dancers[start:start + chunk_size]
+
+        with METRICS.stage('normalize'):
+            dancer_rows = []
+            style_rows = []
+            for seq, dancer in enumerate(chunk):
+                first_name = dancer.get('firstName', '').strip()
+                last_name = dancer.get('lastName', '').strip()
+
+                if not first_name or not last_name:
+                    skipped += 1
+                    continue
+
+                dancer_id = new_id()
+                email = placeholder_email(first_name, last_name, dancer_id)
+                dancer_rows.append((
+                    seq, dancer_id, email, first_name, last_name,
+                    dancer.get('state'), dancer.get('studio'), dancer.get('ndcaId'),
+                ))
+
+                # One row per style, or the ON CONFLICT DO UPDATE below would hit it twice
+                styles = {}
+                for style_info in dancer.get('styles', []):
+                    style, category, level = style_level(style_info)
+                    styles.setdefault(style, (new_id(), seq, style, category, level))
+                style_rows.extend(styles.values())
+
+        try:
+            cur.execute('''
+                CREATE TEMP TABLE ndca_stage (
+                    seq INT, id TEXT, email TEXT, first_name TEXT, last_name TEXT,
+                    state TEXT, studio TEXT, ndca_id TEXT, match_id TEXT
+                ) ON COMMIT DROP
+            ''')
+            cur.execute('''
+                CREATE TEMP TABLE ndca_style_stage (
+                    id TEXT, seq INT, style TEXT, category TEXT, level TEXT
+                ) ON COMMIT DROP
+            ''')
+            execute_values(cur, 'INSERT INTO ndca_stage VALUES %s', dancer_rows,
+                           template='(%s, %s, %s, %s, %s, %s, %s, %s, NULL)', page_size=BULK_PAGE_SIZE)
+            execute_values(cur, 'INSERT INTO ndca_style_stage VALUES %s', style_rows, page_size=BULK_PAGE_SIZE)
+
+            # Oldest matching dancer wins, as in the identity index
+            cur.execute('''
+                UPDATE ndca_stage s SET match_id = COALESCE(
+                    (SELECT d.id FROM "Dancer" d
+                     WHERE s.ndca_id IS NOT NULL AND d."ndcaId" = s.ndca_id
+                     ORDER BY d."createdAt", d.id LIMIT 1),
+                    (SELECT d.id FROM "Dancer" d
+                     WHERE d."firstName" = s.first_name AND d."lastName" = s.last_name AND d.state = s.state
+                       AND (s.ndca_id IS NULL OR d."ndcaId" IS NULL OR d."ndcaId" = s.ndca_id)
+                     ORDER BY d."createdAt", d.id LIMIT 1)
+                )
+            ''')
+
+            # Keep the last record per matched dancer, and per new name + state (a NULL state never matches)
+            cur.execute('''
+                DELETE FROM ndca_stage WHERE seq IN (
+                    SELECT seq FROM (
+                        SELECT seq, match_id, state, ROW_NUMBER() OVER (
+                            PARTITION BY match_id,
+                                CASE WHEN match_id IS NULL THEN first_name END,
+                                CASE WHEN match_id IS NULL THEN last_name END,
+                                CASE WHEN match_id IS NULL THEN state END
+                            ORDER BY seq DESC
+                        ) AS rn
+                        FROM ndca_stage
+                    ) ranked
+                    WHERE rn > 1 AND (match_id IS NOT NULL OR state IS NOT NULL)
+                )
+            ''')
+
+            cur.execute('''
+                INSERT INTO "Dancer" (
+                    id, email, "firstName", "lastName", "isClaimed", "isTeacher",
+                    "teacherVerified", "openToProAm", "partnerStatus",
+                    state, "studioName", "ndcaId",
+                    "partnershipType", "createdAt", "updatedAt"
+                )
+                SELECT
+                    s.id, s.email, s.first_name, s.last_name, false, false,
+                    false, false, 'OPEN_TO_INQUIRIES',
+                    s.state, s.studio, s.ndca_id,
+                    '{}', NOW() AT TIME ZONE 'UTC', NOW() AT TIME ZONE 'UTC'
+                FROM ndca_stage s
+                WHERE s.match_id IS NULL
+                ORDER BY s.seq
+            ''')
+            chunk_inserted = cur.rowcount
+
+            # A scraped value that is missing never blanks out a stored one
+            cur.execute('''
+                UPDATE "Dancer" d SET
+                    "firstName" = CASE WHEN d."isClaimed" THEN d."firstName" ELSE s.first_name END,
+                    "lastName" = CASE WHEN d."isClaimed" THEN d."lastName" ELSE s.last_name END,
+                    state = CASE WHEN d."isClaimed" THEN d.state ELSE COALESCE(s.state, d.state) END,
+                    "studioName" = CASE WHEN d."isClaimed" THEN d."studioName" ELSE COALESCE(s.studio, d."studioName") END,
+                    "ndcaId" = COALESCE(d."ndcaId", s.ndca_id),
+                    "updatedAt" = NOW() AT TIME ZONE 'UTC'
+                FROM ndca_stage s
+                WHERE d.id = s.match_id
+                  AND (
+                      d."ndcaId" IS NULL AND s.ndca_id IS NOT NULL
+                      OR NOT d."isClaimed" AND (
+                          (d."firstName", d."lastName", d.state, d."studioName", d."ndcaId")
+                          IS DISTINCT FROM
+                          (s.first_name, s.last_name, COALESCE(s.state, d.state),
+                           COALESCE(s.studio, d."studioName"), COALESCE(s.ndca_id, d."ndcaId"))
+                      )
+                  )
+                RETURNING d.id
+            ''')
+            changed = {row[0] for row in cur.fetchall()}
+
+            # Styles of new and unclaimed dancers; unknown styles are dropped and unchanged ones left alone
+            cur.execute('''
+                INSERT INTO "DanceStyle" AS ds (id, "dancerId", style, category, level, "isCompeting", "wantsToCompete")
+                SELECT st.id, d.id, st.style::"DanceStyleEnum", st.category::"DanceCategory",
+                       st.level::"DanceLevel", false, false
+                FROM ndca_style_stage st
+                JOIN ndca_stage s ON s.seq = st.seq
+                JOIN "Dancer" d ON d.id = COALESCE(s.match_id, s.id) AND NOT d."isClaimed"
+                WHERE st.style IN (SELECT unnest(enum_range(NULL::"DanceStyleEnum"))::text)
+                ON CONFLICT ("dancerId", style) DO UPDATE
+                    SET category = EXCLUDED.category, level = EXCLUDED.level
+                    WHERE (ds.category, ds.level) IS DISTINCT FROM (EXCLUDED.category, EXCLUDED.level)
+                RETURNING ds."dancerId"
+            ''')
+            styled = {row[0] for row in cur.fetchall()}
+            cur.execute('SELECT match_id FROM ndca_stage WHERE match_id IS NOT NULL')
+            # New dancers' styles don't make them updated
+            changed |= styled & {row[0] for row in cur.fetchall()}
+
+            conn.commit()
+        except Exception as e:
+            logger.error(f'NDCA upsert chunk at {start} failed: {e}')
+            conn.rollback()
+            errors += len(dancer_rows)
+            if rejects:
+                for seq, *_ in dancer_rows:
+                    rejects.write('ndca', chunk[seq], e)
+            continue
+
+        inserted += chunk_inserted
+        updated += len(changed)
+        skipped += len(dancer_rows) - chunk_inserted - len(changed)
+        logger.info(f'  {start + len(chunk)}/{len(dancers)} dancers processed')
+
+    cur.close()
+
+    return {'inserted': inserted, 'updated': updated, 'skipped': skipped, 'errors': errors}
+
+
+def parse_competition_date(comp_date) -> datetime:
+    """Parse a scraped YYYY-MM-DD date, falling back to now."""
+    try:
+        if isinstance(comp_date, str) and comp_date:
+            return datetime.strptime(comp_date[:10], '%Y-%m-%d')
+    except ValueError:
+        pass
+    return datetime.now()
+
+
+def add_partnership(pairs: dict, dancer_id: str, partner_id: str, competed_at: datetime):
+    """Count one heat danced together into `pairs`, keyed by the sorted dancer id pair."""
+    key = tuple(sorted((dancer_id, partner_id)))
+    if key in pairs:
+        first, last, count = pairs[key]
+        pairs[key] = (min(first, competed_at), max(last, competed_at), count + 1)
+    else:
+        pairs[key] = (competed_at, competed_at, 1)
+
+
+def upsert_partnerships(cur, pairs: dict) -> int:
+    """Fold newly imported heats into the Partnership edge table.
+
+    `pairs` comes from add_partnership and must only cover results inserted
+    in the current transaction: existing edges widen their date range and
+    add the new heats to their count, so the table stays correct without
+    ever rescanning CompetitionResult.
+    """
+    from psycopg2.extras import execute_values
+
+    if not pairs:
+        return 0
+    execute_values(cur, '''
+        INSERT INTO "Partnership" (
+            id, "dancerAId", "dancerBId", "firstCompetedAt", "lastCompetedAt", "eventCount", "updatedAt"
+        ) VALUES %s
+        ON CONFLICT ("dancerAId", "dancerBId") DO UPDATE SET
+            "firstCompetedAt" = LEAST("Partnership"."firstCompetedAt", EXCLUDED."firstCompetedAt"),
+            "lastCompetedAt" = GREATEST("Partnership"."lastCompetedAt", EXCLUDED."lastCompetedAt"),
+            "eventCount" = "Partnership"."eventCount" + EXCLUDED."eventCount",
+            "updatedAt" = NOW() AT TIME ZONE 'UTC'
+    ''', [(new_id(), a, b, first, last, count) for (a, b), (first, last, count) in sorted(pairs.items())],
+        template="(%s, %s, %s, %s, %s, %s, NOW() AT TIME ZONE 'UTC')", page_size=BULK_PAGE_SIZE)
+    return len(pairs)
+
+
+def imported_o2cm_rows(cur, external_ids: list) -> dict:
+    """{externalId: {partnerName: dancerId}} for the O2CM rows already imported under these IDs."""
+    cur.execute(
+        'SELECT "externalId", "partnerName", "dancerId" FROM "CompetitionResult" WHERE source = \'O2CM\' AND "externalId" = ANY(%s)',
+        (external_ids,)
+    )
+    imported = {}
+    for external_id, partner_name, dancer_id in cur.fetchall():
+        imported.setdefault(external_id, {})[partner_name] = dancer_id
+    return imported
+
+
+def imported_slots(rows: dict, result: dict) -> tuple:
+    """(dancer 1's id, dancer 2's id) from `rows` ({partnerName: dancerId}) already imported for this result.
+
+    Each partner's row names the other one as partner, which tells the two
+    apart without resolving names again. None for a partner with no row yet;
+    results imported before partners got rows of their own only have dancer 1's.
+    """
+    dancer2_name = result.get('dancer2Name') or ''
+    # Older imports stored a missing partner as '' instead of NULL
+    dancer1_id = rows.get(dancer2_name or None) or rows.get(dancer2_name)
+    dancer2_id = rows.get(result.get('dancer1Name', '')) if dancer2_name else None
+    return dancer1_id, dancer2_id
+
+
+def update_o2cm_placements(cur, results: list, imported: dict) -> list:
+    """Apply re-scraped placements and field sizes to results already in `imported`.
+
+    Every row of a result (one per partner) gets the corrected values; a
+    missing value never blanks a stored one. Returns the dancerIds of the rows
+    that changed.
+    """
+    from psycopg2.extras import execute_values
+
+    values = {r['externalId']: (r.get('placement'), r.get('totalCompetitors'))
+              for r in results if r.get('externalId') in imported}
+    if not values:
+        return []
+    rows = execute_values(cur, '''
+        UPDATE "CompetitionResult" cr SET
+            placement = COALESCE(v.placement, cr.placement),
+            "totalCompetitors" = COALESCE(v.total, cr."totalCompetitors")
+        FROM (VALUES %s) AS v(external_id, placement, total)
+        WHERE cr.source = 'O2CM' AND cr."externalId" = v.external_id
+          AND (cr.placement IS DISTINCT FROM COALESCE(v.placement, cr.placement)
+               OR cr."totalCompetitors" IS DISTINCT FROM COALESCE(v.total, cr."totalCompetitors"))
+        RETURNING cr."dancerId"
+    ''', [(external_id, *value) for external_id, value in values.items()],
+        template='(%s, %s::integer, %s::integer)', page_size=BULK_PAGE_SIZE, fetch=True)
+    return [row[0] for row in rows]
+
+
+def pin_ambiguous_names(cur, pins: list):
+    """Record the profiles created for ambiguous names ((firstName, lastName, dancerId) each) for later imports."""
+    from psycopg2.extras import execute_values
+
+    execute_values(cur, '''
+        INSERT INTO "AmbiguousName" ("firstName", "lastName", source, "dancerId", "createdAt") VALUES %s
+        ON CONFLICT DO NOTHING
+    ''', pins, template="(%s, %s, 'O2CM', %s, NOW() AT TIME ZONE 'UTC')", page_size=BULK_PAGE_SIZE)
+
+
+def import_o2cm_results(conn, results: list, chunk_size: int = CHUNK_SIZE,
+                        rejects: Optional[DeadLetterFile] = None,
+                        identity: Optional[IdentityIndex] = None,
+                        decisions: Optional[DecisionLog] = None,
+                        touched: Optional[set] = None) -> dict:
+    """Import O2CM competition results, linking to existing dancers where possible.
+
+    Both partners of a couple are resolved against `identity` (loaded from
+    the database when not given; every decision goes to `decisions`), each
+    gets a CompetitionResult and the pair's Partnership edge is updated.
+    A result already imported for only one partner gets the other's row,
+    and an imported result whose placement or field size was corrected has
+    its rows updated ('updated' counts the rows changed). Dancers who got a
+    new or changed result are added to `touched`.
+    Each result runs inside its own SAVEPOINT, so a bad row is rolled back on
+    its own and written to `rejects`; everything else is committed every
+    `chunk_size` results.
+    """
+    if identity is None:
+        identity = IdentityIndex.load(conn)
     cur = conn.cursor()
     inserted = 0
+    updated = 0
     skipped = 0
     linked = 0
+    partnerships = 0
+    errors = 0
+    # Profiles this import created, by name, so an ambiguous name gets one new profile rather than one per row
+    created_ids = {}
+
+    def resolve(full_name: str, created: list):
+        """Dancer id for a scraped name, creating an unclaimed profile if nobody matches.
+
+        The profile created for an ambiguous name is pinned to it, so later
+        imports reuse it instead of creating another.
+        """
+        nonlocal linked
+        first_name, last_name = split_name(full_name)
+        if not first_name:
+            return None
+        ambiguous = False
+        if last_name:
+            # Also the profiles created for this row so far (both partners can carry the same name)
+            dancer_id = created_ids.get((first_name, last_name)) or next(
+                (d for d, first, last, _ in created if (first, last) == (first_name, last_name)), None)
+            if not dancer_id:
+                decision = identity.resolve(first_name, last_name)
+                if decisions:
+                    decisions.write(full_name, decision)
+                dancer_id = decision['dancerId']
+                ambiguous = decision['decision'] == 'ambiguous'
+            if dancer_id:
+                linked += 1
+                return dancer_id
+
+        dancer_id = new_id()
+        cur.execute('''
+            INSERT INTO "Dancer" (
+                id, email, "firstName", "lastName", "isClaimed", "isTeacher",
+                "teacherVerified", "openToProAm", "partnerStatus",
+                "partnershipType", "createdAt", "updatedAt"
+            ) VALUES (
+                %s, %s, %s, %s, false, false,
+                false, false, 'OPEN_TO_INQUIRIES',
+                '{}', NOW() AT TIME ZONE 'UTC', NOW() AT TIME ZONE 'UTC'
+            )
+        ''', (dancer_id, placeholder_email(first_name, last_name, dancer_id), first_name, last_name))
+        if ambiguous:
+            pin_ambiguous_names(cur, [(first_name, last_name, dancer_id)])
+        if last_name:
+            created.append((dancer_id, first_name, last_name, ambiguous))
+        return dancer_id
 
     logger.info(f'Importing {len(results)} O2CM competition results...')
 
-    for result in results:
+    for i, result in enumerate(results):
+        if i and i % chunk_size == 0:
+            conn.commit()
+            logger.info(f'  {i}/{len(results)} results processed')
+
         external_id = result.get('externalId')
+        dancer1_name = result.get('dancer1Name', '')
+        dancer2_name = result.get('dancer2Name') or ''
 
-        # Skip if already imported
-        if external_id:
-            cur.execute('SELECT id FROM "CompetitionResult" WHERE "externalId" = %s AND source = \'O2CM\'', (external_id,))
-            if cur.fetchone():
+        cur.execute('SAVEPOINT o2cm_row')
+        row_linked = linked
+        row_updated = updated
+        try:
+            # Skip if already imported for both partners
+            dancer1_id = dancer2_id = None
+            if external_id:
+                imported = imported_o2cm_rows(cur, [external_id])
+                corrected = update_o2cm_placements(cur, [result], imported)
+                updated += len(corrected)
+                if touched is not None:
+                    touched.update(corrected)
+                dancer1_id, dancer2_id = imported_slots(imported.get(external_id, {}), result)
+                if dancer1_id and (dancer2_id or not dancer2_name):
+                    skipped += 1
+                    continue
+
+            if not dancer1_name:
                 skipped += 1
                 continue
 
-        dancer1_name = result.get('dancer1Name', '')
-        if not dancer1_name:
-            skipped += 1
-            continue
-
-        # Try to find existing dancer profile
-        name_parts = dancer1_name.strip().split(' ', 1)
-        first_name = name_parts[0]
-        last_name = name_parts[1] if len(name_parts) > 1 else ''
+            # Find (or create) both partners' profiles
+            created = []
+            dancer_id = dancer1_id or resolve(dancer1_name, created)
+            if not dancer_id:
+                skipped += 1
+                continue
+            partner_id = (dancer2_id or resolve(dancer2_name, created)) if dancer2_name else None
 
-        dancer_id = None
-        if first_name and last_name:
-            cur.execute(
-                'SELECT id FROM "Dancer" WHERE "firstName" = %s AND "lastName" = %s LIMIT 1',
-                (first_name, last_name)
-            )
-            row = cur.fetchone()
-            if row:
-                dancer_id = row[0]
-                linked += 1
+            comp_date_obj = parse_competition_date(result.get('competitionDate'))
 
-        # If no match, create unclaimed profile
-        if not dancer_id and first_name:
-            dancer_id = str(uuid.uuid4()).replace('-', '')[:25]
-            email = f"{first_name.lower()}.{last_name.lower()}.{dancer_id[:6]}@noreply.filledcard.com"
-            try:
+            entries = []
+            if not dancer1_id:
+                entries.append((dancer_id, dancer2_name or None))
+            if partner_id and partner_id != dancer_id and not dancer2_id:
+                entries.append((partner_id, dancer1_name))
+            if not entries:
+                skipped += 1
+                continue
+            for entry_dancer_id, partner_name in entries:
                 cur.execute('''
-                    INSERT INTO "Dancer" (
-                        id, email, "firstName", "lastName", "isClaimed", "isTeacher",
-                        "teacherVerified", "openToProAm", "partnerStatus",
-                        "partnershipType", "createdAt", "updatedAt"
+                    INSERT INTO "CompetitionResult" (
+                        id, "dancerId", "competitionName", "competitionDate",
+                        location, "partnerName", style, category, level, heat, "ageGroup", division,
+                        placement, "totalCompetitors", source, "externalId", "createdAt"
                     ) VALUES (
-                        %s, %s, %s, %s, false, false,
-                        false, false, 'OPEN_TO_INQUIRIES',
-                        '{}', NOW(), NOW()
+                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'O2CM', %s, NOW() AT TIME ZONE 'UTC'
                     )
-                ''', (dancer_id, email, first_name, last_name))
-            except Exception as e:
-                logger.debug(f'Could not create dancer for {dancer1_name}: {e}')
-                dancer_id = None
+                ''', (
+                    new_id(),
+                    entry_dancer_id,
+                    result.get('competitionName', 'Unknown Competition'),
+                    comp_date_obj,
+                    result.get('location'),
+                    partner_name,
+                    *result_style_level(result),
+                    result.get('heat'),
+                    result.get('ageGroup'),
+                    result.get('division'),
+                    result.get('placement'),
+                    result.get('totalCompetitors'),
+                    external_id,
+                ))
+            if partner_id and partner_id != dancer_id:
+                pairs = {}
+                add_partnership(pairs, dancer_id, partner_id, comp_date_obj)
+                partnerships += upsert_partnerships(cur, pairs)
 
-        if not dancer_id:
-            skipped += 1
-            continue
+            inserted += len(entries)
+            for new_dancer_id, first_name, last_name, ambiguous in created:
+                identity.add(new_dancer_id, first_name, last_name)
+                if ambiguous:
+                    identity.pin(new_dancer_id, first_name, last_name)
+                created_ids[(first_name, last_name)] = new_dancer_id
+            if touched is not None:
+                touched.update(entry_dancer_id for entry_dancer_id, _ in entries)
+        except Exception as e:
+            logger.error(f'Error inserting result for {dancer1_name}: {e}')
+            errors += 1
+            linked = row_linked
+            updated = row_updated
+            cur.execute('ROLLBACK TO SAVEPOINT o2cm_row')
+            if rejects:
+                rejects.write('o2cm', result, e)
+        finally:
+            cur.execute('RELEASE SAVEPOINT o2cm_row')
+
+    conn.commit()
+    cur.close()
+
+    return {'inserted': inserted, 'updated': updated, 'skipped': skipped, 'linked': linked,
+            'partnerships': partnerships, 'errors': errors}
+
+
+def import_o2cm_results_bulk(conn, results: list, chunk_size: int = CHUNK_SIZE,
+                             rejects: Optional[DeadLetterFile] = None,
+                             identity: Optional[IdentityIndex] = None,
+                             decisions: Optional[DecisionLog] = None,
+                             touched: Optional[set] = None) -> dict:
+    """Import O2CM competition results in batches instead of four round trips per row.
+
+    Each chunk costs one query for already-imported externalIds, one batched
+    insert of new unclaimed dancers, one batched result insert with
+    ON CONFLICT DO NOTHING and one batched Partnership upsert; both partners'
+    names are resolved in memory against `identity`. Chunks commit
+    independently; a chunk that fails is rolled back and written to
+    `rejects`. Linking, backfilling a missing partner's row, placement
+    corrections and stats follow import_o2cm_results.
+    """
+    from psycopg2.extras import execute_values
+
+    if identity is None:
+        identity = IdentityIndex.load(conn)
+
+    cur = conn.cursor()
+    inserted = 0
+    updated = 0
+    skipped = 0
+    linked = 0
+    partnerships = 0
+    errors = 0
+    name_to_id = {}
+
+    logger.info(f'Bulk importing {len(results)} O2CM competition results...')
+
+    for start in range(0, len(results), chunk_size):
+        chunk = results[start:start + chunk_size]
+        chunk_skipped = 0
+        chunk_linked = 0
+        chunk_names = {}
+        new_dancers = []
+        # (firstName, lastName, dancerId) of the profiles created for ambiguous names
+        new_pins = []
+
+        def resolve(full_name: str) -> Optional[str]:
+            """Dancer id for a scraped name, queueing an unclaimed profile if nobody matches."""
+            nonlocal chunk_linked
+            first_name, last_name = split_name(full_name)
+            if not first_name:
+                return None
+            # Same name resolves the same way for the rest of the import
+            key = (first_name, last_name)
+            ambiguous = False
+            if last_name:
+                dancer_id = chunk_names.get(key) or name_to_id.get(key)
+                if not dancer_id:
+                    decision = identity.resolve(*key)
+                    if decisions:
+                        decisions.write(full_name, decision)
+                    dancer_id = decision['dancerId']
+                    ambiguous = decision['decision'] == 'ambiguous'
+                    if dancer_id:
+                        chunk_names[key] = dancer_id
+                if dancer_id:
+                    chunk_linked += 1
+                    return dancer_id
+
+            # No match: create an unclaimed profile, reused by later rows with the same name
+            dancer_id = new_id()
+            new_dancers.append((dancer_id, placeholder_email(first_name, last_name, dancer_id), first_name, last_name))
+            if ambiguous:
+                new_pins.append((first_name, last_name, dancer_id))
+            if last_name:
+                chunk_names[key] = dancer_id
+            return dancer_id
 
-        # Parse date
-        comp_date = result.get('competitionDate')
         try:
-            if isinstance(comp_date, str) and comp_date:
-                comp_date_obj = datetime.strptime(comp_date[:10], '%Y-%m-%d')
-            else:
-                comp_date_obj = datetime.now()
-        except ValueError:
-            comp_date_obj = datetime.now()
+            # Skip anything already imported for both partners (or repeated within the file)
+            imported = imported_o2cm_rows(cur, [r.get('externalId') for r in chunk if r.get('externalId')])
+            corrected = update_o2cm_placements(cur, chunk, imported)
+            seen_ids = set()
+
+            with METRICS.stage('normalize'):
+                result_rows = []
+                couples = []
+                for result, (style, category, level) in zip(chunk, result_style_levels(chunk)):
+                    external_id = result.get('externalId')
+                    dancer1_name = result.get('dancer1Name', '')
+                    dancer2_name = result.get('dancer2Name') or ''
+                    dancer1_id, dancer2_id = imported_slots(imported.get(external_id, {}), result)
+                    if external_id and (external_id in seen_ids or dancer1_id and (dancer2_id or not dancer2_name)):
+                        chunk_skipped += 1
+                        continue
+
+                    dancer_id = dancer1_id or (resolve(dancer1_name) if dancer1_name else None)
+                    if not dancer_id:
+                        chunk_skipped += 1
+                        continue
+                    partner_id = (dancer2_id or resolve(dancer2_name)) if dancer2_name else None
+
+                    if external_id:
+                        seen_ids.add(external_id)
+                    comp_date_obj = parse_competition_date(result.get('competitionDate'))
+                    entries = []
+                    if not dancer1_id:
+                        entries.append((dancer_id, dancer2_name or None))
+                    if partner_id and partner_id != dancer_id:
+                        if not dancer2_id:
+                            entries.append((partner_id, dancer1_name))
+                        couples.append((external_id, dancer_id, partner_id, comp_date_obj))
+                    if not entries:
+                        chunk_skipped += 1
+                    for entry_dancer_id, partner_name in entries:
+                        result_rows.append((
+                            new_id(),
+                            entry_dancer_id,
+                            result.get('competitionName', 'Unknown Competition'),
+                            comp_date_obj,
+                            result.get('location'),
+                            partner_name,
+                            style,
+                            category,
+                            level,
+                            result.get('heat'),
+                            result.get('ageGroup'),
+                            result.get('division'),
+                            result.get('placement'),
+                            result.get('totalCompetitors'),
+                            external_id,
+                        ))
+
+            execute_values(cur, '''
+                INSERT INTO "Dancer" (
+                    id, email, "firstName", "lastName", "isClaimed", "isTeacher",
+                    "teacherVerified", "openToProAm", "partnerStatus",
+                    "partnershipType", "createdAt", "updatedAt"
+                ) VALUES %s
+            ''', new_dancers,
+                template="(%s, %s, %s, %s, false, false, false, false, 'OPEN_TO_INQUIRIES', '{}', NOW() AT TIME ZONE 'UTC', NOW() AT TIME ZONE 'UTC')",
+                page_size=BULK_PAGE_SIZE)
+            pin_ambiguous_names(cur, new_pins)
+
+            rows = execute_values(cur, '''
+                INSERT INTO "CompetitionResult" (
+                    id, "dancerId", "competitionName", "competitionDate",
+                    location, "partnerName", style, category, level, heat, "ageGroup", division,
+                    placement, "totalCompetitors", source, "externalId", "createdAt"
+                ) VALUES %s
+                ON CONFLICT ("externalId", source, "dancerId") DO NOTHING
+                RETURNING "externalId", "dancerId"
+            ''', result_rows,
+                template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'O2CM', %s, NOW() AT TIME ZONE 'UTC')",
+                page_size=BULK_PAGE_SIZE, fetch=True)
+
+            # Only heats actually inserted just now count towards a partnership
+            inserted_ids = {row[0] for row in rows}
+            pairs = {}
+            for external_id, dancer_id, partner_id, comp_date_obj in couples:
+                if external_id is None or external_id in inserted_ids:
+                    add_partnership(pairs, dancer_id, partner_id, comp_date_obj)
+            chunk_partnerships = upsert_partnerships(cur, pairs)
+
+            conn.commit()
+        except Exception as e:
+            logger.error(f'Bulk O2CM chunk at {start} failed: {e}')
+            conn.rollback()
+            errors += len(chunk)
+            if rejects:
+                for result in chunk:
+                    rejects.write('o2cm', result, e)
+            continue
+
+        # Only remember names (and count the chunk) once it is committed
+        name_to_id.update(chunk_names)
+        for dancer_id, _, first_name, last_name in new_dancers:
+            if last_name:
+                identity.add(dancer_id, first_name, last_name)
+        for first_name, last_name, dancer_id in new_pins:
+            identity.pin(dancer_id, first_name, last_name)
+        if touched is not None:
+            touched.update(row[1] for row in rows)
+            touched.update(corrected)
+        inserted += len(rows)
+        updated += len(corrected)
+        skipped += chunk_skipped + len(result_rows) - len(rows)
+        linked += chunk_linked
+        partnerships += chunk_partnerships
+        logger.info(f'  {start + len(chunk)}/{len(results)} results processed')
+
+    cur.close()
+
+    return {'inserted': inserted, 'updated': updated, 'skipped': skipped, 'linked': linked,
+            'partnerships': partnerships, 'errors': errors}
+
+
+def partition_of(first_name: str, last_name: str, partitions: int) -> int:
+    """Stable worker for a dancer name: a hash of its identity blocking key.
+
+    Every name that could fuzzy-match another (same block) lands on the same
+    worker, so no two workers ever create or link the same dancer.
+    """
+    return zlib.crc32(block_key(first_name, last_name).encode('utf-8')) % partitions
+
+
+def run_partitions(pool, work, partitions: list) -> list:
+    """Run `work(conn, partition)` for every partition in parallel, each on its own pooled connection."""
+    def run(partition):
+        with pooled(pool) as conn:
+            return work(conn, partition)
+
+    if not partitions:
+        return []
+    with ThreadPoolExecutor(max_workers=len(partitions)) as executor:
+        return list(executor.map(run, partitions))
+
+
+def import_ndca_dancers_parallel(conn, dancers: list, chunk_size: int = CHUNK_SIZE,
+                                 rejects: Optional[DeadLetterFile] = None,
+                                 pool=None, workers: int = 2) -> dict:
+    """import_ndca_dancers_bulk over `workers` partitions of the dancers, split by name."""
+    partitions = [[] for _ in range(workers)]
+    for dancer in dancers:
+        first_name = dancer.get('firstName', '').strip()
+        last_name = dancer.get('lastName', '').strip()
+        partitions[partition_of(first_name, last_name, workers)].append(dancer)
+
+    total = {'inserted': 0, 'skipped': 0, 'errors': 0}
+    for stats in run_partitions(pool, lambda c, part: import_ndca_dancers_bulk(c, part, chunk_size, rejects),
+                                [p for p in partitions if p]):
+        for key, value in stats.items():
+            total[key] += value
+    return total
+
+
+def import_o2cm_partition(conn, results: list, rows: list, partition: int, chunk_size: int = CHUNK_SIZE,
+                          rejects: Optional[DeadLetterFile] = None,
+                          identity: Optional[IdentityIndex] = None,
+                          decisions: Optional[DecisionLog] = None) -> dict:
+    """One worker of import_o2cm_results_parallel.
+
+    `rows` holds (index into results, partition of dancer 1, partition of
+    dancer 2) for every result with a dancer in `partition`. Only those
+    dancers are resolved and get result rows here; the Partnership row needs
+    both partners' ids, so it is left to the caller. Returns the usual stats
+    plus 'resolved' ({(index, 1 or 2): dancer id}, committed chunks only),
+    'inserted_results' (indexes with a row inserted) and 'touched'.
+    """
+    from psycopg2.extras import execute_values
+
+    cur = conn.cursor()
+    stats = {'inserted': 0, 'skipped': 0, 'linked': 0, 'errors': 0}
+    resolved = {}
+    inserted_results = set()
+    touched = set()
+    name_to_id = {}
+
+    # Chunk on the same boundaries as the serial import, so a name sees the same earlier names it would there
+    for start, chunk in groupby(rows, key=lambda row: row[0] - row[0] % chunk_size):
+        chunk = list(chunk)
+        chunk_linked = 0
+        chunk_names = {}
+        chunk_resolved = {}
+        new_dancers = []
+        # (firstName, lastName, dancerId) of the profiles created for ambiguous names
+        new_pins = []
+        row_results = []
+
+        def resolve(full_name: str) -> Optional[str]:
+            """Same rules as import_o2cm_results_bulk's resolve."""
+            nonlocal chunk_linked
+            first_name, last_name = split_name(full_name)
+            if not first_name:
+                return None
+            key = (first_name, last_name)
+            ambiguous = False
+            if last_name:
+                dancer_id = chunk_names.get(key) or name_to_id.get(key)
+                if not dancer_id:
+                    decision = identity.resolve(*key)
+                    if decisions:
+                        decisions.write(full_name, decision)
+                    dancer_id = decision['dancerId']
+                    ambiguous = decision['decision'] == 'ambiguous'
+                    if dancer_id:
+                        chunk_names[key] = dancer_id
+                if dancer_id:
+                    chunk_linked += 1
+                    return dancer_id
+
+            dancer_id = new_id()
+            new_dancers.append((dancer_id, placeholder_email(first_name, last_name, dancer_id), first_name, last_name))
+            if ambiguous:
+                new_pins.append((first_name, last_name, dancer_id))
+            if last_name:
+                chunk_names[key] = dancer_id
+            return dancer_id
 
-        result_id = str(uuid.uuid4()).replace('-', '')[:25]
         try:
-            cur.execute('''
+            with METRICS.stage('normalize'):
+                result_rows = []
+                for i, partition1, partition2 in chunk:
+                    result = results[i]
+                    dancer1_name = result['dancer1Name']
+                    dancer2_name = result.get('dancer2Name') or ''
+                    style, category, level = result_style_level(result)
+                    entries = []
+                    dancer_id = None
+                    if partition1 == partition:
+                        dancer_id = resolve(dancer1_name)
+                        chunk_resolved[(i, 1)] = dancer_id
+                        entries.append((dancer_id, dancer2_name or None))
+                    if partition2 == partition:
+                        partner_id = resolve(dancer2_name)
+                        # Both names can only resolve to the same dancer within one block, i.e. one worker
+                        if partner_id and partner_id != dancer_id:
+                            chunk_resolved[(i, 2)] = partner_id
+                            entries.append((partner_id, dancer1_name))
+                    for entry_dancer_id, partner_name in entries:
+                        row_results.append(i)
+                        result_rows.append((
+                            new_id(),
+                            entry_dancer_id,
+                            result.get('competitionName', 'Unknown Competition'),
+                            parse_competition_date(result.get('competitionDate')),
+                            result.get('location'),
+                            partner_name,
+                            style,
+                            category,
+                            level,
+                            result.get('heat'),
+                            result.get('ageGroup'),
+                            result.get('division'),
+                            result.get('placement'),
+                            result.get('totalCompetitors'),
+                            result.get('externalId'),
+                        ))
+
+            execute_values(cur, '''
+                INSERT INTO "Dancer" (
+                    id, email, "firstName", "lastName", "isClaimed", "isTeacher",
+                    "teacherVerified", "openToProAm", "partnerStatus",
+                    "partnershipType", "createdAt", "updatedAt"
+                ) VALUES %s
+            ''', new_dancers,
+                template="(%s, %s, %s, %s, false, false, false, false, 'OPEN_TO_INQUIRIES', '{}', NOW() AT TIME ZONE 'UTC', NOW() AT TIME ZONE 'UTC')",
+                page_size=BULK_PAGE_SIZE)
+            pin_ambiguous_names(cur, new_pins)
+
+            # Row ids are returned so each inserted row can be traced back to its result
+            row_ids = {row[0]: i for row, i in zip(result_rows, row_results)}
+            rows_inserted = execute_values(cur, '''
                 INSERT INTO "CompetitionResult" (
                     id, "dancerId", "competitionName", "competitionDate",
-                    location, "partnerName", style, level,
+                    location, "partnerName", style, category, level, heat, "ageGroup", division,
                     placement, "totalCompetitors", source, "externalId", "createdAt"
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'O2CM', %s, NOW()
-                )
-            ''', (
-                result_id,
-                dancer_id,
-                result.get('competitionName', 'Unknown Competition'),
-                comp_date_obj,
-                result.get('location'),
-                result.get('dancer2Name'),
-                normalize_style_name(result.get('style', 'WALTZ')),
-                normalize_level(result.get('level', 'BRONZE')),
-                result.get('placement'),
-                result.get('totalCompetitors'),
-                external_id,
-            ))
-            inserted += 1
+                ) VALUES %s
+                ON CONFLICT ("externalId", source, "dancerId") DO NOTHING
+                RETURNING id, "dancerId"
+            ''', result_rows,
+                template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'O2CM', %s, NOW() AT TIME ZONE 'UTC')",
+                page_size=BULK_PAGE_SIZE, fetch=True)
+            conn.commit()
         except Exception as e:
-            logger.error(f'Error inserting result: {e}')
+            logger.error(f'Bulk O2CM chunk at {start} of partition {partition} failed: {e}')
             conn.rollback()
-            skipped += 1
+            chunk_results = sorted({i for i, _, _ in chunk})
+            stats['errors'] += len(chunk_results)
+            if rejects:
+                for i in chunk_results:
+                    rejects.write('o2cm', results[i], e)
             continue
 
+        name_to_id.update(chunk_names)
+        for dancer_id, _, first_name, last_name in new_dancers:
+            if last_name:
+                identity.add(dancer_id, first_name, last_name)
+        for first_name, last_name, dancer_id in new_pins:
+            identity.pin(dancer_id, first_name, last_name)
+        resolved.update(chunk_resolved)
+        inserted_results.update(row_ids[row_id] for row_id, _ in rows_inserted)
+        touched.update(dancer_id for _, dancer_id in rows_inserted)
+        stats['inserted'] += len(rows_inserted)
+        stats['skipped'] += len(result_rows) - len(rows_inserted)
+        stats['linked'] += chunk_linked
+
+    cur.close()
+    return {**stats, 'resolved': resolved, 'inserted_results': inserted_results, 'touched': touched}
+
+
+def import_o2cm_results_parallel(conn, results: list, chunk_size: int = CHUNK_SIZE,
+                                 rejects: Optional[DeadLetterFile] = None,
+                                 identity: Optional[IdentityIndex] = None,
+                                 decisions: Optional[DecisionLog] = None,
+                                 touched: Optional[set] = None,
+                                 pool=None, workers: int = 2) -> dict:
+    """Import O2CM results with `workers` threads, each on its own pooled connection.
+
+    Every dancer name is assigned to a worker by partition_of. A result is
+    handed to the workers of both its dancers, and each worker resolves,
+    creates and inserts rows only for its own dancers, so no two workers ever
+    race on the same profile. Two steps run on `conn`, single-threaded:
+    before the workers start, corrected placements are applied to imported
+    results and partners whose row is already imported (or repeated in the
+    file) are filtered out, and afterwards Partnership rows are reconciled
+    from both workers' resolved ids.
+
+    The two partners' rows of a result commit separately, so one can land
+    while the other's chunk fails. The failed partner's row is written to
+    `rejects` with the whole result, and as the filter works per partner, the
+    next import (or a replay of the rejects) adds just that row. Stats match
+    import_o2cm_results_bulk, except that a result whose partners' chunks
+    both fail counts (and is rejected) twice.
+    """
+    if identity is None:
+        identity = IdentityIndex.load(conn)
+
+    cur = conn.cursor()
+    updated = 0
+    skipped = 0
+    seen_ids = set()
+    rows = []
+    # Partners whose row is already imported; their ids still count towards the Partnership
+    resolved = {}
+    for start in range(0, len(results), chunk_size):
+        chunk = results[start:start + chunk_size]
+        imported = imported_o2cm_rows(cur, [r.get('externalId') for r in chunk if r.get('externalId')])
+        corrected = update_o2cm_placements(cur, chunk, imported)
+        conn.commit()
+        updated += len(corrected)
+        if touched is not None:
+            touched.update(corrected)
+        for i, result in enumerate(chunk, start):
+            external_id = result.get('externalId')
+            dancer1_id, dancer2_id = imported_slots(imported.get(external_id, {}), result)
+            dancer1_first, dancer1_last = split_name(result.get('dancer1Name', ''))
+            dancer2_first, dancer2_last = split_name(result.get('dancer2Name') or '')
+            if external_id and (external_id in seen_ids or dancer1_id and (dancer2_id or not dancer2_first)):
+                skipped += 1
+                continue
+            if not dancer1_id and not dancer1_first:
+                skipped += 1
+                continue
+            if external_id:
+                seen_ids.add(external_id)
+            # None: nothing for any worker to do for that partner
+            partition1 = partition_of(dancer1_first, dancer1_last, workers) if not dancer1_id else None
+            partition2 = partition_of(dancer2_first, dancer2_last, workers) if dancer2_first and not dancer2_id else None
+            for slot, dancer_id in ((1, dancer1_id), (2, dancer2_id)):
+                if dancer_id:
+                    resolved[(i, slot)] = dancer_id
+            rows.append((i, partition1, partition2))
+    conn.commit()
+
+    logger.info(f'Parallel importing {len(rows)} O2CM competition results with {workers} workers...')
+    by_partition = {p: [row for row in rows if p in row[1:]] for p in range(workers)}
+    parts = run_partitions(
+        pool,
+        lambda c, p: import_o2cm_partition(c, results, by_partition[p], p, chunk_size, rejects, identity, decisions),
+        [p for p in range(workers) if by_partition[p]],
+    )
+
+    # Reconciliation: partnerships need both partners' ids, which may come from two workers
+    inserted_results = set()
+    for part in parts:
+        resolved.update(part['resolved'])
+        inserted_results |= part['inserted_results']
+        if touched is not None:
+            touched.update(part['touched'])
+    pairs = {}
+    for i, _, _ in rows:
+        dancer_id, partner_id = resolved.get((i, 1)), resolved.get((i, 2))
+        result = results[i]
+        if dancer_id and partner_id and dancer_id != partner_id and (not result.get('externalId') or i in inserted_results):
+            add_partnership(pairs, dancer_id, partner_id, parse_competition_date(result.get('competitionDate')))
+    partnerships = 0
+    pair_items = list(pairs.items())
+    for start in range(0, len(pair_items), chunk_size):
+        partnerships += upsert_partnerships(cur, dict(pair_items[start:start + chunk_size]))
+        conn.commit()
+    cur.close()
+
+    return {
+        'inserted': sum(p['inserted'] for p in parts),
+        'updated': updated,
+        'skipped': skipped + sum(p['skipped'] for p in parts),
+        'linked': sum(p['linked'] for p in parts),
+        'partnerships': partnerships,
+        'errors': sum(p['errors'] for p in parts),
+    }
+
+
+def refresh_dancer_stats(conn, dancer_ids=None) -> int:
+    """Recompute the DancerStats row of each dancer in `dancer_ids` (every dancer with results if None).
+
+    Runs set-based, STATS_BATCH_SIZE dancers per statement and commit.
+    bestPlacements only covers results whose style is a DanceStyleEnum value.
+    Dancers left without results lose their row. Returns the rows written.
+    """
+    cur = conn.cursor()
+    if dancer_ids is None:
+        cur.execute('SELECT DISTINCT "dancerId" FROM "CompetitionResult"')
+        dancer_ids = [row[0] for row in cur.fetchall()]
+    dancer_ids = sorted(dancer_ids)
+
+    logger.info(f'Refreshing competition stats for {len(dancer_ids)} dancers...')
+    refreshed = 0
+    for start in range(0, len(dancer_ids), STATS_BATCH_SIZE):
+        batch = dancer_ids[start:start + STATS_BATCH_SIZE]
+        cur.execute('''
+            WITH res AS (
+                SELECT * FROM "CompetitionResult" WHERE "dancerId" = ANY(%(ids)s)
+            ),
+            totals AS (
+                SELECT "dancerId",
+                       COUNT(*) AS events,
+                       COUNT(DISTINCT ("competitionName", "competitionDate"::date)) AS competitions,
+                       MAX("competitionDate") AS last_competed
+                FROM res
+                GROUP BY "dancerId"
+            ),
+            best AS (
+                SELECT "dancerId", jsonb_object_agg(style, levels) AS placements
+                FROM (
+                    SELECT "dancerId", style, jsonb_object_agg(level, best) AS levels
+                    FROM (
+                        SELECT "dancerId", style, level, MIN(placement) AS best
+                        FROM res
+                        WHERE placement IS NOT NULL
+                          AND style = ANY(enum_range(NULL::"DanceStyleEnum")::text[])
+                        GROUP BY "dancerId", style, level
+                    ) per_level
+                    GROUP BY "dancerId", style
+                ) per_style
+                GROUP BY "dancerId"
+            ),
+            recent_level AS (
+                SELECT res."dancerId", MAX(res.level::"DanceLevel") AS level
+                FROM res
+                JOIN totals USING ("dancerId")
+                WHERE res.level = ANY(enum_range(NULL::"DanceLevel")::text[])
+                  AND res."competitionDate" > totals.last_competed - INTERVAL '1 year'
+                GROUP BY res."dancerId"
+            )
+            INSERT INTO "DancerStats" (
+                "dancerId", "eventsEntered", "competitionsEntered", "bestPlacements",
+                "lastCompetedAt", "levelEstimate", "updatedAt"
+            )
+            SELECT totals."dancerId", totals.events, totals.competitions,
+                   COALESCE(best.placements, '{}'::jsonb), totals.last_competed, recent_level.level, NOW() AT TIME ZONE 'UTC'
+            FROM totals
+            LEFT JOIN best USING ("dancerId")
+            LEFT JOIN recent_level USING ("dancerId")
+            ON CONFLICT ("dancerId") DO UPDATE SET
+                "eventsEntered" = EXCLUDED."eventsEntered",
+                "competitionsEntered" = EXCLUDED."competitionsEntered",
+                "bestPlacements" = EXCLUDED."bestPlacements",
+                "lastCompetedAt" = EXCLUDED."lastCompetedAt",
+                "levelEstimate" = EXCLUDED."levelEstimate",
+                "updatedAt" = NOW() AT TIME ZONE 'UTC'
+        ''', {'ids': batch})
+        refreshed += cur.rowcount
+        cur.execute('''
+            DELETE FROM "DancerStats" s
+            WHERE s."dancerId" = ANY(%s)
+              AND NOT EXISTS (SELECT 1 FROM "CompetitionResult" r WHERE r."dancerId" = s."dancerId")
+        ''', (batch,))
+        conn.commit()
+
+    cur.close()
+    return refreshed
+
+
+def dedupe_o2cm_results(conn, results: Optional[list] = None) -> dict:
+    """Collapse duplicate O2CM results left behind by the old per-process hash IDs.
+
+    Rows for the same dancer, competition and date, heat (title, style,
+    category, level, age group, division), partner and placement are
+    collapsed to the oldest one. Rows with neither a heat title nor a style
+    can't be told apart from a different heat and are left alone. If the
+    current scrape is given, surviving rows of both partners are then
+    re-keyed to its stable externalIds, with names split the way the
+    importers split them, so the next import dedupes against them instead of
+    inserting them again. A scraped result that matches more than one row
+    (or a row that matches more than one result) is not re-keyed.
+    """
+    from psycopg2.extras import execute_values
+
+    cur = conn.cursor()
+
+    logger.info('Collapsing duplicate O2CM competition results...')
+    cur.execute('''
+        DELETE FROM "CompetitionResult" cr
+        USING (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY "dancerId", "competitionName", "competitionDate"::date, heat, style, category, level,
+                             "ageGroup", division, "partnerName", placement
+                ORDER BY "createdAt", id
+            ) AS rn
+            FROM "CompetitionResult"
+            WHERE source = 'O2CM' AND (heat IS NOT NULL OR style IS NOT NULL)
+        ) ranked
+        WHERE cr.id = ranked.id AND ranked.rn > 1
+    ''')
+    deleted = cur.rowcount
+
+    rekeyed = 0
+    if results:
+        logger.info(f'Re-keying surviving rows against {len(results)} scraped results...')
+        cur.execute('''
+            CREATE TEMP TABLE o2cm_rekey (
+                external_id TEXT, competition_name TEXT, competition_date TIMESTAMP, first_name TEXT,
+                last_name TEXT, partner_name TEXT, style TEXT, category TEXT, level TEXT, heat TEXT,
+                age_group TEXT, division TEXT, placement INT
+            ) ON COMMIT DROP
+        ''')
+        rows = []
+        for result in results:
+            if not result.get('externalId'):
+                continue
+            dancer1_name = result.get('dancer1Name', '')
+            dancer2_name = result.get('dancer2Name') or ''
+            # Each partner's row names the other one as partner
+            couple = [(dancer1_name, dancer2_name or None)]
+            if dancer2_name:
+                couple.append((dancer2_name, dancer1_name))
+            for name, partner_name in couple:
+                first_name, last_name = split_name(name)
+                if not first_name or not last_name:
+                    continue
+                rows.append((
+                    result['externalId'],
+                    result.get('competitionName', 'Unknown Competition'),
+                    parse_competition_date(result.get('competitionDate')),
+                    first_name,
+                    last_name,
+                    partner_name,
+                    *result_style_level(result),
+                    result.get('heat'),
+                    result.get('ageGroup'),
+                    result.get('division'),
+                    result.get('placement'),
+                ))
+        execute_values(cur, 'INSERT INTO o2cm_rekey VALUES %s', rows, page_size=BULK_PAGE_SIZE)
+        # Rows imported before heats were stored have no title, category, age group or division; those
+        # columns only rule a match out when the row has them. Rows with no heat or style never match.
+        cur.execute('''
+            WITH candidates AS (
+                SELECT k.external_id, r.id,
+                       COUNT(*) OVER (PARTITION BY k.external_id, r."dancerId") AS per_key,
+                       COUNT(*) OVER (PARTITION BY r.id) AS per_row
+                FROM o2cm_rekey k
+                JOIN "Dancer" d ON d."firstName" = k.first_name AND d."lastName" = k.last_name
+                JOIN "CompetitionResult" r ON r."dancerId" = d.id
+                    AND r.source = 'O2CM'
+                    AND r."competitionName" = k.competition_name
+                    AND r."competitionDate"::date = k.competition_date::date
+                    AND (r.heat IS NOT NULL OR r.style IS NOT NULL)
+                    AND (r.heat IS NULL OR r.heat = k.heat)
+                    AND r.style IS NOT DISTINCT FROM k.style
+                    AND (r.category IS NULL OR r.category::text = k.category)
+                    AND r.level = k.level
+                    AND (r."ageGroup" IS NULL OR r."ageGroup" = k.age_group)
+                    AND (r.division IS NULL OR r.division = k.division)
+                    AND COALESCE(r."partnerName", '') = COALESCE(k.partner_name, '')
+                    AND r.placement IS NOT DISTINCT FROM k.placement
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM "CompetitionResult" x
+                    WHERE x.source = 'O2CM' AND x."externalId" = k.external_id AND x."dancerId" = r."dancerId"
+                )
+                  -- Rows already keyed to a result of this scrape belong to that result
+                  AND NOT EXISTS (SELECT 1 FROM o2cm_rekey y WHERE y.external_id = r."externalId")
+            )
+            UPDATE "CompetitionResult" cr
+            SET "externalId" = candidates.external_id
+            FROM candidates
+            WHERE cr.id = candidates.id AND candidates.per_key = 1 AND candidates.per_row = 1
+        ''')
+        rekeyed = cur.rowcount
+
+    conn.commit()
+    cur.close()
+
+    return {'deleted': deleted, 'rekeyed': rekeyed}
+
+
+def clear_o2cm_category_styles(conn) -> list:
+    """Move heat categories out of the style column of O2CM results imported before it held only dances.
+
+    Multi-dance heats used to store their category (SMOOTH, LATIN, ...) as the
+    style, and unparsed titles UNKNOWN. The category moves to its own column
+    and style becomes NULL. Returns the dancerIds whose rows changed.
+    """
+    cur = conn.cursor()
+    cur.execute('''
+        UPDATE "CompetitionResult" SET
+            category = COALESCE(category, CASE WHEN style = ANY(enum_range(NULL::"DanceCategory")::text[])
+                                               THEN style::"DanceCategory" END),
+            style = NULL
+        WHERE source = 'O2CM'
+          AND (style = 'UNKNOWN' OR style = ANY(enum_range(NULL::"DanceCategory")::text[]))
+        RETURNING "dancerId"
+    ''')
+    dancer_ids = sorted({row[0] for row in cur.fetchall()})
     conn.commit()
     cur.close()
+    return dancer_ids
+
+
+def import_ndca_file(conn, bulk: bool = False, jsonl: bool = False, chunk_size: int = CHUNK_SIZE,
+                     rejects: Optional[DeadLetterFile] = None, pool=None, workers: int = 1,
+                     upsert: bool = False) -> Optional[dict]:
+    """Import the NDCA scraper output; None if the scraper hasn't written it.
+
+    With `workers` > 1 the bulk import is split across that many connections
+    from `pool`. `upsert` refreshes dancers already in the database; it runs
+    on one connection, since a record matched by ndcaId may sit in another
+    name's partition.
+    """
+    ndca_file = NDCA_JSONL_FILE if jsonl else NDCA_FILE
+    if not ndca_file.exists():
+        logger.warning(f'NDCA file not found at {ndca_file}. Run ndca_scraper.py first.')
+        return None
+    if upsert:
+        import_fn = import_ndca_dancers_upsert
+    elif workers > 1:
+        import_fn = partial(import_ndca_dancers_parallel, pool=pool, workers=workers)
+    else:
+        import_fn = import_ndca_dancers_bulk if bulk else import_ndca_dancers
+    stats = import_file(conn, ndca_file, import_fn, jsonl, chunk_size, rejects)
+    updated = f", {stats['updated']} updated" if upsert else ''
+    logger.info(f"NDCA: {stats['inserted']} inserted{updated}, {stats['skipped']} skipped, {stats['errors']} errors")
+    return stats
+
+
+def import_o2cm_file(conn, bulk: bool = False, jsonl: bool = False, chunk_size: int = CHUNK_SIZE,
+                     rejects: Optional[DeadLetterFile] = None, decisions: Optional[DecisionLog] = None,
+                     touched: Optional[set] = None, pool=None, workers: int = 1) -> Optional[dict]:
+    """Import the O2CM scraper output; None if the scraper hasn't written it.
+
+    With `workers` > 1 the bulk import is split across that many connections from `pool`.
+    """
+    o2cm_file = O2CM_JSONL_FILE if jsonl else O2CM_FILE
+    if not o2cm_file.exists():
+        logger.warning(f'O2CM file not found at {o2cm_file}. Run o2cm_scraper.py first.')
+        return None
+    # One blocking index for the whole import, however many chunks the file is read in
+    with METRICS.stage('identity_index'):
+        identity = IdentityIndex.load(conn)
+    logger.info(f'Identity index: {identity.size} dancers in {len(identity.blocks)} blocks')
+    if workers > 1:
+        import_fn = partial(import_o2cm_results_parallel, identity=identity, decisions=decisions, touched=touched,
+                            pool=pool, workers=workers)
+    else:
+        import_fn = partial(import_o2cm_results_bulk if bulk else import_o2cm_results,
+                            identity=identity, decisions=decisions, touched=touched)
+    stats = import_file(conn, o2cm_file, import_fn, jsonl, chunk_size, rejects)
+    logger.info(f"O2CM: {stats['inserted']} inserted, {stats['updated']} updated, {stats['skipped']} skipped, {stats['linked']} linked to existing profiles, {stats['partnerships']} partnerships updated, {stats['errors']} errors")
+    return stats
 
-    return {'inserted': inserted, 'skipped': skipped, 'linked': linked}
+
+# In import order: O2CM names are linked against the dancers NDCA just created
+SOURCES = ('ndca', 'o2cm')
+
+
+def import_source(conn, source: str, bulk: bool = False, jsonl: bool = False, chunk_size: int = CHUNK_SIZE,
+                  rejects: Optional[DeadLetterFile] = None, decisions: Optional[DecisionLog] = None,
+                  touched: Optional[set] = None, pool=None, workers: int = 1,
+                  upsert: bool = False) -> Optional[dict]:
+    """Import one source's scraper output ('ndca' or 'o2cm'); `upsert` only applies to NDCA."""
+    if source == 'ndca':
+        return import_ndca_file(conn, bulk, jsonl, chunk_size, rejects, pool, workers, upsert)
+    return import_o2cm_file(conn, bulk, jsonl, chunk_size, rejects, decisions, touched, pool, workers)
+
+
+def refresh_after_import(conn, touched: set, match_scores: bool = True) -> dict:
+    """Post-import stage: DancerStats for dancers with new results, then the incremental MatchScore refresh."""
+    stats = {}
+    # Only dancers who got new results need their aggregates redone
+    if touched:
+        with METRICS.stage('stats'):
+            stats['stats'] = refresh_dancer_stats(conn, touched)
+
+    if match_scores:
+        try:
+            from match_scores import refresh_match_scores
+        except ImportError as e:
+            logger.warning(f'Skipping match scores ({e}); pip install numpy to enable them.')
+        else:
+            with METRICS.stage('match_scores'):
+                stats['matches'] = refresh_match_scores(conn)
+    return stats
 
 
 def main():
     parser = argparse.ArgumentParser(description='Import scraped data into FilledCard database')
-    parser.add_argument('--ndca-only', action='store_true', help='Only import NDCA dancers')
-    parser.add_argument('--o2cm-only', action='store_true', help='Only import O2CM results')
+    parser.add_argument('--only', choices=SOURCES,
+                        help='Import just this source (default: all, NDCA first)')
+    # Older spellings of --only, kept for existing cron jobs
+    parser.add_argument('--ndca-only', dest='only', action='store_const', const='ndca', help=argparse.SUPPRESS)
+    parser.add_argument('--o2cm-only', dest='only', action='store_const', const='o2cm', help=argparse.SUPPRESS)
+    parser.add_argument('--bulk', action='store_true',
+                        help='Use set-based bulk import instead of row-by-row inserts')
+    parser.add_argument('--jsonl', action='store_true',
+                        help='Read the line-delimited .jsonl scraper output, streaming it in chunks')
+    parser.add_argument('--upsert', action='store_true',
+                        help='Update NDCA dancers already in the database with changed fields instead of skipping them '
+                             '(claimed profiles keep their own details)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help=f'Rows per commit (default: {CHUNK_SIZE})')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Parallel import workers, each on its own connection, partitioned by dancer name; '
+                             'implies --bulk (default: 1)')
+    parser.add_argument('--rejects-file', type=Path, default=REJECTS_FILE,
+                        help=f'JSONL file for rows that fail to import (default: {REJECTS_FILE})')
+    parser.add_argument('--decisions-file', type=Path, default=DECISIONS_FILE,
+                        help=f'JSONL file of fuzzy and ambiguous name matches (default: {DECISIONS_FILE})')
+    parser.add_argument('--dedupe-o2cm', action='store_true',
+                        help='Collapse duplicate O2CM results and re-key them to stable IDs, then exit')
+    parser.add_argument('--fix-o2cm-styles', action='store_true',
+                        help='Move heat categories and UNKNOWN out of the style of older O2CM results, then exit')
+    parser.add_argument('--refresh-stats', action='store_true',
+                        help='Recompute DancerStats for every dancer with results, then exit')
+    parser.add_argument('--no-match-scores', action='store_true',
+                        help='Skip the incremental MatchScore refresh after importing')
+    parser.add_argument('--report', type=Path, default=REPORT_FILE,
+                        help=f'JSON run report with stage timings and counters (default: {REPORT_FILE})')
+    parser.add_argument('--prometheus', type=Path,
+                        help='Also write the run metrics to this Prometheus textfile (node_exporter textfile collector)')
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    if args.workers > 1:
+        args.bulk = True
+
+    METRICS.reset('import')
+    # One connection for the main thread plus one per worker
+    pool = get_connection_pool(args.workers + 1) if args.workers > 1 else None
+    conn = pool.getconn() if pool else get_db_connection()
+
+    if args.dedupe_o2cm:
+        try:
+            o2cm_file = O2CM_JSONL_FILE if args.jsonl else O2CM_FILE
+            o2cm_results = None
+            if o2cm_file.exists() and args.jsonl:
+                o2cm_results = [r for chunk in iter_jsonl_chunks(o2cm_file, args.chunk_size) for r in chunk]
+            elif o2cm_file.exists():
+                with open(o2cm_file) as f:
+                    o2cm_results = json.load(f)
+            else:
+                logger.warning(f'O2CM file not found at {o2cm_file}; collapsing duplicates without re-keying.')
+            stats = dedupe_o2cm_results(conn, o2cm_results)
+        finally:
+            conn.close()
+        print(f"\n✅ O2CM dedupe complete: {stats['deleted']} duplicates removed | {stats['rekeyed']} re-keyed")
+        return
+
+    if args.fix_o2cm_styles:
+        try:
+            dancer_ids = clear_o2cm_category_styles(conn)
+            refreshed = refresh_dancer_stats(conn, dancer_ids) if dancer_ids else 0
+        finally:
+            conn.close()
+        print(f'\n✅ O2CM styles fixed: {len(dancer_ids)} dancers | {refreshed} stats refreshed')
+        return
 
-    conn = get_db_connection()
+    if args.refresh_stats:
+        try:
+            refreshed = refresh_dancer_stats(conn)
+        finally:
+            conn.close()
+        print(f'\n✅ Dancer stats refreshed: {refreshed} dancers')
+        return
 
     total_stats = {}
+    rejects = DeadLetterFile(args.rejects_file)
+    decisions = DecisionLog(args.decisions_file)
+    touched = set()
 
     try:
-        if not args.o2cm_only:
-            if NDCA_FILE.exists():
-                with open(NDCA_FILE) as f:
-                    ndca_dancers = json.load(f)
-                stats = import_ndca_dancers(conn, ndca_dancers)
-                total_stats['ndca'] = stats
-                logger.info(f"NDCA: {stats['inserted']} inserted, {stats['skipped']} skipped, {stats['errors']} errors")
-            else:
-                logger.warning(f'NDCA file not found at {NDCA_FILE}. Run ndca_scraper.py first.')
-
-        if not args.ndca_only:
-            if O2CM_FILE.exists():
-                with open(O2CM_FILE) as f:
-                    o2cm_results = json.load(f)
-                stats = import_o2cm_results(conn, o2cm_results)
-                total_stats['o2cm'] = stats
-                logger.info(f"O2CM: {stats['inserted']} inserted, {stats['skipped']} skipped, {stats['linked']} linked to existing profiles")
-            else:
-                logger.warning(f'O2CM file not found at {O2CM_FILE}. Run o2cm_scraper.py first.')
+        for source in SOURCES:
+            if args.only in (None, source):
+                stats = import_source(conn, source, args.bulk, args.jsonl, args.chunk_size, rejects, decisions, touched,
+                                      pool, args.workers, args.upsert)
+                if stats is not None:
+                    total_stats[source] = stats
 
+        if total_stats:
+            total_stats.update(refresh_after_import(conn, touched, match_scores=not args.no_match_scores))
     finally:
+        rejects.close()
+        decisions.close()
         conn.close()
+        if pool:
+            pool.closeall()
+        METRICS.count('rows', sum(total_stats[k]['inserted'] for k in ('ndca', 'o2cm') if k in total_stats))
+        METRICS.write(args.report, args.prometheus)
 
     print('\n=== Import Summary ===')
     if 'ndca' in total_stats:
         s = total_stats['ndca']
-        print(f"NDCA Dancers: {s['inserted']} inserted | {s['skipped']} skipped | {s['errors']} errors")
+        updated = f" | {s['updated']} updated" if 'updated' in s else ''
+        print(f"NDCA Dancers: {s['inserted']} inserted{updated} | {s['skipped']} skipped | {s['errors']} errors")
     if 'o2cm' in total_stats:
         s = total_stats['o2cm']
-        print(f"O2CM Results: {s['inserted']} inserted | {s['skipped']} skipped | {s['linked']} linked")
+        print(f"O2CM Results: {s['inserted']} inserted | {s['updated']} updated | {s['skipped']} skipped | {s['linked']} linked | {s['partnerships']} partnerships | {s['errors']} errors")
+        c = decisions.counts
+        print(f"Name matching: {c['match']} matched | {c['ambiguous']} ambiguous | {c['new']} new")
+    if 'stats' in total_stats:
+        print(f"Dancer stats: {total_stats['stats']} refreshed")
+    if 'matches' in total_stats:
+        print(f"Match scores: {total_stats['matches']['viewers']} dancers rescored")
+    if rejects.count:
+        print(f'⚠️  {rejects.count} rejected rows written to {rejects.path}')
+    print(f'Run report: {args.report}')
     print('✅ Import complete')
 
 
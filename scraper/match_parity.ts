@@ -0,0 +1,11 @@
+// Scores dancer pairs with src/lib/matching.ts for `match_scores.py --parity`.
+// Reads [[dancer1, dancer2], ...] as JSON on stdin and writes the MatchResult of each pair to stdout.
+import { calculateMatchScore } from '../src/lib/matching'
+
+let input = ''
+process.stdin.setEncoding('utf8')
+process.stdin.on('data', chunk => { input += chunk })
+process.stdin.on('end', () => {
+  const pairs = JSON.parse(input) as [any, any][]
+  process.stdout.write(JSON.stringify(pairs.map(([d1, d2]) => calculateMatchScore(d1, d2))))
+})
@@ -0,0 +1,749 @@
+"""
+FilledCard Match Score Precomputation
+Scores dancer pairs with the rules in src/lib/matching.ts and stores each
+dancer's top matches in the "MatchScore" table.
+
+Scores are computed with NumPy, one viewer against a whole candidate array
+at a time. Candidates are split like the matches page: non-teachers in the
+"amateur" section, teachers open to pro-am in the "proam" section. A lat/lon
+grid skips pairs who both have coordinates and are more than --radius miles
+apart (past 150 miles geography adds nothing to the score).
+
+Incremental runs only rescore dancers whose profile or dance styles changed
+since the last run and fold changed candidates into everyone else's stored
+top-K. Style edits don't always touch the dancer row, so each run also keeps
+a fingerprint of every dancer's styles in its state file.
+
+Requirements:
+  pip install numpy psycopg2-binary python-dotenv
+
+Usage:
+  python match_scores.py              # incremental, after an import
+  python match_scores.py --full       # rescore every claimed dancer
+  python match_scores.py --check      # score the pinned pairs in fixtures/match_pairs.json (no database or Node)
+  python match_scores.py --parity 500 # compare 500 random pairs with the TypeScript scorer
+  python match_scores.py --check-incremental  # style-only edit: incremental must equal full (scratch DB only)
+"""
+
+import json
+import math
+import random
+import logging
+import argparse
+import subprocess
+import sys
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from import_to_db import get_db_connection, new_id, BULK_PAGE_SIZE, OUTPUT_DIR
+from metrics import write_atomic
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+logger = logging.getLogger(__name__)
+
+STATE_FILE = OUTPUT_DIR / 'match_scores_state.json'
+PARITY_SCRIPT = Path(__file__).parent / 'match_parity.ts'
+# Dancers and the MatchResult matching.ts gives every ordered pair of them
+FIXTURE_FILE = Path(__file__).parent / 'fixtures' / 'match_pairs.json'
+REPO_ROOT = Path(__file__).parent.parent
+
+TOP_K = 24
+RADIUS_MILES = 150
+GRID_DEGREES = 1.0
+# Viewers whose rows are rewritten per statement
+WRITE_BATCH_SIZE = 500
+
+# Orders and point tables from src/lib/matching.ts
+EARTH_RADIUS_MILES = 3958.8
+LEVEL_ORDER = ['NEWCOMER', 'BRONZE', 'SILVER', 'GOLD', 'NOVICE', 'PRE_CHAMP', 'CHAMPIONSHIP']
+FREQUENCY_ORDER = ['RARELY', 'ONE_TO_THREE', 'FOUR_TO_SIX', 'SEVEN_PLUS']
+BUDGET_ORDER = ['BUDGET', 'MODERATE', 'COMPETITIVE', 'UNLIMITED']
+FREQUENCY_POINTS = [15, 10, 5, 0]
+BUDGET_POINTS = [10, 7, 3, 0]
+# Level compatibility by closest level distance (10 = unknown)
+LEVEL_POINTS = [20, 15, 8] + [0] * 8
+
+STYLES = [
+    'WALTZ', 'TANGO', 'FOXTROT', 'VIENNESE_WALTZ', 'QUICKSTEP', 'CHA_CHA', 'SAMBA',
+    'RUMBA', 'PASO_DOBLE', 'JIVE', 'BOLERO', 'MAMBO', 'WEST_COAST_SWING',
+]
+PARTNERSHIP_TYPES = ['AMATEUR_AMATEUR', 'PRO_AM', 'PRACTICE_ONLY']
+TRAVELS_NATIONALLY = {'NATIONAL', 'INTERNATIONAL'}
+
+
+# --- Scalar port of src/lib/matching.ts (reasons, and the reference for parity) ---
+
+def level_distance(a: str, b: str) -> int:
+    if a not in LEVEL_ORDER or b not in LEVEL_ORDER:
+        return 10
+    return abs(LEVEL_ORDER.index(a) - LEVEL_ORDER.index(b))
+
+
+def shared_styles(styles1: list, styles2: list) -> list:
+    s1 = {s['style'] for s in styles1}
+    return [s['style'] for s in styles2 if s['style'] in s1]
+
+
+def frequency_score(f1: Optional[str], f2: Optional[str]) -> int:
+    if not f1 or not f2:
+        return 7
+    d = abs(FREQUENCY_ORDER.index(f1) - FREQUENCY_ORDER.index(f2))
+    return FREQUENCY_POINTS[d]
+
+
+def budget_score(b1: Optional[str], b2: Optional[str]) -> int:
+    if not b1 or not b2:
+        return 5
+    d = abs(BUDGET_ORDER.index(b1) - BUDGET_ORDER.index(b2))
+    return BUDGET_POINTS[d]
+
+
+def js_round(x: float) -> int:
+    """Math.round: halves round up, unlike Python's round()."""
+    return math.floor(x + 0.5)
+
+
+def haversine_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    d_lat = (lat2 - lat1) * math.pi / 180
+    d_lon = (lon2 - lon1) * math.pi / 180
+    a = (math.sin(d_lat / 2) ** 2
+         + math.cos(lat1 * math.pi / 180) * math.cos(lat2 * math.pi / 180) * math.sin(d_lon / 2) ** 2)
+    return EARTH_RADIUS_MILES * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def geo_score(d1: dict, d2: dict) -> tuple:
+    if d1['lat'] and d1['lon'] and d2['lat'] and d2['lon']:
+        miles = js_round(haversine_miles(d1['lat'], d1['lon'], d2['lat'], d2['lon']))
+        if miles < 50:
+            return 20, f'{miles} miles apart'
+        if miles < 150:
+            return 10, f'{miles} miles apart'
+        return 0, f'{miles} miles apart'
+    if not d1['state'] or not d2['state']:
+        return 5, 'Location not specified'
+    if d1['city'] and d2['city'] and d1['city'] == d2['city']:
+        return 20, f"Both in {d1['city']}"
+    if d1['state'] == d2['state']:
+        return 10, f"Both in {d1['state']}"
+    return 0, 'Different states'
+
+
+def calculate_match_score(dancer1: dict, dancer2: dict) -> dict:
+    """calculateMatchScore: {'score', 'reasons', 'mode'} for dancer1 looking at dancer2."""
+    if 'PRO_AM' in dancer1['partnershipType'] and dancer2['isTeacher'] and dancer2['openToProAm']:
+        return calculate_proam_score(dancer1, dancer2)
+    return calculate_amateur_score(dancer1, dancer2)
+
+
+def calculate_amateur_score(d1: dict, d2: dict) -> dict:
+    shared = shared_styles(d1['danceStyles'], d2['danceStyles'])
+    if not shared:
+        return {'score': 0, 'reasons': ['No shared dance styles'], 'mode': 'amateur'}
+
+    score = 30
+    reasons = [f"Shares {len(shared)} dance style{'s' if len(shared) > 1 else ''}: {', '.join(shared[:3])}"]
+
+    d1_levels = [s['level'] for s in d1['danceStyles']]
+    d2_levels = [s['level'] for s in d2['danceStyles'] if s['style'] in shared]
+    min_dist = min([level_distance(l1, l2) for l1 in d1_levels for l2 in d2_levels] + [10])
+    if min_dist == 0:
+        score += 20
+        reasons.append('Same competition level')
+    elif min_dist == 1:
+        score += 15
+        reasons.append('Compatible competition levels')
+    elif min_dist == 2:
+        score += 8
+        reasons.append('Close competition levels')
+
+    geo, geo_reason = geo_score(d1, d2)
+    score += geo
+    if geo > 0:
+        reasons.append(geo_reason)
+
+    freq = frequency_score(d1['competitionFrequency'], d2['competitionFrequency'])
+    score += freq
+    if freq >= 10:
+        reasons.append('Similar competition schedule')
+
+    budget = budget_score(d1['budgetRange'], d2['budgetRange'])
+    score += budget
+    if budget >= 7:
+        reasons.append('Compatible budget range')
+
+    if set(d1['partnershipType']) & set(d2['partnershipType']):
+        score += 5
+        reasons.append('Compatible partnership goals')
+
+    return {'score': min(score, 100), 'reasons': reasons, 'mode': 'amateur'}
+
+
+def calculate_proam_score(dancer: dict, teacher: dict) -> dict:
+    shared = shared_styles(dancer['danceStyles'], teacher['danceStyles'])
+    if not shared:
+        return {'score': 0, 'reasons': ['No shared dance styles'], 'mode': 'proam'}
+    score = min(40, len(shared) * 15)
+    reasons = [f"Teacher specializes in: {', '.join(shared[:3])}"]
+
+    if not dancer['state'] or not teacher['state']:
+        score += 15
+    elif dancer['state'] == teacher['state']:
+        score += 30
+        reasons.append('Local teacher')
+    elif teacher['travelWillingness'] in TRAVELS_NATIONALLY:
+        score += 20
+        reasons.append('Teacher travels nationally')
+    elif teacher['travelWillingness'] == 'REGIONAL':
+        score += 10
+        reasons.append('Teacher travels regionally')
+
+    if any(level_distance(dl['level'], tl['level']) <= 2
+           for dl in dancer['danceStyles'] for tl in teacher['danceStyles']):
+        score += 30
+        reasons.append('Level is a good fit')
+
+    return {'score': min(score, 100), 'reasons': reasons, 'mode': 'proam'}
+
+
+# --- Vectorized scoring ---
+
+class DancerMatrix:
+    """Column arrays of every field the scorer reads, one row per dancer."""
+
+    def __init__(self, dancers: list):
+        import numpy as np
+
+        self.dancers = dancers
+        self.ids = [d['id'] for d in dancers]
+        self.row = {dancer_id: i for i, dancer_id in enumerate(self.ids)}
+        n = len(dancers)
+
+        def codes(values: list, order: Optional[list] = None):
+            """Index into `order` (or a code per distinct value), -1 for missing/falsy."""
+            lookup = {v: i for i, v in enumerate(order)} if order else {}
+            out = np.full(n, -1, dtype=np.int32)
+            for i, v in enumerate(values):
+                if v:
+                    out[i] = lookup.setdefault(v, len(lookup)) if not order else lookup[v]
+            return out
+
+        self.style_mask = np.zeros(n, dtype=np.int32)
+        self.style_level = np.full((n, len(STYLES)), -1, dtype=np.int8)
+        self.level_mask = np.zeros(n, dtype=np.int32)
+        self.partnership_mask = np.zeros(n, dtype=np.int32)
+        for i, d in enumerate(dancers):
+            for s in d['danceStyles']:
+                j = STYLES.index(s['style'])
+                level = LEVEL_ORDER.index(s['level'])
+                self.style_mask[i] |= 1 << j
+                self.style_level[i, j] = level
+                self.level_mask[i] |= 1 << level
+            for p in d['partnershipType']:
+                self.partnership_mask[i] |= 1 << PARTNERSHIP_TYPES.index(p)
+
+        self.lat = np.array([d['lat'] or 0.0 for d in dancers], dtype=np.float64)
+        self.lon = np.array([d['lon'] or 0.0 for d in dancers], dtype=np.float64)
+        self.has_coords = (self.lat != 0) & (self.lon != 0)
+        self.state = codes([d['state'] for d in dancers])
+        self.city = codes([d['city'] for d in dancers])
+        self.frequency = codes([d['competitionFrequency'] for d in dancers], FREQUENCY_ORDER)
+        self.budget = codes([d['budgetRange'] for d in dancers], BUDGET_ORDER)
+        travel = [d['travelWillingness'] for d in dancers]
+        self.travels_nationally = np.array([t in TRAVELS_NATIONALLY for t in travel])
+        self.travels_regionally = np.array([t == 'REGIONAL' for t in travel])
+        self.is_teacher = np.array([bool(d['isTeacher']) for d in dancers])
+        self.open_to_proam = np.array([bool(d['openToProAm']) for d in dancers])
+        self.wants_proam = (self.partnership_mask & (1 << PARTNERSHIP_TYPES.index('PRO_AM'))) != 0
+
+        # Closest level distance between two level bitmasks, 10 when either is empty
+        masks = np.arange(1 << len(LEVEL_ORDER))
+        bits = (masks[:, None] >> np.arange(len(LEVEL_ORDER))) & 1
+        present = (bits[:, None, :, None] & bits[None, :, None, :]) == 1
+        levels = np.arange(len(LEVEL_ORDER))
+        dist = np.where(present, np.abs(levels[:, None] - levels[None, :]), 10)
+        self.level_dist = dist.min(axis=(2, 3))
+        self.popcount = np.array([bin(m).count('1') for m in range(1 << len(STYLES))], dtype=np.int32)
+
+    def miles(self, v, c):
+        import numpy as np
+        lat1, lon1, lat2, lon2 = self.lat[v], self.lon[v], self.lat[c], self.lon[c]
+        d_lat = (lat2 - lat1) * np.pi / 180
+        d_lon = (lon2 - lon1) * np.pi / 180
+        a = (np.sin(d_lat / 2) ** 2
+             + np.cos(lat1 * np.pi / 180) * np.cos(lat2 * np.pi / 180) * np.sin(d_lon / 2) ** 2)
+        return EARTH_RADIUS_MILES * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    def score(self, v, c) -> tuple:
+        """Scores for viewer rows `v` against candidate rows `c` (broadcast index arrays).
+
+        Returns (score, is_proam, miles) arrays; miles is NaN unless both have coordinates.
+        """
+        import numpy as np
+
+        v = np.asarray(v)
+        c = np.asarray(c)
+        shared = self.style_mask[v] & self.style_mask[c]
+        n_shared = self.popcount[shared]
+
+        # Amateur: level over every viewer level vs the candidate's levels in shared styles
+        shared_levels = np.zeros(np.broadcast(v, c).shape, dtype=np.int32)
+        for j in range(len(STYLES)):
+            in_shared = (shared >> j) & 1
+            level = self.style_level[c, j].astype(np.int32)
+            shared_levels |= np.where(in_shared == 1, 1 << np.maximum(level, 0), 0)
+        level_points = np.array(LEVEL_POINTS)[self.level_dist[self.level_mask[v], shared_levels]]
+
+        both_coords = self.has_coords[v] & self.has_coords[c]
+        miles = np.where(both_coords, self.miles(v, c), np.nan)
+        rounded = np.floor(np.nan_to_num(miles) + 0.5)
+        state_v, state_c = self.state[v], self.state[c]
+        city_v, city_c = self.city[v], self.city[c]
+        no_state = (state_v < 0) | (state_c < 0)
+        geo = np.select(
+            [both_coords & (rounded < 50), both_coords & (rounded < 150), both_coords,
+             no_state, (city_v >= 0) & (city_v == city_c), state_v == state_c],
+            [20, 10, 0, 5, 20, 10], default=0,
+        )
+
+        freq_v, freq_c = self.frequency[v], self.frequency[c]
+        freq = np.where((freq_v < 0) | (freq_c < 0), 7,
+                        np.array(FREQUENCY_POINTS)[np.minimum(np.abs(freq_v - freq_c), 3)])
+        budget_v, budget_c = self.budget[v], self.budget[c]
+        budget = np.where((budget_v < 0) | (budget_c < 0), 5,
+                          np.array(BUDGET_POINTS)[np.minimum(np.abs(budget_v - budget_c), 3)])
+        overlap = np.where((self.partnership_mask[v] & self.partnership_mask[c]) != 0, 5, 0)
+        amateur = np.minimum(30 + level_points + geo + freq + budget + overlap, 100)
+
+        # Pro-am: viewer wants pro-am and the candidate is a teacher open to it
+        location = np.select(
+            [no_state, state_v == state_c, self.travels_nationally[c], self.travels_regionally[c]],
+            [15, 30, 20, 10], default=0,
+        )
+        fits = np.where(self.level_dist[self.level_mask[v], self.level_mask[c]] <= 2, 30, 0)
+        proam = np.minimum(np.minimum(40, n_shared * 15) + location + fits, 100)
+
+        is_proam = self.wants_proam[v] & self.is_teacher[c] & self.open_to_proam[c]
+        score = np.where(n_shared == 0, 0, np.where(is_proam, proam, amateur))
+        return score, is_proam, miles
+
+
+class GeoGrid:
+    """Buckets dancers with coordinates into GRID_DEGREES cells for radius queries."""
+
+    def __init__(self, matrix: DancerMatrix, rows):
+        import numpy as np
+        self.cells = {}
+        for i in rows:
+            if matrix.has_coords[i]:
+                key = (math.floor(matrix.lat[i] / GRID_DEGREES), math.floor(matrix.lon[i] / GRID_DEGREES))
+                self.cells.setdefault(key, []).append(i)
+        self.no_coords = np.array([i for i in rows if not matrix.has_coords[i]], dtype=np.int64)
+        self.all_rows = np.array(list(rows), dtype=np.int64)
+        self.matrix = matrix
+
+    def near(self, i: int, radius: float):
+        """Rows that might be within `radius` miles of row i (every row if i has no coordinates)."""
+        import numpy as np
+        m = self.matrix
+        if not m.has_coords[i]:
+            return self.all_rows
+        lat, lon = m.lat[i], m.lon[i]
+        lat_cells = math.ceil(radius / 69.0 / GRID_DEGREES)
+        cos_lat = max(math.cos(math.radians(min(abs(lat) + lat_cells * GRID_DEGREES, 89.0))), 0.01)
+        lon_cells = math.ceil(radius / (69.17 * cos_lat) / GRID_DEGREES)
+        row, col = math.floor(lat / GRID_DEGREES), math.floor(lon / GRID_DEGREES)
+        near = [self.no_coords]
+        for r in range(row - lat_cells, row + lat_cells + 1):
+            for c in range(col - lon_cells, col + lon_cells + 1):
+                if (r, c) in self.cells:
+                    near.append(np.array(self.cells[(r, c)], dtype=np.int64))
+        return np.concatenate(near)
+
+
+def section_of(dancer: dict) -> Optional[str]:
+    """Matches page section a candidate appears in, if any."""
+    if not dancer['isTeacher']:
+        return 'amateur'
+    if dancer['openToProAm']:
+        return 'proam'
+    return None
+
+
+def load_dancers(conn, claimed_only: bool = True) -> list:
+    """Every (claimed) dancer in the shape calculateMatchScore expects, styles in id order."""
+    cur = conn.cursor()
+    cur.execute(f'''
+        SELECT d.id, d.lat, d.lon, d.state, d.city, d."isTeacher", d."openToProAm",
+               d."partnershipType"::text[], d."competitionFrequency"::text, d."budgetRange"::text,
+               d."travelWillingness"::text, d."updatedAt",
+               COALESCE(array_agg(s.style::text ORDER BY s.id) FILTER (WHERE s.id IS NOT NULL), '{{}}'),
+               COALESCE(array_agg(s.level::text ORDER BY s.id) FILTER (WHERE s.id IS NOT NULL), '{{}}')
+        FROM "Dancer" d
+        LEFT JOIN "DanceStyle" s ON s."dancerId" = d.id
+        {'WHERE d."isClaimed"' if claimed_only else ''}
+        GROUP BY d.id
+    ''')
+    dancers = []
+    for (dancer_id, lat, lon, state, city, is_teacher, open_to_proam, partnership_type, frequency,
+         budget, travel, updated_at, styles, levels) in cur.fetchall():
+        dancers.append({
+            'id': dancer_id, 'lat': lat, 'lon': lon, 'state': state, 'city': city,
+            'isTeacher': is_teacher, 'openToProAm': open_to_proam,
+            'partnershipType': partnership_type or [], 'competitionFrequency': frequency,
+            'budgetRange': budget, 'travelWillingness': travel, 'updatedAt': updated_at,
+            'danceStyles': [{'style': s, 'level': l} for s, l in zip(styles, levels)],
+        })
+    cur.close()
+    # Row order doubles as the tie-break order, so sort by id here rather than by database collation
+    dancers.sort(key=lambda d: d['id'])
+    return dancers
+
+
+def styles_fingerprint(dancer: dict) -> int:
+    """Changes whenever a dancer's styles or levels do, whoever edited them."""
+    return zlib.crc32(json.dumps(dancer['danceStyles'], sort_keys=True).encode('utf-8'))
+
+
+def top_matches(matrix: DancerMatrix, viewer: int, candidates, section: str,
+                radius: float, top_k: int) -> list:
+    """(candidate row, score, mode) of the viewer's best candidates, best first."""
+    import numpy as np
+    candidates = candidates[candidates != viewer]
+    if not len(candidates):
+        return []
+    score, is_proam, miles = matrix.score(viewer, candidates)
+    keep = score > 0
+    if section == 'amateur':
+        keep &= ~(miles >= radius)
+    candidates, score, is_proam = candidates[keep], score[keep], is_proam[keep]
+    # Best score first; ties by candidate id (rows are in id order) so reruns are stable
+    order = np.lexsort((candidates, -score))[:top_k]
+    return [(int(candidates[i]), int(score[i]), 'proam' if is_proam[i] else 'amateur') for i in order]
+
+
+def match_rows(matrix: DancerMatrix, viewer: int, matches: list, section: str) -> list:
+    rows = []
+    for rank, (c, score, mode) in enumerate(matches, 1):
+        result = calculate_match_score(matrix.dancers[viewer], matrix.dancers[c])
+        if result['score'] != score:
+            logger.warning(f'Vectorized score {score} != scalar {result["score"]} '
+                           f'for {matrix.ids[viewer]} -> {matrix.ids[c]}')
+        rows.append((new_id(), matrix.ids[viewer], matrix.ids[c], section, rank,
+                     result['score'], result['mode'], result['reasons']))
+    return rows
+
+
+def write_rows(conn, viewer_ids: list, rows: list):
+    """Replace the MatchScore rows of `viewer_ids` with `rows`."""
+    from psycopg2.extras import execute_values
+    cur = conn.cursor()
+    cur.execute('DELETE FROM "MatchScore" WHERE "dancerId" = ANY(%s)', (viewer_ids,))
+    execute_values(cur, '''
+        INSERT INTO "MatchScore" (id, "dancerId", "candidateId", section, rank, score, mode, reasons, "computedAt")
+        VALUES %s
+    ''', rows, template="(%s, %s, %s, %s, %s, %s, %s, %s, NOW() AT TIME ZONE 'UTC')", page_size=BULK_PAGE_SIZE)
+    conn.commit()
+    cur.close()
+
+
+def refresh_match_scores(conn, full: bool = False, radius: float = RADIUS_MILES, top_k: int = TOP_K) -> dict:
+    """Recompute top-K matches: everyone on a full run, otherwise only what changed since the last run.
+
+    Incrementally, dancers updated since the last run (or whose styles no
+    longer match the last run's fingerprint) are rescored against everyone;
+    every other viewer keeps their stored rows (exact top-K over
+    unchanged candidates) merged with fresh scores against the changed
+    candidates, unless a changed candidate was already in their top-K, in
+    which case they are rescored in full.
+    """
+    import numpy as np
+
+    cur = conn.cursor()
+    # "updatedAt" columns hold UTC timestamps without a zone
+    cur.execute("SELECT NOW() AT TIME ZONE 'UTC'")
+    started_at = cur.fetchone()[0]
+    # Profiles that were unclaimed since the last run drop out of the matches
+    cur.execute('''
+        DELETE FROM "MatchScore" m USING "Dancer" d
+        WHERE d.id = m."dancerId" AND NOT d."isClaimed"
+    ''')
+    conn.commit()
+    cur.close()
+
+    last_run = None
+    last_styles = None
+    if not full and STATE_FILE.exists():
+        with open(STATE_FILE) as f:
+            state = json.load(f)
+        last_run = datetime.fromisoformat(state['lastRunStartedAt'])
+        # State files from before fingerprints fall back to updatedAt alone
+        last_styles = state.get('styles')
+
+    dancers = load_dancers(conn)
+    matrix = DancerMatrix(dancers)
+    sections = {'amateur': [], 'proam': []}
+    for i, d in enumerate(dancers):
+        section = section_of(d)
+        if section:
+            sections[section].append(i)
+    grids = {name: GeoGrid(matrix, rows) for name, rows in sections.items()}
+    proam_rows = np.array(sections['proam'], dtype=np.int64)
+
+    def candidates_for(viewer: int, section: str, among=None):
+        if section == 'proam':
+            # Pro-am scoring only looks at state and travel, so no geographic cut
+            pool = proam_rows
+        else:
+            pool = grids['amateur'].near(viewer, radius)
+        return pool if among is None else pool[np.isin(pool, among)]
+
+    if last_run is None:
+        rescore = set(range(len(dancers)))
+        merge = {}
+    else:
+        changed = {i for i, d in enumerate(dancers)
+                   if d['updatedAt'] > last_run
+                   or last_styles is not None and last_styles.get(d['id']) != styles_fingerprint(d)}
+        rescore = set(changed)
+        changed_ids = [matrix.ids[i] for i in changed]
+        cur = conn.cursor()
+        # Anyone whose stored top-K holds a changed (or no longer claimed) candidate starts over
+        cur.execute('''
+            SELECT DISTINCT m."dancerId" FROM "MatchScore" m
+            JOIN "Dancer" c ON c.id = m."candidateId"
+            WHERE m."candidateId" = ANY(%s) OR NOT c."isClaimed"
+        ''', (changed_ids,))
+        rescore |= {matrix.row[dancer_id] for (dancer_id,) in cur.fetchall() if dancer_id in matrix.row}
+
+        merge = {}
+        changed_rows = np.array(sorted(changed), dtype=np.int64)
+        if len(changed_rows):
+            for viewer in range(len(dancers)):
+                if viewer in rescore:
+                    continue
+                for section in sections:
+                    fresh = top_matches(matrix, viewer, candidates_for(viewer, section, changed_rows),
+                                        section, radius, top_k)
+                    if fresh:
+                        merge.setdefault(viewer, {})[section] = fresh
+        if merge:
+            cur.execute('''
+                SELECT "dancerId", "candidateId", section, score, mode
+                FROM "MatchScore" WHERE "dancerId" = ANY(%s)
+            ''', ([matrix.ids[v] for v in merge],))
+            stored = {}
+            for dancer_id, candidate_id, section, score, mode in cur.fetchall():
+                if candidate_id in matrix.row:
+                    stored.setdefault((matrix.row[dancer_id], section), []).append(
+                        (matrix.row[candidate_id], score, mode))
+            for viewer, fresh_sections in merge.items():
+                for section in sections:
+                    combined = stored.get((viewer, section), []) + fresh_sections.get(section, [])
+                    combined.sort(key=lambda m: (-m[1], matrix.ids[m[0]]))
+                    fresh_sections[section] = combined[:top_k]
+        cur.close()
+        logger.info(f'{len(changed)} dancers changed since {last_run}')
+
+    viewers = sorted(rescore) + sorted(merge)
+    logger.info(f'Scoring {len(rescore)} dancers in full and merging changes into {len(merge)} more '
+                f'({len(dancers)} claimed dancers)')
+    written = 0
+    for start in range(0, len(viewers), WRITE_BATCH_SIZE):
+        batch = viewers[start:start + WRITE_BATCH_SIZE]
+        rows = []
+        for viewer in batch:
+            for section in sections:
+                if viewer in merge:
+                    matches = merge[viewer][section]
+                else:
+                    matches = top_matches(matrix, viewer, candidates_for(viewer, section), section, radius, top_k)
+                rows.extend(match_rows(matrix, viewer, matches, section))
+        write_rows(conn, [matrix.ids[v] for v in batch], rows)
+        written += len(rows)
+
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    write_atomic(STATE_FILE, json.dumps({
+        'lastRunStartedAt': started_at.isoformat(),
+        'styles': {d['id']: styles_fingerprint(d) for d in dancers},
+    }))
+    return {'viewers': len(viewers), 'rows': written}
+
+
+def stored_matches(conn) -> list:
+    cur = conn.cursor()
+    cur.execute('''
+        SELECT "dancerId", section, rank, "candidateId", score, mode
+        FROM "MatchScore" ORDER BY "dancerId", section, rank
+    ''')
+    rows = cur.fetchall()
+    cur.close()
+    return rows
+
+
+def check_incremental(conn) -> list:
+    """Edit one claimed dancer's style level (DanceStyle only), then compare an incremental run with a full one.
+
+    Restores the level and refreshes again afterwards, but the database is
+    written to throughout: run it against a scratch copy. Returns failures as
+    readable lines (empty when the two runs agree).
+    """
+    refresh_match_scores(conn, full=True)
+    cur = conn.cursor()
+    cur.execute('''
+        SELECT s.id, s.level::text FROM "DanceStyle" s
+        JOIN "Dancer" d ON d.id = s."dancerId" AND d."isClaimed"
+        ORDER BY s.id LIMIT 1
+    ''')
+    row = cur.fetchone()
+    if row is None:
+        cur.close()
+        return ['no claimed dancer with a dance style to edit']
+    style_id, level = row
+    edited = LEVEL_ORDER[(LEVEL_ORDER.index(level) + 3) % len(LEVEL_ORDER)]
+
+    failures = []
+    try:
+        # What the styles API route does, minus its updatedAt bump
+        cur.execute('UPDATE "DanceStyle" SET level = %s WHERE id = %s', (edited, style_id))
+        conn.commit()
+        if not refresh_match_scores(conn)['viewers']:
+            failures.append(f'incremental run rescored nobody after {style_id} went {level} -> {edited}')
+        incremental = stored_matches(conn)
+        refresh_match_scores(conn, full=True)
+        full = stored_matches(conn)
+        if incremental != full:
+            differing = {row[0] for row in set(incremental) ^ set(full)}
+            failures.append(f'incremental differs from full for {len(differing)} dancers after '
+                            f'{style_id} went {level} -> {edited}')
+    finally:
+        cur.execute('UPDATE "DanceStyle" SET level = %s WHERE id = %s', (level, style_id))
+        conn.commit()
+        cur.close()
+        refresh_match_scores(conn)
+    return failures
+
+
+def check_fixture() -> list:
+    """Pairs in FIXTURE_FILE where the scalar or vectorized scorer differs from the pinned result, as readable lines."""
+    import numpy as np
+
+    fixture = json.loads(FIXTURE_FILE.read_text(encoding='utf-8'))
+    matrix = DancerMatrix(fixture['dancers'])
+    expected = fixture['expected']
+    v = np.array([matrix.row[e['dancer']] for e in expected])
+    c = np.array([matrix.row[e['candidate']] for e in expected])
+    vectorized, is_proam, _ = matrix.score(v, c)
+
+    failures = []
+    for e, a, b, score, proam in zip(expected, v, c, vectorized, is_proam):
+        pinned = {'score': e['score'], 'reasons': e['reasons'], 'mode': e['mode']}
+        scalar = calculate_match_score(matrix.dancers[a], matrix.dancers[b])
+        if scalar != pinned:
+            failures.append(f'{e["dancer"]} -> {e["candidate"]}: python={scalar} expected={pinned}')
+        # Zero scores never reach the table, so their mode doesn't matter
+        if int(score) != e['score'] or (e['score'] and e['mode'] != ('proam' if proam else 'amateur')):
+            failures.append(f'{e["dancer"]} -> {e["candidate"]}: numpy={int(score)} '
+                            f'{"proam" if proam else "amateur"} expected={e["score"]} {e["mode"]}')
+    return failures
+
+
+def ts_match_scores(pairs: list) -> list:
+    """calculateMatchScore from src/lib/matching.ts for each [dancer1, dancer2] (needs npm install)."""
+    proc = subprocess.run(
+        ['npx', 'ts-node', '--compiler-options', '{"module":"CommonJS","moduleResolution":"node"}', str(PARITY_SCRIPT)],
+        input=json.dumps(pairs, default=str), capture_output=True, text=True, cwd=REPO_ROOT, check=True,
+    )
+    return json.loads(proc.stdout)
+
+
+def check_parity(conn, pairs: int) -> int:
+    """Score random pairs here and with src/lib/matching.ts; returns the number of mismatches.
+
+    The pinned FIXTURE_FILE results are checked against matching.ts too, so
+    `--check` keeps testing what the TypeScript scorer actually does.
+    """
+    import numpy as np
+
+    dancers = load_dancers(conn, claimed_only=False)
+    if len(dancers) < 2:
+        logger.error('Need at least two dancers for a parity check')
+        return 0
+    matrix = DancerMatrix(dancers)
+    rng = random.Random(0)
+    sample = [tuple(rng.sample(range(len(dancers)), 2)) for _ in range(pairs)]
+    v = np.array([a for a, _ in sample])
+    c = np.array([b for _, b in sample])
+    vectorized, is_proam, _ = matrix.score(v, c)
+
+    expected = ts_match_scores([[dancers[a], dancers[b]] for a, b in sample])
+
+    mismatches = 0
+    fixture = json.loads(FIXTURE_FILE.read_text(encoding='utf-8'))
+    by_id = {d['id']: d for d in fixture['dancers']}
+    pinned = fixture['expected']
+    for e, ts in zip(pinned, ts_match_scores([[by_id[e['dancer']], by_id[e['candidate']]] for e in pinned])):
+        if ts != {'score': e['score'], 'reasons': e['reasons'], 'mode': e['mode']}:
+            mismatches += 1
+            logger.warning(f'{FIXTURE_FILE.name} is stale for {e["dancer"]} -> {e["candidate"]}: ts={ts}')
+    for (a, b), score, proam, ts in zip(sample, vectorized, is_proam, expected):
+        scalar = calculate_match_score(dancers[a], dancers[b])
+        # Zero scores never reach the table, so their mode doesn't matter
+        mode_matches = ts['score'] == 0 or ts['mode'] == ('proam' if proam else 'amateur')
+        if int(score) != ts['score'] or not mode_matches or scalar != ts:
+            mismatches += 1
+            logger.warning(f'Mismatch {dancers[a]["id"]} -> {dancers[b]["id"]}: '
+                           f'numpy={int(score)} python={scalar} ts={ts}')
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute top dancer matches into the MatchScore table')
+    parser.add_argument('--full', action='store_true',
+                        help='Rescore every claimed dancer instead of only what changed since the last run')
+    parser.add_argument('--radius', type=float, default=RADIUS_MILES,
+                        help=f'Skip pairs with coordinates further apart than this (default: {RADIUS_MILES} miles)')
+    parser.add_argument('--top-k', type=int, default=TOP_K,
+                        help=f'Matches kept per dancer and section (default: {TOP_K})')
+    parser.add_argument('--check', action='store_true',
+                        help=f'Score the pinned pairs in {FIXTURE_FILE.name} with both scorers, then exit; '
+                             'needs no database or Node')
+    parser.add_argument('--parity', type=int, metavar='PAIRS',
+                        help='Compare this many random pairs against src/lib/matching.ts (needs npm install), then exit')
+    parser.add_argument('--check-incremental', action='store_true',
+                        help='Check that an incremental run after a style-only edit matches a full run, then exit; '
+                             'edits and restores one style, so only use a scratch database')
+    args = parser.parse_args()
+    if args.check:
+        failures = check_fixture()
+        for line in failures:
+            print(f'  {line}')
+        if failures:
+            print(f'\n❌ {len(failures)} pinned match score check(s) failed')
+            sys.exit(1)
+        print(f'✅ Scalar and vectorized scores match {FIXTURE_FILE.name}')
+        return
+
+    conn = get_db_connection()
+    try:
+        if args.parity:
+            mismatches = check_parity(conn, args.parity)
+            print(f'\n{"✅" if not mismatches else "❌"} Parity: {mismatches} mismatched pair(s) '
+                  f'({args.parity} random, plus {FIXTURE_FILE.name})')
+            sys.exit(1 if mismatches else 0)
+        if args.check_incremental:
+            failures = check_incremental(conn)
+            for line in failures:
+                print(f'  {line}')
+            print(f'\n{"✅" if not failures else "❌"} Incremental check: {len(failures)} failure(s)')
+            sys.exit(1 if failures else 0)
+        stats = refresh_match_scores(conn, args.full, args.radius, args.top_k)
+    finally:
+        conn.close()
+
+    print(f"\n✅ Match scores: {stats['rows']} matches written for {stats['viewers']} dancers")
+
+
+if __name__ == '__main__':
+    main()
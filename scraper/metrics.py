@@ -0,0 +1,203 @@
+"""
+FilledCard Run Metrics
+Instrumentation shared by the scrapers and the importer.
+
+Stages are timed with `with METRICS.stage('fetch'):` from any thread (time
+spent in concurrent stages adds up, so a stage can exceed the wall time),
+counters are bumped with `METRICS.count('rows', n)`, and at the end of a run
+the totals are written as a JSON report and, optionally, as a Prometheus
+textfile for node_exporter's textfile collector.
+
+Connections created with `connection_factory=counting_connection()` count
+every statement and commit as a DB round trip and time them in the 'db'
+stage, whichever code path issued them.
+
+Requirements:
+  none beyond the standard library
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+REPORT_DIR = Path(__file__).parent / 'output'
+PROMETHEUS_PREFIX = 'filledcard'
+
+
+def peak_rss_bytes(children: bool = False) -> Optional[int]:
+    """Peak resident set size of this process (or of its largest finished child), None where unsupported."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    return usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+
+
+class RunMetrics:
+    """Thread-safe stage timers and counters for one run."""
+
+    def __init__(self, script: str = ''):
+        self.reset(script)
+
+    def reset(self, script: str):
+        self.script = script
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def add_time(self, name: str, seconds: float, calls: int = 1):
+        with self._lock:
+            stage = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            stage['seconds'] += seconds
+            stage['calls'] += calls
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def record_http(self, client=None, cache=None):
+        """Fold an HttpClient's and a ResponseCache's own counters into the run."""
+        if client is not None:
+            self.count('http_requests', client.requests)
+            self.count('http_bytes', client.bytes_downloaded)
+            self.count('http_retries', client.retries)
+        if cache is not None:
+            self.count('cache_hits', cache.hits)
+            self.count('cache_revalidated', cache.revalidated)
+            self.count('cache_misses', cache.misses)
+
+    def absorb(self, report: dict, prefix: str):
+        """Fold another process's run report in, its stages and counters named '<prefix>.<name>'."""
+        for name, stage in report['stages'].items():
+            self.add_time(f'{prefix}.{name}', stage['seconds'], stage['calls'])
+        for name, value in report['counters'].items():
+            self.count(f'{prefix}.{name}', value)
+
+    def report(self) -> dict:
+        wall = time.perf_counter() - self._started
+        counters = dict(self.counters)
+        lookups = sum(counters.get(k, 0) for k in ('cache_hits', 'cache_revalidated', 'cache_misses'))
+        rows = counters.get('rows', 0)
+        return {
+            'script': self.script,
+            'startedAt': self.started_at.isoformat(timespec='seconds'),
+            'wallSeconds': round(wall, 3),
+            'stages': {name: {'seconds': round(s['seconds'], 3), 'calls': s['calls']}
+                       for name, s in sorted(self.stages.items())},
+            'counters': counters,
+            'rowsPerSecond': round(rows / wall, 1) if wall else None,
+            # Revalidated pages came from the cache too, after a cheap 304
+            'cacheHitRate': round((counters.get('cache_hits', 0) + counters.get('cache_revalidated', 0)) / lookups, 4)
+            if lookups else None,
+            'peakRssBytes': peak_rss_bytes(),
+            'childPeakRssBytes': peak_rss_bytes(children=True),
+        }
+
+    def write(self, report_path: Optional[Path] = None, prometheus_path: Optional[Path] = None) -> dict:
+        """Write the JSON report (and the Prometheus textfile if asked); returns the report."""
+        report = self.report()
+        report_path = report_path or REPORT_DIR / f'{self.script}_report.json'
+        write_atomic(report_path, json.dumps(report, indent=2) + '\n')
+        if prometheus_path:
+            write_atomic(prometheus_path, prometheus_text(report))
+        return report
+
+
+def prometheus_text(report: dict) -> str:
+    """Report in the Prometheus text exposition format, labelled with the script name."""
+    script = report['script']
+    lines = []
+
+    def metric(name: str, help_text: str, samples: list):
+        lines.append(f'# HELP {PROMETHEUS_PREFIX}_{name} {help_text}')
+        lines.append(f'# TYPE {PROMETHEUS_PREFIX}_{name} gauge')
+        for labels, value in samples:
+            if value is None:
+                continue
+            label_text = ','.join(f'{k}="{v}"' for k, v in {'script': script, **labels}.items())
+            lines.append(f'{PROMETHEUS_PREFIX}_{name}{{{label_text}}} {value}')
+
+    metric('run_wall_seconds', 'Wall time of the last run.', [({}, report['wallSeconds'])])
+    metric('run_timestamp_seconds', 'Unix time the last run started.',
+           [({}, int(datetime.fromisoformat(report['startedAt']).timestamp()))])
+    metric('stage_seconds', 'Time spent in each stage during the last run.',
+           [({'stage': name}, s['seconds']) for name, s in report['stages'].items()])
+    metric('stage_calls', 'Times each stage ran during the last run.',
+           [({'stage': name}, s['calls']) for name, s in report['stages'].items()])
+    metric('counter', 'Run counters (rows, HTTP bytes, cache lookups, DB round trips, ...).',
+           [({'name': name}, value) for name, value in sorted(report['counters'].items())])
+    metric('rows_per_second', 'Rows handled per second of wall time.', [({}, report['rowsPerSecond'])])
+    metric('cache_hit_ratio', 'Share of page lookups served from the cache.', [({}, report['cacheHitRate'])])
+    metric('peak_rss_bytes', 'Peak resident memory of the run.', [({}, report['peakRssBytes'])])
+    return '\n'.join(lines) + '\n'
+
+
+def write_atomic(path: Path, text: str):
+    """Write via a temp file and rename, so readers (node_exporter) never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+_connection_class = None
+
+
+def counting_connection():
+    """psycopg2 connection class that counts and times every statement and commit."""
+    global _connection_class
+    if _connection_class is None:
+        import psycopg2.extensions
+
+        class CountingCursor(psycopg2.extensions.cursor):
+            def execute(self, query, vars=None):
+                METRICS.count('db_round_trips')
+                with METRICS.stage('db'):
+                    return super().execute(query, vars)
+
+            def executemany(self, query, vars_list):
+                vars_list = list(vars_list)
+                METRICS.count('db_round_trips', len(vars_list))
+                with METRICS.stage('db'):
+                    return super().executemany(query, vars_list)
+
+        class CountingConnection(psycopg2.extensions.connection):
+            def cursor(self, *args, **kwargs):
+                kwargs.setdefault('cursor_factory', CountingCursor)
+                return super().cursor(*args, **kwargs)
+
+            def commit(self):
+                METRICS.count('db_round_trips')
+                with METRICS.stage('db'):
+                    return super().commit()
+
+            def rollback(self):
+                METRICS.count('db_round_trips')
+                with METRICS.stage('db'):
+                    return super().rollback()
+
+        _connection_class = CountingConnection
+    return _connection_class
+
+
+# The run this process is measuring; each script resets it with its own name in main()
+METRICS = RunMetrics()
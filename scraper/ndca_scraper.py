@@ -3,64 +3,165 @@ FilledCard NDCA Scraper
 Scrapes competitor listings from ndca.org
 
 Requirements:
-  pip install requests beautifulsoup4 playwright
+  pip install requests beautifulsoup4 lxml playwright
   playwright install chromium
+
+Usage:
+  python ndca_scraper.py
+  python ndca_scraper.py --jsonl     # one JSON record per line
+  python ndca_scraper.py --offline   # re-parse from the page cache, no network
+  python ndca_scraper.py --parser html.parser
+  python ndca_scraper.py --check-parsers   # both parser backends must agree on fixtures/
+  python ndca_scraper.py --browser-contexts 8   # render directory pages 8 at a time
+  python ndca_scraper.py --reprobe   # try the static requests path even if Playwright is remembered
+  python ndca_scraper.py --sample    # write built-in sample dancers, no network
+  python ndca_scraper.py --prometheus /var/lib/node_exporter/textfile/filledcard_ndca.prom
 """
 
 import json
+import re
 import time
+import asyncio
 import logging
+import argparse
+import sys
 from pathlib import Path
 from typing import Optional
+from urllib.parse import urlparse
+
+from http_cache import ResponseCache, CachedSession, DEFAULT_CACHE_FILE
+from http_client import HttpClient
+from metrics import METRICS, write_atomic
+from normalize import normalize_dancers
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
 logger = logging.getLogger(__name__)
 
 OUTPUT_DIR = Path(__file__).parent / 'output'
 OUTPUT_FILE = OUTPUT_DIR / 'ndca_dancers.json'
+JSONL_OUTPUT_FILE = OUTPUT_DIR / 'ndca_dancers.jsonl'
+STRATEGY_FILE = OUTPUT_DIR / 'ndca_strategy.json'
+REPORT_FILE = OUTPUT_DIR / 'ndca_report.json'
 NDCA_BASE_URL = 'https://ndca.org'
 
+# Cheapest first; later strategies are fallbacks
+STRATEGIES = ['requests', 'playwright']
+# When Playwright is the remembered strategy, still re-probe the static path every N runs
+REPROBE_EVERY = 10
 
-def scrape_with_requests() -> Optional[list]:
-    """Attempt scraping with requests + BeautifulSoup first."""
-    try:
-        import requests
-        from bs4 import BeautifulSoup
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+}
 
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        })
 
-        logger.info('Attempting requests-based scrape of NDCA...')
+def make_client(rate: float = 1.0) -> HttpClient:
+    """Create the rate-limited, retrying HTTP client with the scraper's default headers."""
+    return HttpClient(HEADERS, rate=rate)
+
+
+# Elements whose text get_text() leaves out; the lxml backends skip their text nodes too
+NON_TEXT_TAGS = ('script', 'style', 'template', 'rt', 'rp')
+CELL_TEXT_XPATH = './/text()[not(%s)]' % ' or '.join(f'ancestor::{tag}' for tag in NON_TEXT_TAGS)
+
+
+def extract_member_rows_bs4(html: str) -> list:
+    """Cell texts for each member row, via BeautifulSoup's html.parser."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Try common patterns for member directories
+    # Look for table rows, member cards, etc.
+    rows = soup.select('table tbody tr') or soup.select('.member-row') or soup.select('.competitor')
+    return [[cell.get_text(strip=True) for cell in row.find_all(['td', 'div'])] for row in rows]
+
+
+def _has_class(name: str) -> str:
+    return f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]"
+
+
+def extract_member_rows_lxml(html: str) -> list:
+    """Cell texts for each member row, via lxml and XPath.
+
+    Same rows as extract_member_rows_bs4 for the pages in fixtures/
+    (`--check-parsers`); see o2cm_scraper.extract_rows_lxml for how they differ
+    on malformed markup.
+    """
+    import lxml.html
+    if not html.strip():
+        return []
+    try:
+        doc = lxml.html.document_fromstring(html)
+    except ValueError:
+        # Unicode input with an XML encoding declaration
+        doc = lxml.html.document_fromstring(html.encode('utf-8'))
+
+    rows = (doc.xpath('//table//tbody//tr')
+            or doc.xpath(_has_class('member-row'))
+            or doc.xpath(_has_class('competitor')))
+    return [
+        [''.join(t.strip() for t in cell.xpath(CELL_TEXT_XPATH)) for cell in row.xpath('.//td | .//div')]
+        for row in rows
+    ]
+
+
+PARSER_BACKENDS = {
+    'lxml': extract_member_rows_lxml,
+    'html.parser': extract_member_rows_bs4,
+}
+DEFAULT_PARSER = 'lxml'
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+
+def check_parsers() -> list:
+    """Pages in fixtures/ where the parser backends disagree, as readable lines (empty when all agree)."""
+    failures = []
+    for page in sorted(FIXTURES_DIR.glob('ndca_*.html')):
+        html = page.read_text(encoding='utf-8')
+        rows = {name: extract(html) for name, extract in PARSER_BACKENDS.items()}
+        if not rows[DEFAULT_PARSER]:
+            failures.append(f'{page.name}: no member rows')
+        for name, got in rows.items():
+            if got != rows[DEFAULT_PARSER]:
+                failures.append(f'{page.name}: {name} rows {got!r} != {DEFAULT_PARSER} rows {rows[DEFAULT_PARSER]!r}')
+    return failures
+
+
+def scrape_with_requests(session=None, backend: str = DEFAULT_PARSER) -> Optional[list]:
+    """Attempt scraping with requests + a static HTML parse first.
+
+    Returns None when the page has no parseable member rows; fetch errors
+    (after the client's retries) propagate to the caller.
+    """
+    if session is None:
+        session = make_client()
+
+    logger.info('Attempting requests-based scrape of NDCA...')
+    with METRICS.stage('fetch'):
         resp = session.get(f'{NDCA_BASE_URL}/members/', timeout=15)
         resp.raise_for_status()
 
-        soup = BeautifulSoup(resp.text, 'html.parser')
+    try:
+        with METRICS.stage('parse'):
+            rows = PARSER_BACKENDS[backend](resp.text)
 
         dancers = []
 
-        # Try common patterns for member directories
-        # Look for table rows, member cards, etc.
-        rows = soup.select('table tbody tr') or soup.select('.member-row') or soup.select('.competitor')
-
         if not rows:
             logger.warning('No standard member rows found — page may require JavaScript rendering.')
             return None
 
-        for row in rows:
-            cells = row.find_all(['td', 'div'])
+        for cells in rows:
             if len(cells) < 2:
                 continue
 
             dancer = {
-                'name': cells[0].get_text(strip=True),
-                'ndcaId': cells[1].get_text(strip=True) if len(cells) > 1 else None,
+                'name': cells[0],
+                'ndcaId': cells[1] if len(cells) > 1 else None,
                 'styles': [],
                 'levels': [],
-                'studio': cells[3].get_text(strip=True) if len(cells) > 3 else None,
-                'state': cells[4].get_text(strip=True) if len(cells) > 4 else None,
+                'studio': cells[3] if len(cells) > 3 else None,
+                'state': cells[4] if len(cells) > 4 else None,
                 'source': 'NDCA',
             }
             if dancer['name']:
@@ -70,57 +171,153 @@ def scrape_with_requests() -> Optional[list]:
         return dancers if dancers else None
 
     except Exception as e:
-        logger.warning(f'Requests scrape failed: {e}')
+        logger.warning(f'Requests scrape could not parse the member directory: {e}')
         return None
 
 
-def scrape_with_playwright() -> list:
+# Rendered pages only need the DOM; skip everything heavy
+BLOCKED_RESOURCE_TYPES = {'image', 'font', 'media'}
+# Rendering stops as soon as a member row is in the DOM
+MEMBER_ROW_SELECTOR = 'table tbody tr, .member-row, .competitor'
+MAX_MEMBER_PAGES = 500
+
+# Member rows plus any ?page=N links, extracted in one round trip
+EXTRACT_MEMBERS_JS = '''() => {
+    const rows = document.querySelectorAll('table tbody tr, .member-row, .competitor');
+    const members = Array.from(rows).map(row => {
+        const cells = row.querySelectorAll('td, .cell');
+        return {
+            name: cells[0]?.textContent?.trim() || '',
+            ndcaId: cells[1]?.textContent?.trim() || '',
+            studio: cells[2]?.textContent?.trim() || '',
+            state: cells[3]?.textContent?.trim() || '',
+        };
+    }).filter(d => d.name.length > 2);
+    const pageLinks = Array.from(document.querySelectorAll('a[href*="page="]')).map(a => a.href);
+    return {members, pageLinks};
+}'''
+
+
+class BrowserPool:
+    """One headless Chromium with `size` browser contexts that render pages in parallel.
+
+    Launch cost is paid once per run. Each context aborts image, font and
+    media requests, and a page is read as soon as `wait_selector` appears
+    rather than after the network goes idle.
+    """
+
+    def __init__(self, size: int = 4):
+        self.size = max(1, size)
+        self._playwright = None
+        self._browser = None
+        self._contexts = None
+
+    async def __aenter__(self):
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True)
+        self._contexts = asyncio.Queue()
+        for _ in range(self.size):
+            context = await self._browser.new_context(user_agent=HEADERS['User-Agent'])
+            await context.route('**/*', self._block_heavy_resources)
+            self._contexts.put_nowait(context)
+        return self
+
+    async def __aexit__(self, *exc):
+        while not self._contexts.empty():
+            await self._contexts.get_nowait().close()
+        await self._browser.close()
+        await self._playwright.stop()
+
+    @staticmethod
+    async def _block_heavy_resources(route):
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def render(self, url: str, script: str, wait_selector: str):
+        """Load `url` in a free context and return the result of evaluating `script`."""
+        context = await self._contexts.get()
+        try:
+            page = await context.new_page()
+            try:
+                await page.goto(url, wait_until='domcontentloaded', timeout=30000)
+                try:
+                    await page.wait_for_selector(wait_selector, timeout=10000)
+                except Exception:
+                    logger.warning(f'Timed out waiting for member content on {url}')
+                return await page.evaluate(script)
+            finally:
+                await page.close()
+        finally:
+            self._contexts.put_nowait(context)
+
+
+PAGE_PARAM = re.compile(r'[?&]page=(\d+)')
+
+
+def member_page_numbers(page_links: list) -> list:
+    """Page numbers referenced by the directory's ?page=N links."""
+    numbers = set()
+    for link in page_links:
+        match = PAGE_PARAM.search(link)
+        if match:
+            numbers.add(int(match.group(1)))
+    return sorted(numbers)
+
+
+async def scrape_with_playwright_async(contexts: int = 4, max_pages: int = MAX_MEMBER_PAGES) -> list:
+    """Render every page of the member directory through a BrowserPool."""
+    members_url = f'{NDCA_BASE_URL}/members/'
+
+    async with BrowserPool(contexts) as pool:
+        first = await pool.render(members_url, EXTRACT_MEMBERS_JS, MEMBER_ROW_SELECTOR)
+        raw = list(first['members'])
+
+        # Fill gaps the pager does not link to directly (e.g. "1 2 3 ... 40")
+        linked = member_page_numbers(first['pageLinks'])
+        pages = list(range(2, min(max(linked, default=1), max_pages) + 1))
+        if pages:
+            logger.info(f'Rendering {len(pages)} more directory pages with {pool.size} browser contexts...')
+
+        async def render_page(n: int) -> list:
+            try:
+                rendered = await pool.render(f'{members_url}?page={n}', EXTRACT_MEMBERS_JS, MEMBER_ROW_SELECTOR)
+                return rendered['members']
+            except Exception as e:
+                logger.warning(f'Failed to render member page {n}: {e}')
+                return []
+
+        for members in await asyncio.gather(*(render_page(n) for n in pages)):
+            raw.extend(members)
+
+    return raw
+
+
+def scrape_with_playwright(contexts: int = 4, max_pages: int = MAX_MEMBER_PAGES) -> list:
     """Fallback to Playwright for JS-rendered pages."""
     try:
-        from playwright.sync_api import sync_playwright
+        import playwright  # noqa: F401
 
         logger.info('Falling back to Playwright for JS-rendered NDCA page...')
         dancers = []
 
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.goto(f'{NDCA_BASE_URL}/members/', timeout=30000)
-            page.wait_for_load_state('networkidle', timeout=20000)
-
-            # Wait for member content
-            try:
-                page.wait_for_selector('table, .member-list, .competitor-list', timeout=10000)
-            except Exception:
-                logger.warning('Timed out waiting for member content')
-
-            # Extract data via JavaScript evaluation
-            raw = page.evaluate('''() => {
-                const rows = document.querySelectorAll('table tbody tr, .member-row, .competitor');
-                return Array.from(rows).map(row => {
-                    const cells = row.querySelectorAll('td, .cell');
-                    return {
-                        name: cells[0]?.textContent?.trim() || '',
-                        ndcaId: cells[1]?.textContent?.trim() || '',
-                        studio: cells[2]?.textContent?.trim() || '',
-                        state: cells[3]?.textContent?.trim() || '',
-                    };
-                }).filter(d => d.name.length > 2);
-            }''')
-
-            for item in raw:
-                name_parts = item['name'].split(' ', 1)
-                dancers.append({
-                    'firstName': name_parts[0] if name_parts else '',
-                    'lastName': name_parts[1] if len(name_parts) > 1 else '',
-                    'ndcaId': item.get('ndcaId'),
-                    'studio': item.get('studio'),
-                    'state': item.get('state'),
-                    'styles': [],
-                    'source': 'NDCA',
-                })
-
-            browser.close()
+        # The browser fetches and extracts together, so rendering is one stage
+        with METRICS.stage('render'):
+            raw = asyncio.run(scrape_with_playwright_async(contexts, max_pages))
+
+        for item in raw:
+            # Full name, split by normalize_dancers like the requests path
+            dancers.append({
+                'name': (item.get('name') or '').strip(),
+                'ndcaId': item.get('ndcaId'),
+                'studio': item.get('studio'),
+                'state': item.get('state'),
+                'styles': [],
+                'source': 'NDCA',
+            })
 
         logger.info(f'Playwright scrape found {len(dancers)} dancers')
         return dancers
@@ -133,64 +330,189 @@ def scrape_with_playwright() -> list:
         return []
 
 
-def normalize_dancer(dancer: dict) -> dict:
-    """Normalize and clean dancer data."""
-    if 'name' in dancer and dancer['name']:
-        parts = dancer['name'].strip().split(' ', 1)
-        dancer['firstName'] = parts[0]
-        dancer['lastName'] = parts[1] if len(parts) > 1 else ''
+def url_pattern(url: str) -> str:
+    """Group URLs that render the same way: host + path, numeric segments wildcarded, query dropped."""
+    parsed = urlparse(url)
+    path = re.sub(r'/\d+(?=/|$)', '/*', parsed.path)
+    return f'{parsed.netloc}{path}'
+
 
-    dancer['firstName'] = dancer.get('firstName', '').strip().title()
-    dancer['lastName'] = dancer.get('lastName', '').strip().title()
+class StrategyMemory:
+    """Persisted record of which scrape strategy works for each URL pattern.
 
-    if dancer.get('state'):
-        dancer['state'] = dancer['state'].strip().upper()[:2]
+    Keeps per-strategy attempt/success counts and average wall time, and the
+    strategy that last succeeded. Later runs go straight to that strategy
+    and fall back to the others if it fails; if it is not the cheapest, the
+    cheaper ones are also tried first every REPROBE_EVERY runs in case the
+    site changed.
+    """
 
-    dancer.setdefault('styles', [])
-    dancer.setdefault('source', 'NDCA')
-    dancer.setdefault('isClaimed', False)
-    dancer.setdefault('isTeacher', False)
+    def __init__(self, path: Path):
+        self.path = path
+        self.patterns = {}
+        if path.exists():
+            with open(path) as f:
+                self.patterns = json.load(f)
 
-    return dancer
+    def _entry(self, url: str) -> dict:
+        return self.patterns.setdefault(url_pattern(url), {
+            'preferred': None,
+            'runsSinceProbe': 0,
+            'stats': {},
+        })
+
+    def plan(self, url: str, reprobe: bool = False) -> list:
+        """Strategies to try for `url`, in order."""
+        entry = self._entry(url)
+        preferred = entry['preferred']
+        if preferred is None or preferred == STRATEGIES[0]:
+            return list(STRATEGIES)
+
+        if reprobe or entry['runsSinceProbe'] + 1 >= REPROBE_EVERY:
+            logger.info(f'Re-probing cheaper strategies for {url_pattern(url)}')
+            entry['runsSinceProbe'] = 0
+            return list(STRATEGIES)
+
+        entry['runsSinceProbe'] += 1
+        logger.info(f'Using remembered strategy {preferred!r} for {url_pattern(url)}')
+        # The rest stay as fallbacks, so a broken remembered strategy doesn't wait for the next re-probe
+        return [preferred] + [s for s in STRATEGIES if s != preferred]
+
+    def record(self, url: str, strategy: str, succeeded: bool, seconds: float):
+        entry = self._entry(url)
+        stats = entry['stats'].setdefault(strategy, {'attempts': 0, 'successes': 0, 'avgSeconds': 0.0})
+        stats['attempts'] += 1
+        stats['successes'] += int(succeeded)
+        stats['avgSeconds'] = round(stats['avgSeconds'] + (seconds - stats['avgSeconds']) / stats['attempts'], 3)
+        if succeeded:
+            entry['preferred'] = strategy
+
+    def save(self):
+        write_atomic(self.path, json.dumps(self.patterns, indent=2))
+
+
+# Written by --sample for local development without network access
+SAMPLE_DANCERS = [
+    {'firstName': 'Alexandra', 'lastName': 'Thompson', 'ndcaId': 'NDCA-10001', 'state': 'FL', 'studio': 'Miami Ballroom'},
+    {'firstName': 'Benjamin', 'lastName': 'Clark', 'ndcaId': 'NDCA-10002', 'state': 'CA', 'studio': 'LA Dance'},
+    {'firstName': 'Christina', 'lastName': 'Davis', 'ndcaId': 'NDCA-10003', 'state': 'NY', 'studio': 'NYC Ballroom'},
+    {'firstName': 'Daniel', 'lastName': 'Evans', 'ndcaId': 'NDCA-10004', 'state': 'TX', 'studio': 'Texas Dance'},
+    {'firstName': 'Elizabeth', 'lastName': 'Foster', 'ndcaId': 'NDCA-10005', 'state': 'OH', 'studio': 'Ohio Stars'},
+]
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Scrape competitor listings from NDCA')
+    parser.add_argument('--jsonl', action='store_true',
+                        help=f'Write {JSONL_OUTPUT_FILE.name}, one record per line, instead of a JSON array')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Bypass the on-disk page cache ({DEFAULT_CACHE_FILE.name})')
+    parser.add_argument('--offline', action='store_true',
+                        help='Serve pages from the cache only; skips Playwright')
+    parser.add_argument('--parser', choices=sorted(PARSER_BACKENDS), default=DEFAULT_PARSER,
+                        help=f'HTML parser backend for the member directory (default: {DEFAULT_PARSER})')
+    parser.add_argument('--browser-contexts', type=int, default=4,
+                        help='Playwright browser contexts rendering directory pages in parallel (default: 4)')
+    parser.add_argument('--max-pages', type=int, default=MAX_MEMBER_PAGES,
+                        help=f'Most member directory pages to render with Playwright (default: {MAX_MEMBER_PAGES})')
+    parser.add_argument('--reprobe', action='store_true',
+                        help='Try every strategy in cost order, ignoring the remembered one')
+    parser.add_argument('--sample', action='store_true',
+                        help='Write built-in sample dancers instead of scraping (local development)')
+    parser.add_argument('--report', type=Path, default=REPORT_FILE,
+                        help=f'JSON run report with stage timings and counters (default: {REPORT_FILE})')
+    parser.add_argument('--prometheus', type=Path,
+                        help='Also write the run metrics to this Prometheus textfile (node_exporter textfile collector)')
+    parser.add_argument('--check-parsers', action='store_true',
+                        help='Compare every parser backend on the pages in fixtures/; exits non-zero on a mismatch')
+    args = parser.parse_args()
+    if args.check_parsers:
+        failures = check_parsers()
+        for line in failures:
+            print(f'  {line}')
+        if failures:
+            print(f'\n❌ {len(failures)} parser parity check(s) failed')
+            sys.exit(1)
+        pages = len(list(FIXTURES_DIR.glob('ndca_*.html')))
+        print(f'✅ {" and ".join(sorted(PARSER_BACKENDS))} agree on {pages} fixture page(s)')
+        return
+    if args.offline and args.no_cache:
+        parser.error('--offline needs the page cache')
+
     OUTPUT_DIR.mkdir(exist_ok=True)
 
     logger.info('=== FilledCard NDCA Scraper ===')
 
-    # Try requests first, fall back to Playwright
-    dancers_raw = scrape_with_requests()
-    if not dancers_raw:
-        dancers_raw = scrape_with_playwright()
+    METRICS.reset('ndca')
+    cache = None if args.no_cache else ResponseCache()
+    client = make_client()
+    session = CachedSession(client, cache, offline=args.offline)
+
+    scrapers = {
+        'requests': lambda: scrape_with_requests(session, args.parser),
+        'playwright': lambda: scrape_with_playwright(args.browser_contexts, args.max_pages),
+    }
+
+    # Cheapest strategy first unless a costlier one is remembered for this URL
+    members_url = f'{NDCA_BASE_URL}/members/'
+    memory = StrategyMemory(STRATEGY_FILE)
+    dancers_raw = SAMPLE_DANCERS if args.sample else None
+    if args.sample:
+        strategies = []
+    elif args.offline:
+        # Rendered pages are not cached, so only the requests parser can replay the cache
+        strategies = ['requests']
+    else:
+        strategies = memory.plan(members_url, reprobe=args.reprobe)
+    for strategy in strategies:
+        started = time.monotonic()
+        try:
+            dancers_raw = scrapers[strategy]()
+        except Exception as e:
+            # A fetch error says nothing about which strategy works; don't remember it
+            logger.warning(f'{strategy} scrape failed: {e}')
+            continue
+        if not args.offline:
+            memory.record(members_url, strategy, bool(dancers_raw), time.monotonic() - started)
+        if dancers_raw:
+            break
+    memory.save()
+    METRICS.record_http(client, cache)
+    if cache:
+        cache.close()
 
     if not dancers_raw:
-        logger.warning('No data scraped. Generating sample data for testing...')
-        # Sample data for when the actual site can't be scraped
-        dancers_raw = [
-            {'firstName': 'Alexandra', 'lastName': 'Thompson', 'ndcaId': 'NDCA-10001', 'state': 'FL', 'studio': 'Miami Ballroom'},
-            {'firstName': 'Benjamin', 'lastName': 'Clark', 'ndcaId': 'NDCA-10002', 'state': 'CA', 'studio': 'LA Dance'},
-            {'firstName': 'Christina', 'lastName': 'Davis', 'ndcaId': 'NDCA-10003', 'state': 'NY', 'studio': 'NYC Ballroom'},
-            {'firstName': 'Daniel', 'lastName': 'Evans', 'ndcaId': 'NDCA-10004', 'state': 'TX', 'studio': 'Texas Dance'},
-            {'firstName': 'Elizabeth', 'lastName': 'Foster', 'ndcaId': 'NDCA-10005', 'state': 'OH', 'studio': 'Ohio Stars'},
-        ]
-
-    dancers = [normalize_dancer(d) for d in dancers_raw if d.get('firstName')]
-
-    # Deduplicate
-    seen = set()
-    unique = []
-    for d in dancers:
-        key = f"{d['firstName'].lower()}_{d['lastName'].lower()}_{d.get('state', '')}"
-        if key not in seen:
-            seen.add(key)
-            unique.append(d)
-
-    logger.info(f'Writing {len(unique)} unique dancers to {OUTPUT_FILE}')
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(unique, f, indent=2, default=str)
-
-    print(f'\n✅ NDCA scrape complete: {len(unique)} dancers written to {OUTPUT_FILE}')
+        # Leave the previous output alone rather than writing an empty or fake scrape
+        logger.error('No dancers scraped; output left untouched')
+        METRICS.write(args.report, args.prometheus)
+        sys.exit(1)
+
+    with METRICS.stage('normalize'):
+        # Scraped rows carry a full 'name'; sample rows come pre-split
+        dancers = normalize_dancers([d for d in dancers_raw if d.get('firstName') or d.get('name')])
+
+        # Deduplicate
+        seen = set()
+        unique = []
+        for d in dancers:
+            key = f"{d['firstName'].lower()}_{d['lastName'].lower()}_{d.get('state', '')}"
+            if key not in seen:
+                seen.add(key)
+                unique.append(d)
+
+    output_file = JSONL_OUTPUT_FILE if args.jsonl else OUTPUT_FILE
+    logger.info(f'Writing {len(unique)} unique dancers to {output_file}')
+    with METRICS.stage('write'), open(output_file, 'w') as f:
+        if args.jsonl:
+            for d in unique:
+                f.write(json.dumps(d, default=str) + '\n')
+        else:
+            json.dump(unique, f, indent=2, default=str)
+    METRICS.count('rows', len(unique))
+    METRICS.write(args.report, args.prometheus)
+
+    print(f'\n✅ NDCA scrape complete: {len(unique)} dancers written to {output_file}')
+    print(f'Run report: {args.report}')
 
 
 if __name__ == '__main__':
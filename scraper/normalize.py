@@ -0,0 +1,391 @@
+"""
+FilledCard Normalization
+Canonical forms of scraped values, shared by the scrapers and the importer.
+
+Lookup tables and regexes are built once at import. Values that repeat across
+thousands of rows (styles, levels, states, studio names, name parts) go
+through bounded caches, so each distinct value is normalized once per run,
+and the batch functions normalize a whole chunk at once by mapping only its
+distinct values. Outputs are pinned by CHECK_CASES; `--check` verifies them
+and that every batch function agrees with its row-at-a-time counterpart.
+
+Requirements:
+  none beyond the standard library
+
+Usage:
+  python normalize.py --check
+"""
+
+import re
+import sys
+import copy
+import random
+import argparse
+from functools import lru_cache
+from typing import Optional
+
+CACHE_SIZE = 65536
+
+STYLE_NAMES = {
+    'waltz': 'WALTZ',
+    'tango': 'TANGO',
+    'foxtrot': 'FOXTROT',
+    'viennese waltz': 'VIENNESE_WALTZ',
+    'viennese': 'VIENNESE_WALTZ',
+    'quickstep': 'QUICKSTEP',
+    'cha cha': 'CHA_CHA',
+    'cha-cha': 'CHA_CHA',
+    'samba': 'SAMBA',
+    'rumba': 'RUMBA',
+    'paso doble': 'PASO_DOBLE',
+    'paso': 'PASO_DOBLE',
+    'jive': 'JIVE',
+    'bolero': 'BOLERO',
+    'mambo': 'MAMBO',
+    'west coast swing': 'WEST_COAST_SWING',
+    'wcs': 'WEST_COAST_SWING',
+}
+
+LEVEL_NAMES = {
+    'newcomer': 'NEWCOMER',
+    'bronze': 'BRONZE',
+    'silver': 'SILVER',
+    'gold': 'GOLD',
+    'novice': 'NOVICE',
+    'pre-championship': 'PRE_CHAMP',
+    'pre championship': 'PRE_CHAMP',
+    'pre-champ': 'PRE_CHAMP',
+    'championship': 'CHAMPIONSHIP',
+    'champ': 'CHAMPIONSHIP',
+}
+
+STYLE_TO_CATEGORY = {
+    'WALTZ': 'STANDARD',
+    'TANGO': 'STANDARD',
+    'FOXTROT': 'SMOOTH',
+    'VIENNESE_WALTZ': 'STANDARD',
+    'QUICKSTEP': 'STANDARD',
+    'CHA_CHA': 'RHYTHM',
+    'SAMBA': 'LATIN',
+    'RUMBA': 'RHYTHM',
+    'PASO_DOBLE': 'LATIN',
+    'JIVE': 'LATIN',
+    'BOLERO': 'RHYTHM',
+    'MAMBO': 'RHYTHM',
+    'WEST_COAST_SWING': 'RHYTHM',
+}
+
+# Level stored for heats whose title doesn't name one
+UNKNOWN = 'UNKNOWN'
+
+DIGITS = re.compile(r'\d+')
+YEAR = re.compile(r'20\d{2}')
+
+
+# --- Single values -------------------------------------------------------------
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_style_name(raw_style: str) -> str:
+    """Convert human-readable style name to enum value."""
+    return STYLE_NAMES.get(raw_style.lower().strip(), raw_style.upper().replace(' ', '_'))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_level(raw_level: str) -> str:
+    """Convert human-readable level to enum value."""
+    return LEVEL_NAMES.get(raw_level.lower().strip(), 'BRONZE')
+
+
+def style_level(style_info) -> tuple:
+    """(style, category, level) for one entry of an NDCA dancer's styles: a style name or {'style', 'level'}."""
+    if isinstance(style_info, dict):
+        style = normalize_style_name(style_info.get('style', style_info))
+        level = normalize_level(style_info.get('level', 'BRONZE'))
+    else:
+        style = normalize_style_name(style_info)
+        level = 'BRONZE'
+    return style, STYLE_TO_CATEGORY.get(style, 'STANDARD'), level
+
+
+def result_style_level(result: dict) -> tuple:
+    """(style, category, level) to store for a scraped O2CM result.
+
+    Results parsed by heat_titles.py are already canonical: style is None
+    for multi-dance heats and titles that name no dance, and a missing level
+    is stored as UNKNOWN. Older scraper output carries raw cell text and is
+    normalized here.
+    """
+    if 'heat' in result:
+        return result.get('style'), result.get('category'), result.get('level') or UNKNOWN
+    style = normalize_style_name(result.get('style', 'WALTZ'))
+    return style, STYLE_TO_CATEGORY.get(style), normalize_level(result.get('level', 'BRONZE'))
+
+
+def parse_placement(val: str) -> Optional[int]:
+    """Parse placement from string like '1st', '2', etc."""
+    if not val:
+        return None
+    match = DIGITS.search(val)
+    return int(match.group()) if match else None
+
+
+def parse_int(val: str) -> Optional[int]:
+    if not val:
+        return None
+    match = DIGITS.search(val)
+    return int(match.group()) if match else None
+
+
+def extract_date(competition_name: str) -> Optional[str]:
+    """Try to extract year from competition name (fallback when the page has no date)."""
+    match = YEAR.search(competition_name)
+    if match:
+        return f"{match.group()}-01-01"
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def canonical_state(state: str) -> str:
+    """' oh ' -> 'OH'; longer names are cut to two letters as scraped."""
+    return state.strip().upper()[:2]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def canonical_name_part(part: str) -> str:
+    """' mary ann ' -> 'Mary Ann'."""
+    return part.strip().title()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def canonical_text(text: str) -> str:
+    """The first-seen copy of an equal string (studio names, ...), so repeats share one object."""
+    return text
+
+
+def split_first_last(name: str) -> tuple:
+    """NDCA directory names: first word, then everything after it ('Mary Ann Smith' -> 'Mary', 'Ann Smith').
+
+    O2CM names go through identity.split_name, which handles "Last, First" and surname particles.
+    """
+    parts = name.strip().split(' ', 1)
+    return parts[0], parts[1] if len(parts) > 1 else ''
+
+
+def normalize_dancer(dancer: dict) -> dict:
+    """Normalize and clean dancer data."""
+    if 'name' in dancer and dancer['name']:
+        dancer['firstName'], dancer['lastName'] = split_first_last(dancer['name'])
+
+    dancer['firstName'] = canonical_name_part(dancer.get('firstName', ''))
+    dancer['lastName'] = canonical_name_part(dancer.get('lastName', ''))
+
+    if dancer.get('state'):
+        dancer['state'] = canonical_state(dancer['state'])
+    if dancer.get('studio'):
+        dancer['studio'] = canonical_text(dancer['studio'])
+
+    dancer.setdefault('styles', [])
+    dancer.setdefault('source', 'NDCA')
+    dancer.setdefault('isClaimed', False)
+    dancer.setdefault('isTeacher', False)
+
+    return dancer
+
+
+# --- Whole chunks --------------------------------------------------------------
+
+def map_distinct(fn, values: list) -> list:
+    """[fn(v) for v in values], calling fn once per distinct value."""
+    table = {}
+    for value in values:
+        if value not in table:
+            table[value] = fn(value)
+    return [table[value] for value in values]
+
+
+def normalize_styles(values: list) -> list:
+    return map_distinct(normalize_style_name, values)
+
+
+def normalize_levels(values: list) -> list:
+    return map_distinct(normalize_level, values)
+
+
+def result_style_levels(results: list) -> list:
+    """result_style_level for every result in a chunk."""
+    raw = [r for r in results if 'heat' not in r]
+    styles = iter(normalize_styles([r.get('style', 'WALTZ') for r in raw]))
+    levels = iter(normalize_levels([r.get('level', 'BRONZE') for r in raw]))
+    rows = []
+    for r in results:
+        if 'heat' in r:
+            rows.append((r.get('style'), r.get('category'), r.get('level') or UNKNOWN))
+        else:
+            style = next(styles)
+            rows.append((style, STYLE_TO_CATEGORY.get(style), next(levels)))
+    return rows
+
+
+def normalize_dancers(dancers: list) -> list:
+    """normalize_dancer for a whole chunk, in place; name parts, states and studios are mapped once per distinct value."""
+    for dancer in dancers:
+        if 'name' in dancer and dancer['name']:
+            dancer['firstName'], dancer['lastName'] = split_first_last(dancer['name'])
+
+    firsts = map_distinct(canonical_name_part, [d.get('firstName', '') for d in dancers])
+    lasts = map_distinct(canonical_name_part, [d.get('lastName', '') for d in dancers])
+    with_state = [d for d in dancers if d.get('state')]
+    states = map_distinct(canonical_state, [d['state'] for d in with_state])
+    with_studio = [d for d in dancers if d.get('studio')]
+    studios = map_distinct(canonical_text, [d['studio'] for d in with_studio])
+
+    for dancer, first, last in zip(dancers, firsts, lasts):
+        dancer['firstName'] = first
+        dancer['lastName'] = last
+        dancer.setdefault('styles', [])
+        dancer.setdefault('source', 'NDCA')
+        dancer.setdefault('isClaimed', False)
+        dancer.setdefault('isTeacher', False)
+    for dancer, state in zip(with_state, states):
+        dancer['state'] = state
+    for dancer, studio in zip(with_studio, studios):
+        dancer['studio'] = studio
+    return dancers
+
+
+# --- Self-check ----------------------------------------------------------------
+
+# (function, input, expected output), recorded from the per-script functions this module replaced
+CHECK_CASES = [
+    (normalize_style_name, 'Waltz', 'WALTZ'),
+    (normalize_style_name, ' waltz ', 'WALTZ'),
+    (normalize_style_name, 'Viennese Waltz', 'VIENNESE_WALTZ'),
+    (normalize_style_name, 'viennese', 'VIENNESE_WALTZ'),
+    (normalize_style_name, 'Cha-Cha', 'CHA_CHA'),
+    (normalize_style_name, 'cha cha', 'CHA_CHA'),
+    (normalize_style_name, 'Paso', 'PASO_DOBLE'),
+    (normalize_style_name, 'WCS', 'WEST_COAST_SWING'),
+    (normalize_style_name, 'West Coast Swing', 'WEST_COAST_SWING'),
+    (normalize_style_name, 'Hustle', 'HUSTLE'),
+    (normalize_style_name, 'Night Club Two Step', 'NIGHT_CLUB_TWO_STEP'),
+    (normalize_style_name, '', ''),
+    (normalize_style_name, 'SAMBA', 'SAMBA'),
+    (normalize_level, 'Gold', 'GOLD'),
+    (normalize_level, 'pre-champ', 'PRE_CHAMP'),
+    (normalize_level, 'Pre Championship', 'PRE_CHAMP'),
+    (normalize_level, 'Champ', 'CHAMPIONSHIP'),
+    (normalize_level, 'championship', 'CHAMPIONSHIP'),
+    (normalize_level, ' Silver ', 'SILVER'),
+    (normalize_level, 'Novice', 'NOVICE'),
+    (normalize_level, 'Open', 'BRONZE'),
+    (normalize_level, '', 'BRONZE'),
+    (normalize_level, 'B2', 'BRONZE'),
+    (parse_placement, '1st', 1),
+    (parse_placement, '  12th ', 12),
+    (parse_placement, 'T3', 3),
+    (parse_placement, 'DNF', None),
+    (parse_placement, '', None),
+    (parse_placement, None, None),
+    (parse_int, '7 of 9', 7),
+    (parse_int, '--', None),
+    (extract_date, 'Ohio Star Ball 2024', '2024-01-01'),
+    (extract_date, 'Nationals 1999', None),
+    (extract_date, '2019 Emerald Ball 2020', '2019-01-01'),
+    (extract_date, 'Star Ball', None),
+    (style_level, 'Foxtrot', ('FOXTROT', 'SMOOTH', 'BRONZE')),
+    (style_level, {'style': 'Rumba', 'level': 'Gold'}, ('RUMBA', 'RHYTHM', 'GOLD')),
+    (style_level, 'Hustle', ('HUSTLE', 'STANDARD', 'BRONZE')),
+    (result_style_level, {'heat': 'Am. Bronze Tango', 'style': 'TANGO', 'category': 'STANDARD', 'level': None},
+     ('TANGO', 'STANDARD', UNKNOWN)),
+    (result_style_level, {'heat': 'Am. Gold Smooth W/T/F', 'style': None, 'category': 'SMOOTH', 'level': 'GOLD'},
+     (None, 'SMOOTH', 'GOLD')),
+    (result_style_level, {'style': 'Cha Cha', 'level': 'Silver'}, ('CHA_CHA', 'RHYTHM', 'SILVER')),
+    (result_style_level, {}, ('WALTZ', 'STANDARD', 'BRONZE')),
+    (normalize_dancer, {'name': 'john smith', 'state': ' oh '},
+     {'name': 'john smith', 'state': 'OH', 'firstName': 'John', 'lastName': 'Smith',
+      'styles': [], 'source': 'NDCA', 'isClaimed': False, 'isTeacher': False}),
+    (normalize_dancer, {'name': '  Mary Ann  Smith', 'state': 'California'},
+     {'name': '  Mary Ann  Smith', 'state': 'CA', 'firstName': 'Mary', 'lastName': 'Ann  Smith',
+      'styles': [], 'source': 'NDCA', 'isClaimed': False, 'isTeacher': False}),
+    (normalize_dancer, {'firstName': 'anna', 'lastName': "o'neil-DE LA cruz"},
+     {'firstName': 'Anna', 'lastName': "O'Neil-De La Cruz",
+      'styles': [], 'source': 'NDCA', 'isClaimed': False, 'isTeacher': False}),
+    (normalize_dancer, {'name': 'Cher'},
+     {'name': 'Cher', 'firstName': 'Cher', 'lastName': '',
+      'styles': [], 'source': 'NDCA', 'isClaimed': False, 'isTeacher': False}),
+    (normalize_dancer, {'name': 'Jean-Luc  Picard', 'state': ''},
+     {'name': 'Jean-Luc  Picard', 'state': '', 'firstName': 'Jean-Luc', 'lastName': 'Picard',
+      'styles': [], 'source': 'NDCA', 'isClaimed': False, 'isTeacher': False}),
+    (normalize_dancer, {'firstName': 'x', 'lastName': 'y', 'styles': ['Waltz'], 'source': 'X', 'isTeacher': True},
+     {'firstName': 'X', 'lastName': 'Y', 'styles': ['Waltz'], 'source': 'X', 'isTeacher': True, 'isClaimed': False}),
+]
+
+
+def random_records(n: int, seed: int = 0) -> tuple:
+    """(dancers, results) with repeated and messy values, for batch-vs-row comparisons."""
+    rng = random.Random(seed)
+    names = ['john smith', '  Mary Ann  Smith', 'Cher', 'anna DE LA cruz', 'Jean-Luc  Picard', '', 'o\'neil']
+    states = [' oh ', 'California', 'tx', '', None]
+    studios = ['Arthur Murray', 'Dance Fusion ', '', None]
+    styles = list(STYLE_NAMES) + ['Hustle', 'Cha-Cha', ' WALTZ ', '']
+    levels = list(LEVEL_NAMES) + ['Open', ' Gold ', '']
+    dancers = []
+    for _ in range(n):
+        dancer = {'name': rng.choice(names), 'state': rng.choice(states), 'studio': rng.choice(studios)}
+        if rng.random() < 0.2:
+            dancer = {'firstName': rng.choice(names), 'lastName': rng.choice(names), 'source': 'X'}
+        dancers.append(dancer)
+    results = []
+    for _ in range(n):
+        result = {'style': rng.choice(styles), 'level': rng.choice(levels)}
+        if rng.random() < 0.5:
+            result = {'heat': 'Am. Gold Waltz', 'style': rng.choice(['WALTZ', None]), 'category': 'STANDARD',
+                      'level': rng.choice(['GOLD', None])}
+        elif rng.random() < 0.1:
+            result = {}
+        results.append(result)
+    return dancers, results
+
+
+def check() -> list:
+    """Failures of CHECK_CASES and of batch/row agreement, as readable lines (empty when all pass)."""
+    failures = []
+    for fn, value, expected in CHECK_CASES:
+        got = fn(copy.deepcopy(value))
+        if got != expected:
+            failures.append(f'{fn.__name__}({value!r}) = {got!r}, expected {expected!r}')
+
+    dancers, results = random_records(5000)
+    rows = [normalize_dancer(d) for d in copy.deepcopy(dancers)]
+    if normalize_dancers(copy.deepcopy(dancers)) != rows:
+        failures.append('normalize_dancers differs from normalize_dancer')
+    if result_style_levels(results) != [result_style_level(r) for r in results]:
+        failures.append('result_style_levels differs from result_style_level')
+    raw = [r for r in results if 'heat' not in r and 'style' in r]
+    if normalize_styles([r['style'] for r in raw]) != [normalize_style_name(r['style']) for r in raw]:
+        failures.append('normalize_styles differs from normalize_style_name')
+    if normalize_levels([r['level'] for r in raw]) != [normalize_level(r['level']) for r in raw]:
+        failures.append('normalize_levels differs from normalize_level')
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Normalization helpers shared by the scrapers and importer')
+    parser.add_argument('--check', action='store_true',
+                        help='Verify the pinned outputs and batch/row agreement; exits non-zero on a mismatch')
+    args = parser.parse_args()
+    if not args.check:
+        parser.print_help()
+        return
+
+    failures = check()
+    for line in failures:
+        print(f'  {line}')
+    if failures:
+        print(f'\n❌ {len(failures)} normalization check(s) failed')
+        sys.exit(1)
+    print(f'✅ {len(CHECK_CASES)} pinned cases and batch/row agreement OK')
+
+
+if __name__ == '__main__':
+    main()
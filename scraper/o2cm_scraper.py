@@ -3,196 +3,877 @@ FilledCard O2CM Scraper
 Scrapes competition results from o2cm.com
 
 Requirements:
-  pip install requests beautifulsoup4
+  pip install requests beautifulsoup4 lxml
+
+Usage:
+  python o2cm_scraper.py
+  python o2cm_scraper.py --async --concurrency 8 --rate 2
+  python o2cm_scraper.py --crawl             # full history, resumable
+  python o2cm_scraper.py --crawl --restart   # discard the crawl frontier and start over
+  python o2cm_scraper.py --jsonl             # stream one JSON record per line as events are scraped
+  python o2cm_scraper.py --crawl --offline   # re-parse everything from the page cache, no network
+  python o2cm_scraper.py --parser html.parser   # pure-Python BeautifulSoup row extraction
+  python o2cm_scraper.py --check-parsers     # both parser backends must agree on fixtures/
+  python o2cm_scraper.py --crawl --async --concurrency 8 --parse-workers 4
+  python o2cm_scraper.py --incremental       # nightly: only new or still-changing events, writes the delta
+  python o2cm_scraper.py --sample            # write built-in sample results, no network
+  python o2cm_scraper.py --prometheus /var/lib/node_exporter/textfile/filledcard_o2cm.prom
 """
 
 import json
-import time
+import hashlib
+import asyncio
 import logging
+import argparse
 import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
+from datetime import datetime, timedelta
 from typing import Optional
-from urllib.parse import urlencode, urljoin
+from urllib.parse import urlencode, urljoin, urlparse
+
+from http_cache import ResponseCache, CachedSession, DEFAULT_CACHE_FILE
+from http_client import HttpClient
+from heat_titles import parse_heat_title
+from metrics import METRICS
+from normalize import YEAR, extract_date, parse_placement, parse_int
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
 logger = logging.getLogger(__name__)
 
 OUTPUT_DIR = Path(__file__).parent / 'output'
 OUTPUT_FILE = OUTPUT_DIR / 'o2cm_results.json'
+JSONL_OUTPUT_FILE = OUTPUT_DIR / 'o2cm_results.jsonl'
+FRONTIER_FILE = OUTPUT_DIR / 'o2cm_frontier.json'
+MANIFEST_FILE = OUTPUT_DIR / 'o2cm_manifest.json'
+REPORT_FILE = OUTPUT_DIR / 'o2cm_report.json'
+
+# Crawl mode writes results + frontier to disk after this many events
+CHECKPOINT_EVERY = 10
+MAX_LISTING_PAGES = 500
+# Raw pages waiting to be parsed before fetchers are made to wait
+PARSE_QUEUE_SIZE = 32
+# An event's results are treated as final once unchanged for this long
+FINAL_AFTER_DAYS = 7
+# Competition dates are printed near the top of a results page
+EVENT_HEADER_CHARS = 20000
 
 O2CM_BASE = 'https://o2cm.com'
 O2CM_EVENTS_URL = f'{O2CM_BASE}/ordermanager/eventlist.asp'
 
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (compatible; FilledCard/1.0; research scraper)',
+    'Accept': 'text/html,application/xhtml+xml',
+}
+
+
+def make_client(rate: float = 1.0, concurrency: int = 4) -> HttpClient:
+    """Create the rate-limited, retrying HTTP client with the scraper's default headers."""
+    return HttpClient(HEADERS, rate=rate, pool_size=concurrency)
+
+
+def parse_event_links(html: str) -> list:
+    """Extract competition links from an O2CM event listing page."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+
+    events = []
+    # O2CM event links typically look like /ordermanager/results3.asp?event=EVENTCODE
+    for link in soup.find_all('a', href=True):
+        href = link['href']
+        if 'results3.asp' in href or 'results2.asp' in href:
+            event_name = link.get_text(strip=True)
+            if event_name:
+                events.append({
+                    'name': event_name,
+                    'url': urljoin(O2CM_BASE, href),
+                })
+    return events
+
+
+def parse_listing_links(html: str, page_url: str) -> list:
+    """Extract links to further event listing pages (older years, next page, etc.)."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+
+    pages = []
+    for link in soup.find_all('a', href=True):
+        if 'eventlist.asp' in link['href']:
+            pages.append(urljoin(page_url, link['href']).split('#', 1)[0])
+    return pages
 
-def get_event_list(session) -> list:
-    """Fetch list of competitions from O2CM."""
+
+def get_event_list(session, limit: Optional[int] = 20) -> Optional[list]:
+    """Fetch list of competitions from O2CM (most recent `limit`, or all if None).
+
+    Returns None if the listing could not be fetched.
+    """
     try:
         resp = session.get(O2CM_EVENTS_URL, timeout=15)
         resp.raise_for_status()
 
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(resp.text, 'html.parser')
-
-        events = []
-        # O2CM event links typically look like /ordermanager/results3.asp?event=EVENTCODE
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            if 'results3.asp' in href or 'results2.asp' in href:
-                event_name = link.get_text(strip=True)
-                if event_name:
-                    events.append({
-                        'name': event_name,
-                        'url': urljoin(O2CM_BASE, href),
-                    })
+        events = parse_event_links(resp.text)
 
         logger.info(f'Found {len(events)} events on O2CM')
-        return events[:20]  # Limit to most recent 20 events
+        return events[:limit] if limit else events
     except Exception as e:
         logger.error(f'Failed to get event list: {e}')
-        return []
+        return None
 
 
-def scrape_event_results(session, event: dict) -> list:
-    """Scrape results from a single competition."""
+def crawl_event_list(session, max_pages: int = MAX_LISTING_PAGES) -> Optional[list]:
+    """Walk every event listing page O2CM links to and return all events, deduplicated by URL.
+
+    Returns None if not even the first listing page could be fetched.
+    """
+    queue = [O2CM_EVENTS_URL]
+    visited_pages = set()
+    events = []
+    seen_events = set()
+
+    while queue and len(visited_pages) < max_pages:
+        page_url = queue.pop(0)
+        if page_url in visited_pages:
+            continue
+        visited_pages.add(page_url)
+
+        try:
+            resp = session.get(page_url, timeout=15)
+            resp.raise_for_status()
+        except Exception as e:
+            logger.warning(f'Failed to fetch listing page {page_url}: {e}')
+            if page_url == O2CM_EVENTS_URL:
+                return None
+            continue
+
+        for event in parse_event_links(resp.text):
+            if event['url'] not in seen_events:
+                seen_events.add(event['url'])
+                events.append(event)
+        for next_url in parse_listing_links(resp.text, page_url):
+            if next_url not in visited_pages:
+                queue.append(next_url)
+
+    logger.info(f'Found {len(events)} events across {len(visited_pages)} listing pages')
+    return events
+
+
+class CrawlFrontier:
+    """On-disk record of every known event URL with its fetch status.
+
+    Statuses are 'pending', 'done' and 'failed'; anything not 'done' is
+    fetched again on the next run.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.events = {}
+        if path.exists():
+            with open(path) as f:
+                self.events = json.load(f).get('events', {})
+
+    def reset(self):
+        self.events = {}
+
+    def add_events(self, events: list):
+        for event in events:
+            self.events.setdefault(event['url'], {
+                'name': event['name'],
+                'status': 'pending',
+                'lastFetched': None,
+                'resultCount': 0,
+            })
+
+    def pending(self) -> list:
+        return [
+            {'name': entry['name'], 'url': url}
+            for url, entry in self.events.items()
+            if entry['status'] != 'done'
+        ]
+
+    def mark(self, url: str, results: Optional[list]):
+        """Record the outcome of fetching an event; `results` is None on failure."""
+        entry = self.events[url]
+        entry['status'] = 'failed' if results is None else 'done'
+        entry['lastFetched'] = datetime.now().isoformat(timespec='seconds')
+        entry['resultCount'] = len(results or [])
+
+    def save(self):
+        write_json_atomic(self.path, {'events': self.events})
+
+
+class ScrapeManifest:
+    """On-disk record of every scraped event: content hash and whether results are final.
+
+    Incremental runs only fetch events that are new or not yet final, and only
+    pass on results for events whose content hash changed. Results count as
+    final when the event's year is past, or when they have not changed for
+    FINAL_AFTER_DAYS.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.events = {}
+        if path.exists():
+            with open(path) as f:
+                self.events = json.load(f).get('events', {})
+
+    def due(self, events: list) -> list:
+        """Events that are new or whose results may still change."""
+        return [event for event in events if not self.events.get(event['url'], {}).get('final')]
+
+    def final_urls(self) -> list:
+        return [url for url, entry in self.events.items() if entry.get('final')]
+
+    def record(self, event: dict, results: Optional[list]) -> bool:
+        """Record a scrape of `event`; returns True if its results are new or changed.
+
+        A failed fetch (`results` is None) leaves the entry untouched so the
+        event is retried next run.
+        """
+        if results is None:
+            return False
+
+        now = datetime.now()
+        content_hash = hashlib.sha256(
+            json.dumps(results, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        entry = self.events.get(event['url'])
+        changed = entry is None or entry['contentHash'] != content_hash
+        if changed:
+            entry = self.events[event['url']] = {
+                'name': event['name'],
+                'contentHash': content_hash,
+                'resultCount': len(results),
+                'firstScraped': entry['firstScraped'] if entry else now.isoformat(timespec='seconds'),
+                'lastChanged': now.isoformat(timespec='seconds'),
+                'final': False,
+            }
+        entry['lastScraped'] = now.isoformat(timespec='seconds')
+
+        year = YEAR.search(event['name'])
+        past_year = bool(year) and int(year.group()) < now.year
+        stable = now - datetime.fromisoformat(entry['lastChanged']) >= timedelta(days=FINAL_AFTER_DAYS)
+        entry['final'] = bool(results) and (past_year or stable)
+        return changed
+
+    def save(self):
+        write_json_atomic(self.path, {'events': self.events})
+
+
+def write_json_atomic(path: Path, data):
+    """Write JSON to a temp file and rename it over `path`, so a crash never leaves a torn file."""
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2, default=str)
+    tmp.replace(path)
+
+
+class JsonResultWriter:
+    """Collects results in memory and writes them as one JSON array.
+
+    Repeated externalIds are dropped, keeping the first occurrence.
+    `checkpoint` rewrites the whole file; fine for the default 20-event run.
+    """
+
+    def __init__(self, path: Path, resume: bool = False):
+        self.path = path
+        self.results = []
+        self.seen = set()
+        if resume and path.exists():
+            with open(path) as f:
+                self.add(json.load(f))
+            logger.info(f'Resuming with {self.count} results from previous runs')
+
+    @property
+    def count(self) -> int:
+        return len(self.results)
+
+    def add(self, results: list):
+        with METRICS.stage('write'):
+            for r in results:
+                key = r.get('externalId', str(r))
+                if key not in self.seen:
+                    self.seen.add(key)
+                    self.results.append(r)
+
+    def checkpoint(self):
+        with METRICS.stage('write'):
+            write_json_atomic(self.path, self.results)
+
+    def close(self):
+        self.checkpoint()
+
+
+class JsonlResultWriter:
+    """Streams results to a line-delimited JSON file as they are scraped.
+
+    Only the externalIds seen so far are held in memory, so a full-history
+    crawl runs in flat memory. Each `add` call (one event) is flushed to disk.
+    The file is only opened (and, unless resuming, truncated) once results
+    arrive or the writer is closed, so a run that fails before then leaves the
+    previous output untouched.
+    """
+
+    def __init__(self, path: Path, resume: bool = False):
+        self.path = path
+        self.seen = set()
+        self.count = 0
+        if resume and path.exists():
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        r = json.loads(line)
+                        self.seen.add(r.get('externalId', str(r)))
+                        self.count += 1
+            logger.info(f'Resuming with {self.count} results from previous runs')
+        self._mode = 'a' if resume else 'w'
+        self._file = None
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, self._mode)
+        return self._file
+
+    def add(self, results: list):
+        if not results:
+            return
+        with METRICS.stage('write'):
+            f = self._open()
+            for r in results:
+                key = r.get('externalId', str(r))
+                if key not in self.seen:
+                    self.seen.add(key)
+                    f.write(json.dumps(r, default=str) + '\n')
+                    self.count += 1
+            f.flush()
+
+    def checkpoint(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        self._open().close()
+
+
+# Elements whose text get_text() leaves out; the lxml backends skip their text nodes too
+NON_TEXT_TAGS = ('script', 'style', 'template', 'rt', 'rp')
+CELL_TEXT_XPATH = './/text()[not(%s)]' % ' or '.join(f'ancestor::{tag}' for tag in NON_TEXT_TAGS)
+
+
+def extract_rows_bs4(html: str) -> list:
+    """Cell texts for every non-header table row, via BeautifulSoup's html.parser."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+
+    rows = []
+    for table in soup.find_all('table'):
+        for row in table.find_all('tr')[1:]:  # Skip header
+            rows.append([td.get_text(strip=True) for td in row.find_all('td')])
+    return rows
+
+
+def extract_rows_lxml(html: str) -> list:
+    """Cell texts for every non-header table row, via lxml and XPath.
+
+    Walks the same elements as extract_rows_bs4 (nested tables included),
+    skips text inside NON_TEXT_TAGS and joins stripped text nodes the way
+    get_text(strip=True) does, so both backends yield identical rows for the
+    pages in fixtures/ (`--check-parsers`). Malformed markup is the exception:
+    an unclosed <td> becomes sibling cells here, as in a browser, while
+    html.parser nests the next cell inside it.
+    """
+    import lxml.html
+    if not html.strip():
+        return []
+    try:
+        doc = lxml.html.document_fromstring(html)
+    except ValueError:
+        # Unicode input with an XML encoding declaration
+        doc = lxml.html.document_fromstring(html.encode('utf-8'))
+
+    rows = []
+    for table in doc.iter('table'):
+        for row in table.xpath('.//tr')[1:]:  # Skip header
+            rows.append([''.join(t.strip() for t in td.xpath(CELL_TEXT_XPATH)) for td in row.xpath('.//td')])
+    return rows
+
+
+PARSER_BACKENDS = {
+    'lxml': extract_rows_lxml,
+    'html.parser': extract_rows_bs4,
+}
+DEFAULT_PARSER = 'lxml'
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+
+def check_parsers() -> list:
+    """Pages in fixtures/ where the parser backends disagree, as readable lines (empty when all agree)."""
+    failures = []
+    for page in sorted(FIXTURES_DIR.glob('o2cm_*.html')):
+        html = page.read_text(encoding='utf-8')
+        rows = {name: extract(html) for name, extract in PARSER_BACKENDS.items()}
+        if not rows[DEFAULT_PARSER]:
+            failures.append(f'{page.name}: no result rows')
+        for name, got in rows.items():
+            if got != rows[DEFAULT_PARSER]:
+                failures.append(f'{page.name}: {name} rows {got!r} != {DEFAULT_PARSER} rows {rows[DEFAULT_PARSER]!r}')
+    return failures
+
+
+def heat_title(cells: list) -> str:
+    """Full heat title of a result row; style and level words are spread over the first two cells."""
+    return ' '.join(' '.join(cells[:2]).split())
+
+
+def parse_event_results(event: dict, html: str, backend: str = DEFAULT_PARSER) -> list:
+    """Parse result rows out of a competition results page."""
+    extract_rows = PARSER_BACKENDS[backend]
+    competition_date = extract_event_date(html) or extract_date(event['name'])
+
     results = []
+    # O2CM results typically in table format
+    for cells in extract_rows(html):
+        if len(cells) >= 4:
+            title = heat_title(cells)
+            heat = parse_heat_title(title)
+            result = {
+                'competitionName': event['name'],
+                'competitionDate': competition_date,
+                'location': None,
+                'heat': title,
+                'style': heat.style,
+                'level': heat.level,
+                'category': heat.category,
+                'dances': [d for d in heat.dances if d],
+                'multiDance': heat.multi_dance,
+                'ageGroup': heat.age_group,
+                'division': heat.division,
+                'placement': parse_placement(cells[2]) if len(cells) > 2 else None,
+                'totalCompetitors': parse_int(cells[3]) if len(cells) > 3 else None,
+                'dancer1Name': cells[4] if len(cells) > 4 else '',
+                'dancer2Name': cells[5] if len(cells) > 5 else '',
+                'source': 'O2CM',
+                'externalId': make_external_id(event, cells),
+            }
+            if title and result['dancer1Name']:
+                results.append(result)
+    return results
+
+
+def timed_parse_event_results(event: dict, html: str, backend: str = DEFAULT_PARSER) -> tuple:
+    """(results, seconds spent parsing); timed where it runs, so parse worker processes report their time too."""
+    started = time.perf_counter()
+    results = parse_event_results(event, html, backend)
+    return results, time.perf_counter() - started
+
+
+def scrape_event(session, event: dict, backend: str = DEFAULT_PARSER) -> Optional[list]:
+    """Scrape results from a single competition, or None if it could not be fetched."""
     try:
-        resp = session.get(event['url'], timeout=15)
-        resp.raise_for_status()
+        with METRICS.stage('fetch'):
+            resp = session.get(event['url'], timeout=15)
+            resp.raise_for_status()
 
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(resp.text, 'html.parser')
-
-        # O2CM results typically in table format
-        tables = soup.find_all('table')
-        for table in tables:
-            rows = table.find_all('tr')
-            for row in rows[1:]:  # Skip header
-                cells = [td.get_text(strip=True) for td in row.find_all('td')]
-                if len(cells) >= 4:
-                    result = {
-                        'competitionName': event['name'],
-                        'competitionDate': extract_date(event['name']),
-                        'location': None,
-                        'style': cells[0] if cells else '',
-                        'level': cells[1] if len(cells) > 1 else '',
-                        'placement': parse_placement(cells[2]) if len(cells) > 2 else None,
-                        'totalCompetitors': parse_int(cells[3]) if len(cells) > 3 else None,
-                        'dancer1Name': cells[4] if len(cells) > 4 else '',
-                        'dancer2Name': cells[5] if len(cells) > 5 else '',
-                        'source': 'O2CM',
-                        'externalId': f"o2cm_{hash(event['url'] + str(cells))}",
-                    }
-                    if result['style'] and result['dancer1Name']:
-                        results.append(result)
+        results, seconds = timed_parse_event_results(event, resp.text, backend)
+        METRICS.add_time('parse', seconds)
+        METRICS.count('rows', len(results))
 
         logger.info(f"  {event['name']}: {len(results)} results")
-        time.sleep(1)  # Polite delay
+        return results
     except Exception as e:
         logger.warning(f"  Failed to scrape {event['name']}: {e}")
-
-    return results
+        return None
 
 
-def extract_date(competition_name: str) -> Optional[str]:
-    """Try to extract year from competition name."""
-    match = re.search(r'20\d{2}', competition_name)
-    if match:
-        return f"{match.group()}-01-01"
+def scrape_event_results(session, event: dict, backend: str = DEFAULT_PARSER) -> list:
+    """Scrape results from a single competition."""
+    return scrape_event(session, event, backend) or []
+
+
+async def scrape_each_event_async(events: list, concurrency: int = 4, rate: float = 1.0,
+                                  session: Optional[CachedSession] = None,
+                                  backend: str = DEFAULT_PARSER,
+                                  parse_pool: Optional[ProcessPoolExecutor] = None) -> list:
+    """Scrape many competitions concurrently, returning one entry per event.
+
+    Fetching and parsing are separate stages joined by a bounded queue of raw
+    pages. Fetches run in worker threads, at most `concurrency` at a time,
+    through `session` when given (it must be thread-safe, like CachedSession
+    over an HttpClient), otherwise through a new HttpClient allowing `rate`
+    requests/sec per host. Pages are parsed in `parse_pool` when
+    given, so CPU-bound parsing never blocks the network, or inline otherwise.
+    When parsing falls behind, the full queue stalls the fetchers.
+
+    Each entry is the event's result list, or None if it could not be scraped.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    if session is None:
+        session = make_client(rate, concurrency)
+    # Parse tasks only wait on the pool, so one per queue slot keeps every worker busy
+    parsers = PARSE_QUEUE_SIZE if parse_pool else 1
+    pages = asyncio.Queue(maxsize=PARSE_QUEUE_SIZE)
+    outcomes = [None] * len(events)
+    loop = asyncio.get_running_loop()
+
+    def fetch(url: str) -> str:
+        with METRICS.stage('fetch'):
+            resp = session.get(url, timeout=15)
+            resp.raise_for_status()
+            return resp.text
+
+    async def fetch_one(i: int, event: dict):
+        async with semaphore:
+            try:
+                html = await asyncio.to_thread(fetch, event['url'])
+            except Exception as e:
+                logger.warning(f"  Failed to scrape {event['name']}: {e}")
+                return
+            # Blocks while the parse stage is behind, holding this fetch slot
+            await pages.put((i, event, html))
+
+    async def parse_pages():
+        while True:
+            i, event, html = await pages.get()
+            try:
+                if parse_pool:
+                    results, seconds = await loop.run_in_executor(
+                        parse_pool, timed_parse_event_results, event, html, backend)
+                else:
+                    results, seconds = timed_parse_event_results(event, html, backend)
+                METRICS.add_time('parse', seconds)
+                METRICS.count('rows', len(results))
+                logger.info(f"  {event['name']}: {len(results)} results")
+                outcomes[i] = results
+            except Exception as e:
+                logger.warning(f"  Failed to parse {event['name']}: {e}")
+            finally:
+                pages.task_done()
+
+    workers = [asyncio.create_task(parse_pages()) for _ in range(parsers)]
+    await asyncio.gather(*(fetch_one(i, event) for i, event in enumerate(events)))
+    await pages.join()
+    for worker in workers:
+        worker.cancel()
+    return outcomes
+
+
+async def scrape_events_async(events: list, concurrency: int = 4, rate: float = 1.0,
+                              backend: str = DEFAULT_PARSER) -> list:
+    """Scrape many competitions concurrently.
+
+    Results are returned in event order, identical to the sequential path.
+    """
+    batches = await scrape_each_event_async(events, concurrency, rate, backend=backend)
+    return [result for batch in batches if batch for result in batch]
+
+
+def scrape_in_chunks(session, events: list, use_async: bool = False,
+                     concurrency: int = 4, rate: float = 1.0, backend: str = DEFAULT_PARSER,
+                     parse_pool: Optional[ProcessPoolExecutor] = None):
+    """Yield (event, results) per event, fetching a chunk of events at a time.
+
+    `results` is None for events that could not be scraped. Chunks keep memory
+    bounded and give callers a natural point to flush output. In async mode
+    `session` is shared by the worker threads, so it must be thread-safe.
+    """
+    chunk_size = max(CHECKPOINT_EVERY, concurrency * 4) if use_async else CHECKPOINT_EVERY
+    for start in range(0, len(events), chunk_size):
+        chunk = events[start:start + chunk_size]
+        if use_async:
+            outcomes = asyncio.run(scrape_each_event_async(chunk, concurrency, rate, session, backend,
+                                                           parse_pool))
+        else:
+            outcomes = [scrape_event(session, event, backend) for event in chunk]
+        yield from zip(chunk, outcomes)
+
+
+@contextmanager
+def parse_pool_for(workers: int):
+    """A process pool with `workers` parsers, or None to parse inline."""
+    if workers <= 0:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield pool
+
+
+def run_crawl(session, events: list, writer, restart: bool = False, use_async: bool = False,
+              concurrency: int = 4, rate: float = 1.0, backend: str = DEFAULT_PARSER,
+              parse_pool: Optional[ProcessPoolExecutor] = None):
+    """Scrape every event not yet marked done in the crawl frontier.
+
+    Results and the frontier are checkpointed to disk every CHECKPOINT_EVERY
+    events, so an interrupted run picks up where it stopped.
+    """
+    frontier = CrawlFrontier(FRONTIER_FILE)
+    if restart:
+        frontier.reset()
+
+    frontier.add_events(events)
+    pending = frontier.pending()
+    logger.info(f'Crawl frontier: {len(frontier.events)} events known, {len(pending)} to fetch')
+
+    for done, (event, event_results) in enumerate(
+            scrape_in_chunks(session, pending, use_async, concurrency, rate, backend, parse_pool), 1):
+        writer.add(event_results or [])
+        frontier.mark(event['url'], event_results)
+
+        if done % CHECKPOINT_EVERY == 0 or done == len(pending):
+            # Results first, then frontier: a crash in between only re-fetches a chunk
+            writer.checkpoint()
+            frontier.save()
+            logger.info(f'Checkpoint: {done}/{len(pending)} events, {writer.count} results')
+
+
+def run_incremental(session, events: list, writer, cache: Optional[ResponseCache] = None,
+                    use_async: bool = False, concurrency: int = 4, rate: float = 1.0,
+                    backend: str = DEFAULT_PARSER, parse_pool: Optional[ProcessPoolExecutor] = None):
+    """Scrape only events that are new or not yet final; write results only for events that changed.
+
+    Cached pages of in-progress events are expired first so they are
+    revalidated instead of served from the cache; events that become final
+    get the long FINAL_TTL from then on.
+    """
+    manifest = ScrapeManifest(MANIFEST_FILE)
+    due = manifest.due(events)
+    logger.info(f'Manifest: {len(manifest.events)} events known, {len(due)} of {len(events)} listed are new or in progress')
+    if cache:
+        for event in due:
+            if event['url'] in manifest.events:
+                cache.expire(event['url'])
+
+    changed = 0
+    for done, (event, event_results) in enumerate(
+            scrape_in_chunks(session, due, use_async, concurrency, rate, backend, parse_pool), 1):
+        if manifest.record(event, event_results):
+            changed += 1
+            writer.add(event_results)
+        if cache and manifest.events.get(event['url'], {}).get('final'):
+            cache.mark_final([event['url']])
+        if done % CHECKPOINT_EVERY == 0 or done == len(due):
+            writer.checkpoint()
+            manifest.save()
+    logger.info(f'Incremental run: {changed} of {len(due)} fetched events new or changed')
+
+
+def make_external_id(event: dict, cells: list) -> str:
+    """Stable content-addressed ID for a result row.
+
+    SHA-256 over the normalized event URL, heat (style + level) and couple, so
+    the same placement gets the same ID on every scrape and in every process.
+    Placement and competitor count are left out, so a corrected placement
+    re-scrapes under the same ID and the importers update the stored rows
+    instead of adding new ones.
+    """
+    fields = [event['url']] + [cells[i] if len(cells) > i else '' for i in (0, 1, 4, 5)]
+    key = '\x1f'.join(' '.join(str(field).split()).casefold() for field in fields)
+    return f"o2cm_{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}"
+
+
+MONTHS = {m: i for i, m in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], 1)}
+TAG = re.compile(r'<[^>]*>')
+EVENT_DATE_PATTERNS = [
+    # "November 15-19, 2024", "Nov. 15, 2024"
+    re.compile(r'\b(?P<month_name>(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*)\.?\s+(?P<day>\d{1,2})'
+               r'(?:\s*-\s*(?:[a-z]+\.?\s+)?\d{1,2})?,?\s+(?P<year>(?:19|20)\d{2})\b', re.IGNORECASE),
+    # "11/15/2024"
+    re.compile(r'\b(?P<month>\d{1,2})/(?P<day>\d{1,2})/(?P<year>(?:19|20)\d{2})\b'),
+    # "2024-11-15"
+    re.compile(r'\b(?P<year>(?:19|20)\d{2})-(?P<month>\d{2})-(?P<day>\d{2})\b'),
+]
+
+
+def extract_event_date(html: str) -> Optional[str]:
+    """First date in the page header (O2CM prints the competition dates above the results), as YYYY-MM-DD."""
+    head = TAG.sub(' ', html[:EVENT_HEADER_CHARS])
+    found = [(m.start(), m) for m in (p.search(head) for p in EVENT_DATE_PATTERNS) if m]
+    for _, match in sorted(found, key=lambda f: f[0]):
+        groups = match.groupdict()
+        month = groups.get('month_name')
+        month = MONTHS[month[:3].lower()] if month else int(groups['month'])
+        try:
+            return datetime(int(groups['year']), month, int(groups['day'])).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
     return None
 
 
-def parse_placement(val: str) -> Optional[int]:
-    """Parse placement from string like '1st', '2', etc."""
-    if not val:
-        return None
-    match = re.search(r'\d+', val)
-    return int(match.group()) if match else None
-
-
-def parse_int(val: str) -> Optional[int]:
-    if not val:
-        return None
-    match = re.search(r'\d+', val)
-    return int(match.group()) if match else None
+# Written by --sample for local development without network access
+SAMPLE_RESULTS = [
+    {
+        'competitionName': 'Ohio Star Ball 2024',
+        'competitionDate': '2024-11-15',
+        'location': 'Columbus, OH',
+        'style': 'WALTZ',
+        'level': 'GOLD',
+        'placement': 1,
+        'totalCompetitors': 8,
+        'dancer1Name': 'Alexandra Thompson',
+        'dancer2Name': 'Benjamin Clark',
+        'source': 'O2CM',
+        'externalId': 'o2cm_sample_001',
+    },
+    {
+        'competitionName': 'Emerald Ball 2024',
+        'competitionDate': '2024-05-10',
+        'location': 'Los Angeles, CA',
+        'style': 'CHA_CHA',
+        'level': 'SILVER',
+        'placement': 2,
+        'totalCompetitors': 12,
+        'dancer1Name': 'Christina Davis',
+        'dancer2Name': 'Daniel Evans',
+        'source': 'O2CM',
+        'externalId': 'o2cm_sample_002',
+    },
+    {
+        'competitionName': 'Manhattan Amateur Classic 2024',
+        'competitionDate': '2024-08-22',
+        'location': 'New York, NY',
+        'style': 'TANGO',
+        'level': 'NOVICE',
+        'placement': 3,
+        'totalCompetitors': 15,
+        'dancer1Name': 'Elizabeth Foster',
+        'dancer2Name': 'Michael Santos',
+        'source': 'O2CM',
+        'externalId': 'o2cm_sample_003',
+    },
+]
 
 
 def main():
-    import requests
+    parser = argparse.ArgumentParser(description='Scrape competition results from O2CM')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='Fetch event pages concurrently instead of one by one')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='Max concurrent event fetches in --async mode (default: 4)')
+    parser.add_argument('--rate', type=float, default=1.0,
+                        help='Max requests/sec per host; 429/5xx responses slow this further (default: 1.0)')
+    parser.add_argument('--crawl', action='store_true',
+                        help='Crawl every event O2CM lists, resuming from the on-disk frontier')
+    parser.add_argument('--restart', action='store_true',
+                        help='With --crawl, discard the saved frontier and start from the top')
+    parser.add_argument('--sample', action='store_true',
+                        help='Write built-in sample results instead of scraping (local development)')
+    parser.add_argument('--incremental', action='store_true',
+                        help=f'Fetch only events that are new or not final per {MANIFEST_FILE.name}, '
+                             'and write only results for events that changed')
+    parser.add_argument('--jsonl', action='store_true',
+                        help=f'Stream results to {JSONL_OUTPUT_FILE.name}, one record per line, as they are scraped')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Bypass the on-disk page cache ({DEFAULT_CACHE_FILE.name})')
+    parser.add_argument('--offline', action='store_true',
+                        help='Serve every page from the cache and never touch the network')
+    parser.add_argument('--cache-max-mb', type=int, default=1024,
+                        help='Evict least recently used pages beyond this cache size (default: 1024)')
+    parser.add_argument('--parser', choices=sorted(PARSER_BACKENDS), default=DEFAULT_PARSER,
+                        help=f'HTML parser backend for result pages (default: {DEFAULT_PARSER})')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='Parse pages in this many worker processes, fed by a bounded queue '
+                             '(implies --async; default: parse inline)')
+    parser.add_argument('--report', type=Path, default=REPORT_FILE,
+                        help=f'JSON run report with stage timings and counters (default: {REPORT_FILE})')
+    parser.add_argument('--prometheus', type=Path,
+                        help='Also write the run metrics to this Prometheus textfile (node_exporter textfile collector)')
+    parser.add_argument('--check-parsers', action='store_true',
+                        help='Compare every parser backend on the pages in fixtures/; exits non-zero on a mismatch')
+    args = parser.parse_args()
+    if args.check_parsers:
+        failures = check_parsers()
+        for line in failures:
+            print(f'  {line}')
+        if failures:
+            print(f'\n❌ {len(failures)} parser parity check(s) failed')
+            sys.exit(1)
+        pages = len(list(FIXTURES_DIR.glob('o2cm_*.html')))
+        print(f'✅ {" and ".join(sorted(PARSER_BACKENDS))} agree on {pages} fixture page(s)')
+        return
+    if args.offline and args.no_cache:
+        parser.error('--offline needs the page cache')
+    if args.parse_workers > 0:
+        args.use_async = True
+
     OUTPUT_DIR.mkdir(exist_ok=True)
 
     logger.info('=== FilledCard O2CM Scraper ===')
 
-    session = requests.Session()
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0 (compatible; FilledCard/1.0; research scraper)',
-        'Accept': 'text/html,application/xhtml+xml',
-    })
-
-    events = get_event_list(session)
-
-    if not events:
-        logger.warning('Could not fetch event list. Generating sample data...')
-        results = [
-            {
-                'competitionName': 'Ohio Star Ball 2024',
-                'competitionDate': '2024-11-15',
-                'location': 'Columbus, OH',
-                'style': 'WALTZ',
-                'level': 'GOLD',
-                'placement': 1,
-                'totalCompetitors': 8,
-                'dancer1Name': 'Alexandra Thompson',
-                'dancer2Name': 'Benjamin Clark',
-                'source': 'O2CM',
-                'externalId': 'o2cm_sample_001',
-            },
-            {
-                'competitionName': 'Emerald Ball 2024',
-                'competitionDate': '2024-05-10',
-                'location': 'Los Angeles, CA',
-                'style': 'CHA_CHA',
-                'level': 'SILVER',
-                'placement': 2,
-                'totalCompetitors': 12,
-                'dancer1Name': 'Christina Davis',
-                'dancer2Name': 'Daniel Evans',
-                'source': 'O2CM',
-                'externalId': 'o2cm_sample_002',
-            },
-            {
-                'competitionName': 'Manhattan Amateur Classic 2024',
-                'competitionDate': '2024-08-22',
-                'location': 'New York, NY',
-                'style': 'TANGO',
-                'level': 'NOVICE',
-                'placement': 3,
-                'totalCompetitors': 15,
-                'dancer1Name': 'Elizabeth Foster',
-                'dancer2Name': 'Michael Santos',
-                'source': 'O2CM',
-                'externalId': 'o2cm_sample_003',
-            },
-        ]
+    output_file = JSONL_OUTPUT_FILE if args.jsonl else OUTPUT_FILE
+    writer_cls = JsonlResultWriter if args.jsonl else JsonResultWriter
+    if args.sample:
+        logger.info('Writing sample data (--sample)...')
+        writer = writer_cls(output_file)
+        writer.add(SAMPLE_RESULTS)
+        writer.close()
+        print(f'\n✅ O2CM sample data: {writer.count} results written to {output_file}')
+        return
+
+    METRICS.reset('o2cm')
+    cache = None if args.no_cache else ResponseCache(max_bytes=args.cache_max_mb * 1024 * 1024)
+    if cache:
+        # Results pages stay on the short TTL until the manifest marks their event final
+        cache.mark_final(ScrapeManifest(MANIFEST_FILE).final_urls())
+    client = make_client(args.rate, args.concurrency)
+    session = CachedSession(client, cache, offline=args.offline)
+
+    def finish():
+        METRICS.record_http(client, cache)
+        if cache:
+            cache.close()
+        METRICS.write(args.report, args.prometheus)
+
+    with METRICS.stage('event_list'):
+        if args.crawl:
+            events = crawl_event_list(session)
+        else:
+            events = get_event_list(session, limit=None if args.incremental else 20)
+    if events is None:
+        # Leave the previous output alone; a failed fetch must not look like an empty or fake scrape
+        logger.error(f'Could not fetch the O2CM event list; {output_file} left untouched')
+        finish()
+        sys.exit(1)
+
+    resume = args.crawl and not args.incremental and not args.restart and FRONTIER_FILE.exists()
+    writer = writer_cls(output_file, resume=resume)
+
+    if args.incremental:
+        with parse_pool_for(args.parse_workers) as parse_pool:
+            run_incremental(session, events, writer, cache, args.use_async, args.concurrency, args.rate,
+                            args.parser, parse_pool)
+    elif args.crawl:
+        with parse_pool_for(args.parse_workers) as parse_pool:
+            run_crawl(session, events, writer, args.restart, args.use_async, args.concurrency, args.rate,
+                      args.parser, parse_pool)
     else:
-        results = []
-        for event in events:
-            event_results = scrape_event_results(session, event)
-            results.extend(event_results)
-
-    # Deduplicate by externalId
-    seen = set()
-    unique = []
-    for r in results:
-        key = r.get('externalId', str(r))
-        if key not in seen:
-            seen.add(key)
-            unique.append(r)
-
-    logger.info(f'Writing {len(unique)} results to {OUTPUT_FILE}')
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(unique, f, indent=2, default=str)
-
-    print(f'\n✅ O2CM scrape complete: {len(unique)} results written to {OUTPUT_FILE}')
+        if args.use_async:
+            logger.info(f'Scraping {len(events)} events (concurrency={args.concurrency}, rate={args.rate}/s)')
+        failed = 0
+        with parse_pool_for(args.parse_workers) as parse_pool:
+            for _, event_results in scrape_in_chunks(session, events, args.use_async, args.concurrency,
+                                                     args.rate, args.parser, parse_pool):
+                if event_results is None:
+                    failed += 1
+                writer.add(event_results or [])
+        if events and failed == len(events):
+            logger.error(f'All {failed} event fetches failed; treating the run as failed, {output_file} left untouched')
+            finish()
+            sys.exit(1)
+
+    logger.info(f'Writing {writer.count} results to {output_file}')
+    writer.close()
+    if client.retries:
+        logger.info(f'HTTP: {client.retries} retries after transient errors')
+    if cache:
+        logger.info(f'Page cache: {cache.hits} hits, {cache.revalidated} revalidated, {cache.misses} misses')
+    finish()
+
+    print(f'\n✅ O2CM scrape complete: {writer.count} results written to {output_file}')
+    print(f'Run report: {args.report}')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,218 @@
+"""
+FilledCard Pipeline
+Scrapes NDCA and O2CM and imports both into PostgreSQL in one run.
+
+Both scrapers run at the same time, as separate processes. Each source is
+imported as soon as its scrape finishes. O2CM also waits for the NDCA import,
+so its names are linked against the dancers NDCA just created. Imports share
+one connection pool. Once every import is done, DancerStats and MatchScore
+are refreshed once. The scrapers' run reports are folded into a single
+report, output/pipeline_report.json, with stages named '<source>.<stage>'.
+
+Requirements:
+  pip install -r requirements.txt
+
+Usage:
+  python pipeline.py                         # scrape and import both sources
+  python pipeline.py --only o2cm --o2cm-args=--incremental   # nightly O2CM delta
+  python pipeline.py --only ndca --upsert    # refresh studios, NDCA ids and styles of known dancers
+  python pipeline.py --from-stage import     # import the existing scraper output
+  python pipeline.py --to-stage scrape       # scrape only
+  python pipeline.py --bulk --jsonl --o2cm-args="--crawl --async --concurrency 8"
+  python pipeline.py --from-stage import --workers 4   # import on 4 connections at once
+  python pipeline.py --prometheus /var/lib/node_exporter/textfile/filledcard_pipeline.prom
+"""
+
+import json
+import sys
+import shlex
+import logging
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from identity import DecisionLog
+from metrics import METRICS
+from import_to_db import (
+    CHUNK_SIZE, DECISIONS_FILE, OUTPUT_DIR, REJECTS_FILE, SOURCES,
+    DeadLetterFile, get_connection_pool, import_source, pooled, refresh_after_import,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+logger = logging.getLogger(__name__)
+
+SCRAPER_DIR = Path(__file__).parent
+REPORT_FILE = OUTPUT_DIR / 'pipeline_report.json'
+STAGES = ['scrape', 'import']
+SCRAPERS = {
+    'ndca': 'ndca_scraper.py',
+    'o2cm': 'o2cm_scraper.py',
+}
+
+
+def scrape(source: str, args: list, report_dir: Path) -> bool:
+    """Run one scraper to completion; its run report is folded into this run's. True if it succeeded."""
+    report_file = report_dir / f'{source}_report.json'
+    command = [sys.executable, str(SCRAPER_DIR / SCRAPERS[source]), *args, '--report', str(report_file)]
+    logger.info(f'{source}: scraping ({" ".join(command[1:])})')
+    with METRICS.stage(f'scrape_{source}'):
+        returncode = subprocess.run(command, cwd=SCRAPER_DIR).returncode
+    if report_file.exists():
+        with open(report_file) as f:
+            METRICS.absorb(json.load(f), source)
+    if returncode != 0:
+        logger.error(f'{source}: scraper exited with {returncode}; its previous output is left unimported')
+        return False
+    return True
+
+
+class Pipeline:
+    """Per-run state shared by the source threads."""
+
+    def __init__(self, args, pool):
+        self.args = args
+        self.pool = pool
+        self.sources = [s for s in SOURCES if args.only in (None, s)]
+        self.stages = STAGES[STAGES.index(args.from_stage):STAGES.index(args.to_stage) + 1]
+        self.rejects = DeadLetterFile(args.rejects_file)
+        self.decisions = DecisionLog(args.decisions_file)
+        self.touched = set()
+        self.stats = {}
+        self.failed = []
+        # Set once a source's import is done (or will not happen), so later sources can start theirs
+        self.imported = {source: threading.Event() for source in self.sources}
+
+    def scraper_args(self, source: str) -> list:
+        args = shlex.split(self.args.ndca_args if source == 'ndca' else self.args.o2cm_args)
+        for flag in ('jsonl', 'no_cache', 'offline'):
+            if getattr(self.args, flag):
+                args.append('--' + flag.replace('_', '-'))
+        return args
+
+    def run_source(self, source: str, report_dir: Path):
+        try:
+            if 'scrape' in self.stages and not scrape(source, self.scraper_args(source), report_dir):
+                self.failed.append(f'scrape_{source}')
+                return
+            if 'import' not in self.stages:
+                return
+
+            # Sources import one at a time, in SOURCES order; skipped or failed sources don't hold others up
+            for earlier in self.sources[:self.sources.index(source)]:
+                self.imported[earlier].wait()
+            logger.info(f'{source}: importing')
+            with METRICS.stage(f'import_{source}'), pooled(self.pool) as conn:
+                stats = import_source(conn, source, self.args.bulk, self.args.jsonl, self.args.chunk_size,
+                                      self.rejects, self.decisions, self.touched, self.pool, self.args.workers,
+                                      self.args.upsert)
+            if stats is not None:
+                self.stats[source] = stats
+        except Exception as e:
+            logger.exception(f'{source}: failed: {e}')
+            self.failed.append(source)
+        finally:
+            self.imported[source].set()
+
+    def run(self) -> dict:
+        with tempfile.TemporaryDirectory(prefix='filledcard-pipeline-') as report_dir:
+            with ThreadPoolExecutor(max_workers=len(self.sources)) as executor:
+                for future in [executor.submit(self.run_source, s, Path(report_dir)) for s in self.sources]:
+                    future.result()
+
+        if self.stats:
+            with pooled(self.pool) as conn:
+                self.stats.update(refresh_after_import(conn, self.touched, match_scores=not self.args.no_match_scores))
+        return self.stats
+
+    def close(self):
+        self.rejects.close()
+        self.decisions.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scrape NDCA and O2CM and import both into the database')
+    parser.add_argument('--only', choices=SOURCES,
+                        help='Run just this source (default: all)')
+    parser.add_argument('--from-stage', choices=STAGES, default=STAGES[0],
+                        help='First stage to run; "import" imports the existing scraper output (default: scrape)')
+    parser.add_argument('--to-stage', choices=STAGES, default=STAGES[-1],
+                        help='Last stage to run; "scrape" leaves the database alone (default: import)')
+    parser.add_argument('--jsonl', action='store_true',
+                        help='Scrapers write .jsonl and the import streams it in chunks')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Scrapers bypass the on-disk page cache')
+    parser.add_argument('--offline', action='store_true',
+                        help='Scrapers serve every page from the page cache and never touch the network')
+    parser.add_argument('--ndca-args', default='',
+                        help='Extra ndca_scraper.py flags, e.g. --ndca-args="--browser-contexts 8"')
+    parser.add_argument('--o2cm-args', default='',
+                        help='Extra o2cm_scraper.py flags, e.g. --o2cm-args="--async --rate 2"')
+    parser.add_argument('--bulk', action='store_true',
+                        help='Use set-based bulk import instead of row-by-row inserts')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help=f'Rows per commit (default: {CHUNK_SIZE})')
+    parser.add_argument('--upsert', action='store_true',
+                        help='Update NDCA dancers already in the database with changed fields instead of skipping them')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Parallel workers per import, each on its own connection; implies --bulk (default: 1)')
+    parser.add_argument('--rejects-file', type=Path, default=REJECTS_FILE,
+                        help=f'JSONL file for rows that fail to import (default: {REJECTS_FILE})')
+    parser.add_argument('--decisions-file', type=Path, default=DECISIONS_FILE,
+                        help=f'JSONL file of fuzzy and ambiguous name matches (default: {DECISIONS_FILE})')
+    parser.add_argument('--no-match-scores', action='store_true',
+                        help='Skip the incremental MatchScore refresh after importing')
+    parser.add_argument('--report', type=Path, default=REPORT_FILE,
+                        help=f'JSON run report covering every stage (default: {REPORT_FILE})')
+    parser.add_argument('--prometheus', type=Path,
+                        help='Also write the run metrics to this Prometheus textfile (node_exporter textfile collector)')
+    args = parser.parse_args()
+    if STAGES.index(args.from_stage) > STAGES.index(args.to_stage):
+        parser.error('--from-stage comes after --to-stage')
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    if args.workers > 1:
+        args.bulk = True
+
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    logger.info('=== FilledCard Pipeline ===')
+    METRICS.reset('pipeline')
+
+    # Sources import one at a time, so the pool only needs room for one import's workers
+    pool = get_connection_pool(max(len(SOURCES), args.workers + 1)) if args.to_stage == 'import' else None
+    pipeline = Pipeline(args, pool)
+    stats = {}
+    try:
+        stats = pipeline.run()
+    finally:
+        pipeline.close()
+        if pool:
+            pool.closeall()
+        METRICS.count('rows', sum(stats[k]['inserted'] for k in SOURCES if k in stats))
+        METRICS.write(args.report, args.prometheus)
+
+    print('\n=== Pipeline Summary ===')
+    if 'ndca' in stats:
+        s = stats['ndca']
+        updated = f" | {s['updated']} updated" if 'updated' in s else ''
+        print(f"NDCA Dancers: {s['inserted']} inserted{updated} | {s['skipped']} skipped | {s['errors']} errors")
+    if 'o2cm' in stats:
+        s = stats['o2cm']
+        print(f"O2CM Results: {s['inserted']} inserted | {s['updated']} updated | {s['skipped']} skipped | {s['linked']} linked | {s['partnerships']} partnerships | {s['errors']} errors")
+    if 'stats' in stats:
+        print(f"Dancer stats: {stats['stats']} refreshed")
+    if 'matches' in stats:
+        print(f"Match scores: {stats['matches']['viewers']} dancers rescored")
+    if pipeline.rejects.count:
+        print(f'⚠️  {pipeline.rejects.count} rejected rows written to {pipeline.rejects.path}')
+    print(f'Run report: {args.report}')
+    if pipeline.failed:
+        print(f"❌ Failed: {', '.join(pipeline.failed)}")
+        sys.exit(1)
+    print('✅ Pipeline complete')
+
+
+if __name__ == '__main__':
+    main()
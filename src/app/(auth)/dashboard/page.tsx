@@ -8,6 +8,7 @@ import { DancerCard } from '@/components/dancers/DancerCard'
 import { Avatar } from '@/components/ui/Avatar'
 import { Button } from '@/components/ui/Button'
 import { calculateMatchScore } from '@/lib/matching'
+import { storedMatches } from '@/lib/matchScores'
 import { formatLocation } from '@/lib/utils'
 import { PartnerRequestCard } from '@/components/dashboard/PartnerRequestCard'
 import { MessageCircle, Heart, Trophy, Bell, ChevronRight, Users } from 'lucide-react'
@@ -54,22 +55,28 @@ export default async function DashboardPage() {
     take: 5,
   })
 
-  // Get potential matches
-  const allDancers = await prisma.dancer.findMany({
-    where: {
-      id: { not: dancer.id },
-      isClaimed: true,
-    },
-    include: { danceStyles: true },
-    take: 50,
-  })
-
-  const matches = allDancers
-    .map(d => ({ dancer: d, ...calculateMatchScore(dancer!, d) }))
-    .filter(m => m.score > 0)
+  // Get potential matches: precomputed ones, or scored live for profiles match_scores.py hasn't reached yet
+  let matches = (await storedMatches(dancer.id))
     .sort((a, b) => b.score - a.score)
     .slice(0, 6)
 
+  if (matches.length === 0) {
+    const allDancers = await prisma.dancer.findMany({
+      where: {
+        id: { not: dancer.id },
+        isClaimed: true,
+      },
+      include: { danceStyles: true },
+      take: 50,
+    })
+
+    matches = allDancers
+      .map(d => ({ dancer: d, section: 'amateur', ...calculateMatchScore(dancer!, d) }))
+      .filter(m => m.score > 0)
+      .sort((a, b) => b.score - a.score)
+      .slice(0, 6)
+  }
+
   const profileComplete = !!(dancer.bio && dancer.danceStyles.length > 0 && dancer.city)
 
   return (
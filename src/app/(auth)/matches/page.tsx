@@ -5,6 +5,7 @@ import { prisma } from '@/lib/prisma'
 import { redirect } from 'next/navigation'
 import { DancerCard } from '@/components/dancers/DancerCard'
 import { calculateMatchScore } from '@/lib/matching'
+import { storedMatches } from '@/lib/matchScores'
 import { Heart, Star } from 'lucide-react'
 
 export default async function MatchesPage() {
@@ -18,23 +19,30 @@ export default async function MatchesPage() {
 
   if (!dancer) redirect('/dashboard')
 
-  const allDancers = await prisma.dancer.findMany({
-    where: { id: { not: dancer.id }, isClaimed: true },
-    include: { danceStyles: true },
-    take: 100,
-  })
+  const stored = await storedMatches(dancer.id)
+  let amateurMatches = stored.filter(m => m.section === 'amateur')
+  let proAmMatches = stored.filter(m => m.section === 'proam')
+
+  // Profiles claimed since the last match_scores.py run have no stored matches yet
+  if (stored.length === 0) {
+    const allDancers = await prisma.dancer.findMany({
+      where: { id: { not: dancer.id }, isClaimed: true },
+      include: { danceStyles: true },
+      take: 100,
+    })
 
-  const amateurMatches = allDancers
-    .filter(d => !d.isTeacher)
-    .map(d => ({ dancer: d, ...calculateMatchScore(dancer, d) }))
-    .filter(m => m.score > 0)
-    .sort((a, b) => b.score - a.score)
+    amateurMatches = allDancers
+      .filter(d => !d.isTeacher)
+      .map(d => ({ dancer: d, section: 'amateur', ...calculateMatchScore(dancer, d) }))
+      .filter(m => m.score > 0)
+      .sort((a, b) => b.score - a.score)
 
-  const proAmMatches = allDancers
-    .filter(d => d.isTeacher && d.openToProAm)
-    .map(d => ({ dancer: d, ...calculateMatchScore(dancer, d) }))
-    .filter(m => m.score > 0)
-    .sort((a, b) => b.score - a.score)
+    proAmMatches = allDancers
+      .filter(d => d.isTeacher && d.openToProAm)
+      .map(d => ({ dancer: d, section: 'proam', ...calculateMatchScore(dancer, d) }))
+      .filter(m => m.score > 0)
+      .sort((a, b) => b.score - a.score)
+  }
 
   return (
     <div className="min-h-screen bg-slate-50 py-8 px-4">
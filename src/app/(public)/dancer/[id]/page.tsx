@@ -14,9 +14,13 @@ import { RateCard } from '@/components/dancers/RateCard'
 import { TeacherReviewSection } from '@/components/dancers/TeacherReviewSection'
 import { ProfileClaimBanner } from '@/components/dancers/ProfileClaimBanner'
 import { formatLocation, calculateAge } from '@/lib/utils'
-import { TRAVEL_WILLINGNESS_LABELS, COMPETITION_FREQUENCY_LABELS, BUDGET_RANGE_LABELS } from '@/lib/constants'
+import { TRAVEL_WILLINGNESS_LABELS, COMPETITION_FREQUENCY_LABELS, BUDGET_RANGE_LABELS, DANCE_STYLES, DANCE_LEVELS } from '@/lib/constants'
+import { format } from 'date-fns'
 import { MapPin, Instagram, Youtube, Building2, GraduationCap, MessageCircle } from 'lucide-react'
 
+// Competition totals come from DancerStats (kept by the importer); only this many results are loaded for the timeline
+const RECENT_RESULTS = 50
+
 export default async function DancerProfilePage({ params }: { params: { id: string } }) {
   const user = await currentUser()
 
@@ -24,7 +28,8 @@ export default async function DancerProfilePage({ params }: { params: { id: stri
     where: { id: params.id },
     include: {
       danceStyles: true,
-      competitionResults: { orderBy: { competitionDate: 'desc' } },
+      competitionResults: { orderBy: { competitionDate: 'desc' }, take: RECENT_RESULTS },
+      stats: true,
       videos: { orderBy: { addedAt: 'desc' } },
       reviewsReceived: {
         include: { reviewer: true },
@@ -61,6 +66,8 @@ export default async function DancerProfilePage({ params }: { params: { id: stri
   const isOwnProfile = user && dancer.clerkUserId === user.id
   const age = dancer.birthYear ? calculateAge(dancer.birthYear) : null
   const location = formatLocation(dancer.city, dancer.state)
+  const stats = dancer.stats
+  const bestPlacements = (stats?.bestPlacements ?? {}) as Record<string, Record<string, number>>
 
   return (
     <div className="min-h-screen bg-slate-50">
@@ -230,7 +237,48 @@ export default async function DancerProfilePage({ params }: { params: { id: stri
         {/* Competition History */}
         <div className="bg-white rounded-2xl border border-slate-100 p-6">
           <h2 className="font-display font-semibold text-xl text-[#0F172A] mb-4">Competition History</h2>
+          {stats && (
+            <div className="grid grid-cols-2 sm:grid-cols-4 gap-4 mb-6">
+              <div className="p-3 bg-slate-50 rounded-lg text-center">
+                <p className="text-xs text-slate-400 mb-1">Events</p>
+                <p className="text-sm font-semibold text-[#0F172A]">{stats.eventsEntered}</p>
+              </div>
+              <div className="p-3 bg-slate-50 rounded-lg text-center">
+                <p className="text-xs text-slate-400 mb-1">Competitions</p>
+                <p className="text-sm font-semibold text-[#0F172A]">{stats.competitionsEntered}</p>
+              </div>
+              {stats.lastCompetedAt && (
+                <div className="p-3 bg-slate-50 rounded-lg text-center">
+                  <p className="text-xs text-slate-400 mb-1">Last competed</p>
+                  <p className="text-sm font-semibold text-[#0F172A]">{format(stats.lastCompetedAt, 'MMM yyyy')}</p>
+                </div>
+              )}
+              {stats.levelEstimate && (
+                <div className="p-3 bg-slate-50 rounded-lg text-center">
+                  <p className="text-xs text-slate-400 mb-1">Current level</p>
+                  <p className="text-sm font-semibold text-[#0F172A]">{DANCE_LEVELS[stats.levelEstimate]}</p>
+                </div>
+              )}
+            </div>
+          )}
+          {Object.keys(bestPlacements).length > 0 && (
+            <div className="flex flex-wrap gap-2 mb-6">
+              {Object.entries(bestPlacements).flatMap(([style, levels]) =>
+                Object.entries(levels).map(([level, placement]) => (
+                  <span key={`${style}-${level}`} className="px-2 py-1 bg-slate-50 rounded text-xs text-slate-600">
+                    Best {DANCE_STYLES[style as keyof typeof DANCE_STYLES]?.label ?? style}{' '}
+                    {DANCE_LEVELS[level as keyof typeof DANCE_LEVELS] ?? level}: <span className="font-semibold text-[#0F172A]">{placement}</span>
+                  </span>
+                ))
+              )}
+            </div>
+          )}
           <CompetitionTimeline results={dancer.competitionResults} />
+          {stats && stats.eventsEntered > dancer.competitionResults.length && (
+            <p className="text-xs text-slate-400 mt-4">
+              Showing the {dancer.competitionResults.length} most recent of {stats.eventsEntered} events.
+            </p>
+          )}
         </div>
 
         {/* Teacher section */}
@@ -17,6 +17,10 @@ export async function DELETE(
     return NextResponse.json({ error: 'Not found' }, { status: 404 })
   }
 
-  await prisma.danceStyle.delete({ where: { id: params.id } })
+  // Bump the dancer too, so the incremental match score refresh picks the change up
+  await prisma.$transaction([
+    prisma.danceStyle.delete({ where: { id: params.id } }),
+    prisma.dancer.update({ where: { id: dancer.id }, data: { updatedAt: new Date() } }),
+  ])
   return NextResponse.json({ success: true })
 }
@@ -19,22 +19,26 @@ export async function POST(req: NextRequest) {
   const styleInfo = DANCE_STYLES[style as keyof typeof DANCE_STYLES]
   if (!styleInfo) return NextResponse.json({ error: 'Invalid style' }, { status: 400 })
 
-  const danceStyle = await prisma.danceStyle.upsert({
-    where: { dancerId_style: { dancerId: dancer.id, style } },
-    create: {
-      dancerId: dancer.id,
-      style,
-      category: styleInfo.category as any,
-      level,
-      isCompeting: !!isCompeting,
-      wantsToCompete: !!wantsToCompete,
-    },
-    update: {
-      level,
-      isCompeting: !!isCompeting,
-      wantsToCompete: !!wantsToCompete,
-    },
-  })
+  // Bump the dancer too, so the incremental match score refresh picks the change up
+  const [danceStyle] = await prisma.$transaction([
+    prisma.danceStyle.upsert({
+      where: { dancerId_style: { dancerId: dancer.id, style } },
+      create: {
+        dancerId: dancer.id,
+        style,
+        category: styleInfo.category as any,
+        level,
+        isCompeting: !!isCompeting,
+        wantsToCompete: !!wantsToCompete,
+      },
+      update: {
+        level,
+        isCompeting: !!isCompeting,
+        wantsToCompete: !!wantsToCompete,
+      },
+    }),
+    prisma.dancer.update({ where: { id: dancer.id }, data: { updatedAt: new Date() } }),
+  ])
 
   return NextResponse.json(danceStyle)
 }
@@ -55,7 +55,11 @@ export async function GET(req: NextRequest) {
     prisma.dancer.count({ where }),
     prisma.dancer.findMany({
       where,
-      include: { danceStyles: true },
+      // Competition totals from DancerStats rather than counting results per card
+      include: {
+        danceStyles: true,
+        stats: { select: { eventsEntered: true, levelEstimate: true, lastCompetedAt: true } },
+      },
       orderBy: [
         { isClaimed: 'desc' },
         { createdAt: 'desc' },
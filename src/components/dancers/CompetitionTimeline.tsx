@@ -73,7 +73,7 @@ export function CompetitionTimeline({ results }: CompetitionTimelineProps) {
                     </div>
 
                     <div className="flex flex-wrap gap-2 mt-3">
-                      <StyleBadge style={result.style} level={result.level} />
+                      <StyleBadge style={result.style} level={result.level} category={result.category} />
                       {result.partnerName && (
                         <span className="text-xs text-slate-500">w/ {result.partnerName}</span>
                       )}
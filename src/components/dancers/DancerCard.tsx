@@ -9,9 +9,13 @@ import { PartnerStatusBadge } from './PartnerStatusBadge'
 import { TeacherBadge } from './TeacherBadge'
 import { MatchScoreRing } from './MatchScoreRing'
 import { formatLocation, calculateAge } from '@/lib/utils'
-import type { Dancer, DanceStyle } from '@prisma/client'
+import { DANCE_LEVELS } from '@/lib/constants'
+import type { Dancer, DanceStyle, DancerStats } from '@prisma/client'
 
-type DancerWithStyles = Dancer & { danceStyles: DanceStyle[] }
+type DancerWithStyles = Dancer & {
+  danceStyles: DanceStyle[]
+  stats?: Pick<DancerStats, 'eventsEntered' | 'levelEstimate'> | null
+}
 
 interface DancerCardProps {
   dancer: DancerWithStyles
@@ -84,6 +88,14 @@ export function DancerCard({ dancer, matchScore, matchReasons, showMatchScore }:
             </div>
           </div>
 
+          {/* Competition record */}
+          {dancer.stats && dancer.stats.eventsEntered > 0 && (
+            <p className="text-xs text-slate-500 mt-2">
+              {dancer.stats.eventsEntered} competition event{dancer.stats.eventsEntered === 1 ? '' : 's'}
+              {dancer.stats.levelEstimate && ` · ${DANCE_LEVELS[dancer.stats.levelEstimate]}`}
+            </p>
+          )}
+
           {/* Teacher badges */}
           {dancer.isTeacher && (
             <div className="mt-2">
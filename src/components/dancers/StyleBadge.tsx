@@ -1,20 +1,24 @@
 import { cn } from '@/lib/utils'
-import { DANCE_STYLES, DANCE_LEVELS, CATEGORY_COLORS } from '@/lib/constants'
+import { DANCE_STYLES, DANCE_LEVELS, DANCE_CATEGORIES, CATEGORY_COLORS } from '@/lib/constants'
 
 interface StyleBadgeProps {
-  style: string
+  style: string | null
   level?: string
+  // Shown when there is no single style, e.g. for multi-dance heats
+  category?: string | null
   className?: string
 }
 
-export function StyleBadge({ style, level, className }: StyleBadgeProps) {
-  const styleInfo = DANCE_STYLES[style as keyof typeof DANCE_STYLES]
-  const colorClass = CATEGORY_COLORS[styleInfo?.category as keyof typeof CATEGORY_COLORS] || 'bg-slate-100 text-slate-700'
+export function StyleBadge({ style, level, category, className }: StyleBadgeProps) {
+  const styleInfo = style ? DANCE_STYLES[style as keyof typeof DANCE_STYLES] : undefined
+  const badgeCategory = styleInfo?.category ?? category
+  const colorClass = CATEGORY_COLORS[badgeCategory as keyof typeof CATEGORY_COLORS] || 'bg-slate-100 text-slate-700'
+  const categoryLabel = category ? DANCE_CATEGORIES[category as keyof typeof DANCE_CATEGORIES] : null
   const levelLabel = level ? DANCE_LEVELS[level as keyof typeof DANCE_LEVELS] : null
 
   return (
     <span className={cn('inline-flex items-center gap-1 px-2.5 py-1 rounded-full text-xs font-medium', colorClass, className)}>
-      {styleInfo?.label || style}
+      {styleInfo?.label || style || categoryLabel || 'Other'}
       {levelLabel && <span className="opacity-70">· {levelLabel}</span>}
     </span>
   )
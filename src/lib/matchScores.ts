@@ -0,0 +1,11 @@
+import { prisma } from '@/lib/prisma'
+
+// Top matches precomputed by scraper/match_scores.py with the rules in ./matching.ts, best first per section
+export async function storedMatches(dancerId: string) {
+  const rows = await prisma.matchScore.findMany({
+    where: { dancerId, candidate: { isClaimed: true } },
+    include: { candidate: { include: { danceStyles: true } } },
+    orderBy: [{ section: 'asc' }, { rank: 'asc' }],
+  })
+  return rows.map(r => ({ dancer: r.candidate, score: r.score, reasons: r.reasons, section: r.section }))
+}